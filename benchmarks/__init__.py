@@ -0,0 +1 @@
+"""Микробенчмарки горячих путей: чанкинг, loaders, кеш LLM, индекс файлов, отчёт. Запуск: python -m benchmarks.run"""
@@ -0,0 +1,154 @@
+"""
+Синтетический корпус для бенчмарков: TXT, DOCX, PDF заданного размера и структуры абзацев.
+PDF пишется вручную (без зависимостей): текстовый слой Helvetica, латиница.
+Запуск: python -m benchmarks.corpus OUT_DIR --files 10 --paragraphs 50
+"""
+import argparse
+import random
+from pathlib import Path
+
+WORDS_RU = (
+    "отчёт договор поставка сроки бюджет проект этап согласование риск качество клиент система "
+    "данные анализ результат показатель выручка затраты план график команда задача решение "
+    "требование документ приложение раздел пункт обязательство оплата акт услуга"
+).split()
+WORDS_EN = (
+    "report contract delivery deadline budget project stage approval risk quality client system "
+    "data analysis result metric revenue cost plan schedule team task decision requirement "
+    "document appendix section clause obligation payment invoice service"
+).split()
+
+KINDS = ("txt", "docx", "pdf")
+
+
+def make_paragraphs(rnd: random.Random, paragraphs: int, words: int, vocab: list[str] = WORDS_RU) -> list[str]:
+    """paragraphs абзацев, в каждом ~words слов (нормальный разброс ±25%), предложения по 8–20 слов."""
+    out = []
+    for _ in range(paragraphs):
+        n = max(1, int(rnd.gauss(words, words / 4)))
+        tokens = [rnd.choice(vocab) for _ in range(n)]
+        sentences, i = [], 0
+        while i < n:
+            step = rnd.randint(8, 20)
+            sentence = " ".join(tokens[i : i + step])
+            sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+            i += step
+        out.append(" ".join(sentences))
+    return out
+
+
+def write_txt(path: Path, paragraphs: list[str]) -> None:
+    path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+
+def write_docx(path: Path, paragraphs: list[str]) -> None:
+    """DOCX: заголовок на каждые 10 абзацев и таблица в конце — как в типичном отчёте."""
+    from docx import Document
+
+    doc = Document()
+    for i, text in enumerate(paragraphs):
+        if i % 10 == 0:
+            doc.add_heading(f"Раздел {i // 10 + 1}", level=2)
+        doc.add_paragraph(text)
+    table = doc.add_table(rows=5, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"{r}.{c}"
+    doc.save(str(path))
+
+
+def _pdf_lines(paragraphs: list[str], width: int) -> list[str]:
+    """Перенос абзацев по ширине строки; пустая строка — между абзацами."""
+    lines: list[str] = []
+    for text in paragraphs:
+        line = ""
+        for word in text.split():
+            if line and len(line) + 1 + len(word) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        if line:
+            lines.append(line)
+        lines.append("")
+    return lines
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, paragraphs: list[str], lines_per_page: int = 48, width: int = 90) -> None:
+    """Минимальный PDF 1.4: страницы по lines_per_page строк, шрифт Helvetica (только латиница)."""
+    lines = _pdf_lines(paragraphs, width) or [""]
+    pages = [lines[k : k + lines_per_page] for k in range(0, len(lines), lines_per_page)]
+    n = len(pages)
+    font_id = 3 + 2 * n
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(n))}] /Count {n} >>".encode(),
+    ]
+    for i, page in enumerate(pages):
+        body = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in page)
+        content = f"BT /F1 10 Tf 14 TL 50 760 Td {body} ET".encode("latin-1", "replace")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for k, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{k} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def generate_corpus(
+    root: Path,
+    files: int = 10,
+    paragraphs: int = 50,
+    words: int = 80,
+    kinds: tuple[str, ...] = KINDS,
+    seed: int = 0,
+) -> dict[str, list[Path]]:
+    """files файлов каждого вида в root/<kind>/. Одинаковый seed — одинаковый корпус. Вернуть {kind: [пути]}."""
+    rnd = random.Random(seed)
+    writers = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+    out: dict[str, list[Path]] = {}
+    for kind in kinds:
+        folder = Path(root) / kind
+        folder.mkdir(parents=True, exist_ok=True)
+        vocab = WORDS_EN if kind == "pdf" else WORDS_RU
+        out[kind] = []
+        for i in range(files):
+            path = folder / f"doc{i:04}.{kind}"
+            writers[kind](path, make_paragraphs(rnd, paragraphs, words, vocab))
+            out[kind].append(path)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Синтетический корпус TXT/DOCX/PDF")
+    parser.add_argument("out", help="Папка корпуса")
+    parser.add_argument("--files", type=int, default=10, help="Файлов каждого вида")
+    parser.add_argument("--paragraphs", type=int, default=50, help="Абзацев в файле")
+    parser.add_argument("--words", type=int, default=80, help="Слов в абзаце (в среднем)")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    corpus = generate_corpus(Path(args.out), args.files, args.paragraphs, args.words, tuple(args.kinds), args.seed)
+    for kind, paths in corpus.items():
+        size = sum(p.stat().st_size for p in paths)
+        print(f"{kind}: {len(paths)} файлов, {size / 1e6:.2f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Микробенчмарки горячих путей на синтетических данных, результаты — JSON-baseline, сравнение с прошлым.
+
+    python -m benchmarks.run --save                      # → benchmarks/baselines/baseline.json
+    python -m benchmarks.run --compare benchmarks/baselines/baseline.json
+    python -m benchmarks.run --quick --only cache        # малые размеры, только кеш
+
+Сравнение — по минимуму из --repeat прогонов (меньше всего зависит от фонового шума):
+медленнее baseline больше чем на --threshold (и больше чем на 1 мс) — регрессия, код выхода 1. Кеш, индекс файлов и корпус — во временной папке.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_BASELINE = BASELINES_DIR / "baseline.json"
+FORMAT = 1
+MIN_DELTA = 0.001  # сек: разница меньше — шум, не регрессия
+
+
+@dataclass
+class Bench:
+    """Бенчмарк: setup готовит данные и возвращает замеряемую функцию; ops — операций в одном прогоне."""
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    ops: int = 1
+
+
+def _sizes(scale: float) -> dict[str, int]:
+    """Размеры данных; scale=1 — целевые (10^5 записей кеша, 10^4 документов отчёта)."""
+    s = lambda n: max(1, int(n * scale))  # noqa: E731
+    return {
+        "text_paragraphs": s(10_000),
+        "corpus_files": s(20),
+        "corpus_paragraphs": 50,
+        "cache_entries": s(100_000),
+        "index_files": s(50_000),
+        "report_docs": s(10_000),
+    }
+
+
+def _benchmarks(workdir: Path, sizes: dict[str, int]) -> list[Bench]:
+    """Список бенчмарков. Импорт src — здесь: к этому моменту CACHE_DIR уже указывает во workdir."""
+    from benchmarks.corpus import generate_corpus, make_paragraphs
+    from src.chunking import chunk_text, estimate_tokens
+    from src.config import CHUNK_TOKENS
+    from src.loaders import normalize_text
+    from src.loaders.docx_loader import DOCXLoader
+    from src.loaders.pdf_loader import PDFLoader
+    from src.loaders.txt_loader import TXTLoader
+    from src.report import build_report, build_report_md
+    from src.sources.models import FileMeta
+    from src.storage.cache import flush_llm_cache, get_llm_cache, set_llm_cache
+    from src.storage.files_index import STATUS_DOWNLOADED, _db
+    from src.storage.load_cached import load_cached_files
+
+    rnd = random.Random(0)
+    paragraphs = make_paragraphs(rnd, sizes["text_paragraphs"], 80)
+    text = "\n\n".join(paragraphs)
+    # Сырой текст «как из loader»: \r\n, табы и повторные пробелы, лишние пустые строки
+    raw = "\r\n\r\n\r\n".join(p.replace(" ", "  \t", 3) for p in paragraphs)
+    corpus = generate_corpus(workdir / "corpus", sizes["corpus_files"], sizes["corpus_paragraphs"], seed=0)
+
+    def loader_bench(kind: str, loader) -> Bench:
+        paths = corpus[kind]
+        return Bench(f"loader.{kind}", lambda: lambda: [loader.load(p) for p in paths], ops=len(paths))
+
+    # Кеш LLM: ~1 КБ ответа на запись, как у саммари чанка
+    n_cache = sizes["cache_entries"]
+    answer = " ".join(paragraphs[:2])[:1000]
+    cache_keys = [f"{i:064x}" for i in range(n_cache)]
+    cache_round = [0]
+
+    def cache_set():
+        cache_round[0] += 1
+        prefix = f"r{cache_round[0]}:"
+
+        def run():
+            for key in cache_keys:
+                set_llm_cache(prefix + key, answer, "bench", "chunk")
+            flush_llm_cache()
+
+        return run
+
+    def cache_get():
+        for key in cache_keys:
+            set_llm_cache("get:" + key, answer, "bench", "chunk")
+        flush_llm_cache()
+        order = cache_keys[:]
+        random.Random(1).shuffle(order)
+        return lambda: [get_llm_cache("get:" + key, "chunk") for key in order]
+
+    # Индекс файлов: n_index записей по 50 папкам
+    n_index = sizes["index_files"]
+    indexed = [False]
+
+    def fill_index():
+        if indexed[0]:
+            return
+        # load_cached_files пропускает записи без файла на диске — все указывают на один файл корпуса
+        local = str(corpus["txt"][0])
+        conn = _db()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR REPLACE INTO files (file_id, name, mime_type, size, modified_time, path, local_path, status, updated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (f"f{i}", f"doc{i}.pdf", "application/pdf", 1000 + i, "2024-01-01T00:00:00Z",
+                 f"dept{i % 50:02}/doc{i:06}.pdf", local, STATUS_DOWNLOADED, 0.0)
+                for i in range(n_index)
+            ],
+        )
+        conn.execute("COMMIT")
+        indexed[0] = True
+
+    def index_bench(name: str, **kwargs) -> Bench:
+        def setup():
+            fill_index()
+            return lambda: load_cached_files(**kwargs)
+
+        return Bench(name, setup)
+
+    # Отчёт: n_docs документов в 100 папках, саммари ~600 символов
+    n_docs = sizes["report_docs"]
+    summary = " ".join(paragraphs[:3])[:600]
+    doc_summaries = [(f"dept{i % 100:02}/doc{i:06}.pdf", f"doc{i:06}.pdf", summary) for i in range(n_docs)]
+    files_meta = [
+        FileMeta(file_id=f"f{i}", name=name, mime_type="application/pdf", size=1000 + i,
+                 modified_time="2024-01-01T00:00:00Z", path=path, is_folder=False)
+        for i, (path, name, _) in enumerate(doc_summaries)
+    ]
+    folders = [
+        {"path": f"dept{k:02}", "name": f"dept{k:02}", "depth": 1, "documents": n_docs // 100,
+         "subfolders": [], "summary": summary}
+        for k in range(100)
+    ]
+    global_summary = "## Краткое резюме\n" + summary + "\n## Карта тем\n- " + "\n- ".join(paragraphs[3][:400].split(". "))
+
+    def report_md():
+        report = build_report(global_summary, doc_summaries, files_meta, folders)
+        return lambda: build_report_md(report, folder_name="bench")
+
+    return [
+        Bench("normalize_text", lambda: lambda: normalize_text(raw)),
+        Bench("estimate_tokens", lambda: lambda: [estimate_tokens(p) for p in paragraphs], ops=len(paragraphs)),
+        Bench("chunk_text", lambda: lambda: chunk_text(text, file_id="bench", path="bench.txt", max_tokens=CHUNK_TOKENS)),
+        loader_bench("txt", TXTLoader()),
+        loader_bench("docx", DOCXLoader()),
+        loader_bench("pdf", PDFLoader()),
+        Bench("llm_cache.set", cache_set, ops=n_cache),
+        Bench("llm_cache.get", cache_get, ops=n_cache),
+        index_bench("load_cached_files.all"),
+        index_bench("load_cached_files.prefix", path_prefix="dept07/"),
+        Bench("build_report", lambda: lambda: build_report(global_summary, doc_summaries, files_meta, folders)),
+        Bench("build_report_md", report_md),
+    ]
+
+
+def run_bench(bench: Bench, repeat: int) -> dict:
+    """repeat прогонов (setup — перед каждым, вне замера). Вернуть медиану/минимум и время на операцию."""
+    times = []
+    for _ in range(repeat):
+        fn = bench.setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    return {
+        "median": median,
+        "min": min(times),
+        "runs": repeat,
+        "ops": bench.ops,
+        "per_op": median / bench.ops,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Напечатать сравнение с baseline. Вернуть имена бенчмарков с регрессией."""
+    regressions = []
+    print(f"\n{'Бенчмарк':<28} {'baseline':>10} {'сейчас':>10} {'×':>6}")
+    for name, now in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<28} {'—':>10} {_fmt(now['min']):>10}")
+            continue
+        if base.get("ops") != now["ops"]:
+            print(f"{name:<28} другой размер данных ({base.get('ops')} → {now['ops']}), не сравнивается")
+            continue
+        ratio = now["min"] / base["min"] if base["min"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold and now["min"] - base["min"] > MIN_DELTA:
+            flag = "  РЕГРЕССИЯ"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold) and base["min"] - now["min"] > MIN_DELTA:
+            flag = "  быстрее"
+        print(f"{name:<28} {_fmt(base['min']):>10} {_fmt(now['min']):>10} {ratio:>6.2f}{flag}")
+    return regressions
+
+
+def _fmt(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} мс" if seconds < 1 else f"{seconds:.2f} с"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Микробенчмарки: чанкинг, loaders, кеш LLM, индекс файлов, отчёт")
+    parser.add_argument("--quick", action="store_true", help="Размеры ×0.1 (проверка, не для baseline)")
+    parser.add_argument("--scale", type=float, default=None, help="Множитель размеров данных")
+    parser.add_argument("--repeat", type=int, default=5, help="Прогонов на бенчмарк")
+    parser.add_argument("--only", nargs="+", default=None, help="Только бенчмарки, в имени которых есть подстрока")
+    parser.add_argument("--save", nargs="?", const=str(DEFAULT_BASELINE), default=None, help="Сохранить JSON-baseline")
+    parser.add_argument("--compare", default=None, help="Сравнить с JSON-baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Допустимое замедление (0.25 = 25%%)")
+    args = parser.parse_args()
+    scale = args.scale if args.scale is not None else (0.1 if args.quick else 1.0)
+
+    # Конфиг читается при импорте src: кеш и индекс файлов — во временной папке, до импорта
+    workdir = Path(tempfile.mkdtemp(prefix="bench-"))
+    os.environ["CACHE_DIR"] = str(workdir / "cache")
+    try:
+        sizes = _sizes(scale)
+        benches = _benchmarks(workdir, sizes)
+        if args.only:
+            benches = [b for b in benches if any(s in b.name for s in args.only)]
+        results = {}
+        for bench in benches:
+            res = run_bench(bench, args.repeat)
+            results[bench.name] = res
+            print(f"{bench.name:<28} {_fmt(res['median']):>10}  (min {_fmt(res['min'])}, "
+                  f"{res['per_op'] * 1e6:.1f} мкс/оп × {res['ops']})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    current = {
+        "format": FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "sizes": sizes,
+        "results": results,
+    }
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nBaseline: {path}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if baseline.get("platform") != current["platform"]:
+            print(f"\n⚠️  baseline снят на другой машине ({baseline.get('platform')})")
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\nРегрессии: {', '.join(regressions)}")
+            return 1
+        print("\nРегрессий нет.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный прогон без сети: run_summarize на синтетическом корпусе против локального
+mock LLM (src.llm.mock_server). Отчёт: пропускная способность, p50/p95/p99 на вызов, повторы.
+Пример: python loadtest.py --files 200 --latency 0.8 --error-429 0.05 --error-5xx 0.02
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+WORDS = (
+    "отчёт договор поставка сроки бюджет проект этап согласование риск качество клиент "
+    "система данные анализ результат показатель выручка затраты план график команда задача"
+).split()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_corpus(root: Path, files: int, paragraphs: int, words: int, seed: int | None) -> list:
+    """Синтетические TXT: files файлов по paragraphs абзацев из ~words слов, в нескольких папках."""
+    from src.sources.models import FileMeta
+
+    rnd = random.Random(seed)
+    metas = []
+    for i in range(files):
+        rel = f"dept{i % 5}/team{i % 3}/doc{i:05}.txt"
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = "\n\n".join(
+            " ".join(rnd.choice(WORDS) for _ in range(max(1, int(rnd.gauss(words, words / 4)))))
+            for _ in range(paragraphs)
+        )
+        path.write_text(f"Документ {i}\n\n{text}", encoding="utf-8")
+        metas.append(FileMeta(
+            file_id=f"loadtest-{i}",
+            name=path.name,
+            mime_type="text/plain",
+            size=path.stat().st_size,
+            modified_time="2024-01-01T00:00:00Z",
+            path=rel,
+            is_folder=False,
+            local_path=path,
+        ))
+    return metas
+
+
+def main() -> None:
+    # Конфиг читается при импорте src: endpoint, ключ и кеш (холодный, отдельный) — до импорта
+    workdir = Path(tempfile.gettempdir()) / f"loadtest-{os.getpid()}"
+    port = _free_port()
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["OPENROUTER_API_KEY"] = "mock"
+    os.environ["CACHE_DIR"] = str(workdir / "cache")
+
+    from src.llm import call_metrics, reset_call_metrics
+    from src.llm.mock_server import MockServer, add_mock_args, mock_config
+    from src.pipelines.run import run_summarize, run_summarize_async
+
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон run_summarize против mock LLM")
+    parser.add_argument("--files", type=int, default=100, help="Файлов в корпусе")
+    parser.add_argument("--paragraphs", type=int, default=40, help="Абзацев в файле")
+    parser.add_argument("--words", type=int, default=80, help="Слов в абзаце (в среднем)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="run_summarize_async")
+    parser.add_argument("--json", default=None, help="Сохранить отчёт в JSON")
+    parser.add_argument("--keep", action="store_true", help="Не удалять рабочую папку (корпус, кеш)")
+    add_mock_args(parser)
+    args = parser.parse_args()
+
+    try:
+        metas = _write_corpus(workdir / "corpus", args.files, args.paragraphs, args.words, args.seed)
+        with MockServer(mock_config(args), port=port) as server:
+            print(f"Mock LLM: {server.base_url}, корпус: {len(metas)} файлов в {workdir}")
+            reset_call_metrics()
+            started = time.monotonic()
+            if args.use_async:
+                import asyncio
+                result = asyncio.run(run_summarize_async(metas, progress=True))
+            else:
+                result = run_summarize(metas, progress=True)
+            elapsed = time.monotonic() - started
+            responses = dict(server.stats)
+
+        m = call_metrics()
+        report = {
+            "files": len(metas),
+            "docs": len(result["doc_summaries"]),
+            "failed": len(result["failed"]),
+            "seconds": round(elapsed, 2),
+            "docs_per_sec": round(len(result["doc_summaries"]) / elapsed, 2) if elapsed else 0.0,
+            "calls_per_sec": round(m["calls"] / elapsed, 2) if elapsed else 0.0,
+            "mock_responses": {str(k): v for k, v in sorted(responses.items())},
+            **m,
+        }
+        print(f"\nДокументов: {report['docs']}/{report['files']} за {elapsed:.1f} с "
+              f"({report['docs_per_sec']} док/с), ошибок: {report['failed']}")
+        print(f"Вызовов: {m['calls']} ({report['calls_per_sec']}/с), ответы mock: {report['mock_responses']}")
+        print(f"Латентность вызова, с: p50 {m['latency_p50']:.3f}  p95 {m['latency_p95']:.3f}  "
+              f"p99 {m['latency_p99']:.3f}  max {m['latency_max']:.3f}")
+        print(f"Повторов: {m['retries_total']} {m['retries']}, ошибок вызова: {m['errors']}")
+        if args.json:
+            Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"Отчёт: {args.json}")
+    finally:
+        if args.keep:
+            print(f"Рабочая папка: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
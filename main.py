@@ -29,7 +29,7 @@ def cmd_ingest(args: argparse.Namespace) -> None:
     credentials = Path(args.credentials or PROJECT_ROOT / GOOGLE_CREDENTIALS_PATH)
     folder_id = args.folder_id or GOOGLE_DRIVE_FOLDER_ID
     try:
-        files = ingest(folder_id, credentials, force=args.force)
+        files = ingest(folder_id, credentials, force=args.force, full=args.full)
         files = files[: args.max_files] if args.max_files else files
         downloaded = sum(1 for f in files if f.local_path)
         print(f"Обработано: {len(files)} файлов, скачано: {downloaded}")
@@ -45,7 +45,7 @@ def cmd_ingest(args: argparse.Namespace) -> None:
 
 def cmd_summarize(args: argparse.Namespace) -> None:
     """Команда summarize — прогнать саммаризацию."""
-    from src.pipelines.run import run_summarize, save_summary_result
+    from src.pipelines.run import run_summarize, run_summarize_async
     from src.storage.load_cached import load_cached_files
 
     if not check_api_key():
@@ -59,8 +59,14 @@ def cmd_summarize(args: argparse.Namespace) -> None:
         return
 
     print(f"Саммаризация {len(files)} файлов...")
-    result = run_summarize(files, max_files=args.max_files, progress=True)
-    save_summary_result(result)
+    resume = getattr(args, "resume", False)
+    if getattr(args, "use_async", False):
+        import asyncio
+        result = asyncio.run(
+            run_summarize_async(files, max_files=args.max_files, progress=True, resume=resume)
+        )
+    else:
+        result = run_summarize(files, max_files=args.max_files, progress=True, resume=resume)
     failed = result.get("failed", [])
     if failed:
         print(f"\n⚠️  Не обработано {len(failed)} файлов:")
@@ -87,6 +93,7 @@ def cmd_report(args: argparse.Namespace) -> None:
         global_summary=result["global_summary"],
         doc_summaries=result.get("doc_summaries", []),
         files_meta=result.get("files_meta", []),
+        folder_summaries=result.get("folder_summaries", []),
     )
 
     fmt = (args.format or "md").lower()
@@ -103,14 +110,73 @@ def cmd_report(args: argparse.Namespace) -> None:
         print(out)
 
 
+def cmd_cache(args: argparse.Namespace) -> None:
+    """Команда cache — попадания кеша LLM по этапам пайплайна."""
+    from src.storage.cache import LLM_DB_PATH, llm_cache_stage_stats, purge_orphaned_llm_cache, reset_llm_cache_stats
+    from src.storage.sqlite import db_size
+
+    if args.purge_orphans:
+        rows, files = purge_orphaned_llm_cache()
+        print(f"Удалено записей старой схемы ключей: {rows}, файлов JSON-кеша: {files}")
+        return
+    if args.reset_stats:
+        reset_llm_cache_stats()
+        print("Статистика кеша LLM обнулена.")
+        return
+
+    rows = llm_cache_stage_stats()
+    if not rows:
+        print("Кеш LLM пуст.")
+        return
+    print(f"{'Этап':<10} {'Попаданий':>10} {'Промахов':>10} {'Hit ratio':>10} {'Записей':>10} {'МБ':>8}")
+    for r in rows:
+        print(
+            f"{r['stage'] or '—':<10} {r['hits']:>10} {r['misses']:>10} {r['hit_ratio']:>10.1%} "
+            f"{r['entries']:>10} {r['bytes'] / 1e6:>8.2f}"
+        )
+    hits = sum(r["hits"] for r in rows)
+    lookups = hits + sum(r["misses"] for r in rows)
+    print(f"\nВсего: hit ratio {hits / lookups if lookups else 0:.1%}, база {db_size(LLM_DB_PATH) / 1e6:.2f} МБ")
+
+
+def _run_stream(args: argparse.Namespace) -> bool:
+    """run --stream: ingest и summarize одним конвейером (саммари — по мере скачивания)."""
+    from src.pipelines.results import SUMMARY_RESULT_PATH
+    from src.pipelines.stream import run_stream
+    from src.sources import ingest_iter
+
+    if not check_api_key():
+        print("⚠️  Задайте OPENROUTER_API_KEY в .env")
+        return False
+    credentials = Path(args.credentials or PROJECT_ROOT / GOOGLE_CREDENTIALS_PATH)
+    folder_id = args.folder_id or GOOGLE_DRIVE_FOLDER_ID
+    try:
+        files = ingest_iter(folder_id, credentials, force=args.force, full=args.full, progress=False)
+        result = run_stream(files, max_files=args.max_files, progress=True)
+    except FileNotFoundError as e:
+        print(f"Ошибка: {e}")
+        print("Положите credentials.json в корень проекта.")
+        return False
+    failed = result.get("failed", [])
+    if failed:
+        print(f"\n⚠️  Не обработано {len(failed)} файлов. Подробности: {CACHE_DIR / 'errors.log'}")
+    print(f"\nГотово. Результат: {SUMMARY_RESULT_PATH}")
+    return True
+
+
 def cmd_run(args: argparse.Namespace) -> None:
     """Один запуск: ingest → summarize → report."""
     ensure_cache_dirs()
     args.force = getattr(args, "force", False)
+    args.full = getattr(args, "full", False)
     args.credentials = getattr(args, "credentials", None)
     args.folder_id = getattr(args, "folder_id", None)
-    cmd_ingest(args)
-    cmd_summarize(args)
+    if getattr(args, "stream", False):
+        if not _run_stream(args):
+            return
+    else:
+        cmd_ingest(args)
+        cmd_summarize(args)
     args.format = getattr(args, "format", "md")
     args.output = getattr(args, "output", Path("summary.md"))
     args.folder_name = getattr(args, "folder_name", "")
@@ -127,13 +193,15 @@ def main() -> None:
     p_ingest.add_argument("--folder-id", default=None, help="ID папки Drive")
     p_ingest.add_argument("--credentials", default=None, help="Путь к credentials.json")
     p_ingest.add_argument("--force", action="store_true", help="Перекачать даже без изменений")
+    p_ingest.add_argument("--full", action="store_true", help="Полный листинг вместо ленты изменений Drive")
     _add_common_args(p_ingest)
     p_ingest.set_defaults(func=cmd_ingest)
 
     # summarize
     p_sum = subparsers.add_parser("summarize", help="Прогнать саммаризацию")
     p_sum.add_argument("--mode", choices=["fast", "deep"], default="fast", help="Режим: fast или deep")
-    p_sum.add_argument("--resume", action="store_true", help="Использовать кеш LLM (пропуск пересчёта)")
+    p_sum.add_argument("--resume", action="store_true", help="Доверять кешам (тексты, LLM) без пересчёта")
+    p_sum.add_argument("--async", dest="use_async", action="store_true", help="Async-клиент LLM (сотни запросов в полёте)")
     _add_common_args(p_sum)
     p_sum.set_defaults(func=cmd_summarize)
 
@@ -145,11 +213,22 @@ def main() -> None:
     _add_common_args(p_rep)
     p_rep.set_defaults(func=cmd_report)
 
+    # cache
+    p_cache = subparsers.add_parser("cache", help="Статистика кеша LLM по этапам")
+    p_cache.add_argument("--reset-stats", action="store_true", help="Обнулить счётчики попаданий")
+    p_cache.add_argument(
+        "--purge-orphans", action="store_true", help="Удалить записи старой схемы ключей (недостижимые)"
+    )
+    _add_common_args(p_cache)
+    p_cache.set_defaults(func=cmd_cache)
+
     # run (ingest → summarize → report)
     p_run = subparsers.add_parser("run", help="Полный цикл: ingest → summarize → report")
     p_run.add_argument("--folder-id", default=None)
     p_run.add_argument("--credentials", default=None)
     p_run.add_argument("--force", action="store_true")
+    p_run.add_argument("--full", action="store_true")
+    p_run.add_argument("--stream", action="store_true", help="Саммаризация по мере скачивания (конвейер с очередями)")
     p_run.add_argument("--format", choices=["md", "json"], default="md")
     p_run.add_argument("--output", "-o", default="summary.md")
     p_run.add_argument("--folder-name", default="")
@@ -1,7 +1,17 @@
 """Разбиение текста на чанки."""
 
 from src.chunking.models import Chunk
-from src.chunking.chunker import chunk_text, chunk_text_simple
-from src.chunking.tokenizer import estimate_tokens
+from src.chunking.chunker import chunk_text, chunk_text_simple, iter_chunks, iter_paragraph_spans, iter_paragraphs
+from src.chunking.tokenizer import estimate_tokens, estimate_tokens_many, truncate_to_tokens
 
-__all__ = ["Chunk", "chunk_text", "chunk_text_simple", "estimate_tokens"]
+__all__ = [
+    "Chunk",
+    "chunk_text",
+    "chunk_text_simple",
+    "estimate_tokens",
+    "estimate_tokens_many",
+    "iter_chunks",
+    "iter_paragraph_spans",
+    "iter_paragraphs",
+    "truncate_to_tokens",
+]
@@ -1,8 +1,169 @@
 """Разбиение текста на чанки по абзацам, лимит токенов, overlap."""
-from typing import Iterator
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable, Iterator
 
 from src.chunking.models import Chunk
-from src.chunking.tokenizer import estimate_tokens, split_into_sentences
+from src.chunking.tokenizer import estimate_tokens_many
+
+PARA_SEP = "\n\n"
+SEP_TOKENS = 2  # стоимость разделителя абзацев в оценке токенов
+TOKENIZE_BATCH = 256  # абзацев на один вызов estimate_tokens_many
+PARA_CHARS_PER_TOKEN = 3  # абзац длиннее max_tokens * 3 символов режется на части (≈ не больше чанка)
+
+
+def _strip_span(buf: str, start: int, end: int) -> tuple[str, int, int] | None:
+    """Абзац buf[start:end] без пробелов по краям и его границы в buf. None — пустой."""
+    raw = buf[start:end]
+    para = raw.strip()
+    if not para:
+        return None
+    s = start + len(raw) - len(raw.lstrip())
+    return para, s, s + len(para)
+
+
+def _cut_point(text: str, start: int, limit: int) -> int:
+    """Где резать длинный абзац text[start:]: после переноса строки, конца предложения или пробела, не дальше limit."""
+    end = start + limit
+    for sep in ("\n", ". ", " "):
+        pos = text.rfind(sep, start + limit // 2, end)
+        if pos >= 0:
+            return pos + len(sep)
+    return end
+
+
+def _cut_spans(raw: str, offset: int, max_chars: int | None, keep_tail: bool = False):
+    """
+    Абзацы из raw (offset — его смещение в документе); длиннее max_chars — кусками по _cut_point.
+    keep_tail — абзац ещё не закончен: последний кусок (не длиннее max_chars) не выдавать,
+    а вернуть, с какой позиции raw он начинается.
+    """
+    start = 0
+    while max_chars and len(raw) - start > max_chars:
+        cut = _cut_point(raw, start, max_chars)
+        span = _strip_span(raw, start, cut)
+        if span:
+            yield span[0], offset + span[1], offset + span[2]
+        start = cut
+    if keep_tail:
+        return start
+    span = _strip_span(raw, start, len(raw))
+    if span:
+        yield span[0], offset + span[1], offset + span[2]
+    return len(raw)
+
+
+def iter_paragraph_spans(
+    fragments: Iterable[str],
+    joiner: str = "\n",
+    max_chars: int | None = None,
+) -> Iterator[tuple[str, int, int]]:
+    """
+    Абзацы (по двойному переносу) с границами: (абзац, start, end), text[start:end] == абзац,
+    где text = joiner.join(непустые фрагменты). Абзац длиннее max_chars режется по переносу
+    строки, концу предложения или пробелу. В памяти — текущий фрагмент и незавершённый
+    абзац списком кусков (с max_chars — не длиннее него).
+    """
+    carry = len(PARA_SEP) - 1  # столько последних символов хвоста может начинать разделитель
+    parts: list[str] = []  # начало незавершённого абзаца
+    parts_len = 0
+    buf = ""  # конец незавершённого абзаца + текущий фрагмент
+    base = 0  # смещение незавершённого абзаца в документе
+    first = True
+    for frag in fragments:
+        if not frag:
+            continue
+        buf += frag if first else joiner + frag
+        first = False
+        start = 0
+        while (pos := buf.find(PARA_SEP, start)) >= 0:
+            raw = "".join(parts) + buf[start:pos]
+            yield from _cut_spans(raw, base, max_chars)
+            base += len(raw) + len(PARA_SEP)
+            parts, parts_len = [], 0
+            start = pos + len(PARA_SEP)
+        rest = buf[start:]
+        if max_chars and parts_len + len(rest) > max_chars:
+            raw = "".join(parts) + rest
+            cut = yield from _cut_spans(raw, base, max_chars, keep_tail=True)
+            base += cut
+            parts, parts_len, rest = [], 0, raw[cut:]
+        # Хвост — в parts без копирования всего абзаца; в buf — только то, с чего может начаться разделитель
+        if len(rest) > carry:
+            parts.append(rest[: len(rest) - carry])
+            parts_len += len(rest) - carry
+            rest = rest[len(rest) - carry :]
+        buf = rest
+    yield from _cut_spans("".join(parts) + buf, base, max_chars)
+
+
+def iter_paragraphs(fragments: Iterable[str], joiner: str = "\n") -> Iterator[str]:
+    """Абзацы (по двойному переносу) из потока фрагментов, склеенных через joiner."""
+    for para, _, _ in iter_paragraph_spans(fragments, joiner):
+        yield para
+
+
+def iter_chunks(
+    fragments: Iterable[str],
+    file_id: str,
+    path: str = "",
+    max_tokens: int = 4000,
+    overlap_tokens: int | None = None,
+    overlap_ratio: float = 0.08,
+    joiner: str = "\n",
+) -> Iterator[Chunk]:
+    """
+    Потоковое разбиение: фрагменты (например, страницы PDF) → чанки по мере заполнения.
+    Документ = joiner.join(непустые фрагменты); start_char/end_char — границы первого
+    и последнего абзаца чанка в документе. Границы чанков — как у chunk_text; абзац длиннее
+    max_tokens * PARA_CHARS_PER_TOKEN символов (например, страницы PDF без пустых строк)
+    режется по строкам или предложениям.
+    Токены абзаца считаются один раз; окно и token_estimate — префиксные суммы по абзацам
+    (плюс SEP_TOKENS на разделитель), чанк целиком не перекодируется.
+    В памяти: текущий чанк, хвост overlap и батч абзацев на токенизацию.
+    """
+    if overlap_tokens is None:
+        overlap_tokens = int(max_tokens * overlap_ratio)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    # Окно текущего чанка: абзацы, их границы в документе и префиксные суммы токенов
+    # (cum[k] — токены первых k абзацев вместе с разделителем после каждого)
+    paras: list[str] = []
+    spans: list[tuple[int, int]] = []
+    cum: list[int] = [0]
+    index = 0
+
+    def make_chunk() -> Chunk:
+        text = PARA_SEP.join(paras)
+        return Chunk(
+            text=text,
+            file_id=file_id,
+            chunk_index=index,
+            start_char=spans[0][0],
+            end_char=spans[-1][1],
+            token_estimate=cum[-1] - SEP_TOKENS,
+            path=path,
+        )
+
+    span_iter = iter_paragraph_spans(fragments, joiner, max_chars=max_tokens * PARA_CHARS_PER_TOKEN)
+    while True:
+        batch = list(islice(span_iter, TOKENIZE_BATCH))
+        if not batch:
+            break
+        for (para, start, end), t in zip(batch, estimate_tokens_many([b[0] for b in batch])):
+            if paras and cum[-1] + t > max_tokens:
+                yield make_chunk()
+                index += 1
+                # Overlap — самый длинный хвост окна, укладывающийся в overlap_tokens
+                keep = bisect_left(cum, cum[-1] - overlap_tokens)
+                paras, spans = paras[keep:], spans[keep:]
+                cum = [c - cum[keep] for c in cum[keep:]]
+            paras.append(para)
+            spans.append((start, end))
+            cum.append(cum[-1] + t + SEP_TOKENS)
+
+    if paras:
+        yield make_chunk()
 
 
 def chunk_text(
@@ -19,68 +180,9 @@ def chunk_text(
     - Лимит max_tokens на чанк
     - Overlap overlap_ratio (5–10%) или overlap_tokens для связности
     - Метаданные: file_id, chunk_index, start_char, end_char, token_estimate
+    Токены каждого абзаца считаются один раз — линейное время от размера документа.
     """
-    if overlap_tokens is None:
-        overlap_tokens = int(max_tokens * overlap_ratio)
-    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
-
-    paragraphs = split_into_sentences(text)
-    if not paragraphs:
-        return []
-
-    chunks: list[Chunk] = []
-    current: list[str] = []
-    current_tokens = 0
-    chunk_start = 0
-
-    def flush(overlap_paras: list[str] | None = None) -> int:
-        nonlocal current, current_tokens, chunk_start
-        if not current:
-            return chunk_start
-        chunk_text_str = "\n\n".join(current)
-        chunk_len = sum(len(p) + 2 for p in current) - 2
-        chunk_end = chunk_start + chunk_len
-        token_est = estimate_tokens(chunk_text_str)
-        chunks.append(
-            Chunk(
-                text=chunk_text_str,
-                file_id=file_id,
-                chunk_index=len(chunks),
-                start_char=chunk_start,
-                end_char=chunk_end,
-                token_estimate=token_est,
-                path=path,
-            )
-        )
-        current = list(overlap_paras) if overlap_paras else []
-        current_tokens = estimate_tokens("\n\n".join(current)) if current else 0
-        if overlap_paras:
-            overlap_len = sum(len(p) + 2 for p in overlap_paras) - 2
-            chunk_start = chunk_end - overlap_len
-        else:
-            chunk_start = chunk_end + 2
-        return chunk_start
-
-    for para in paragraphs:
-        para_tokens = estimate_tokens(para)
-        if current_tokens + para_tokens > max_tokens and current:
-            overlap_paras = []
-            if overlap_tokens > 0:
-                acc = 0
-                for p in reversed(current):
-                    pt = estimate_tokens(p) + 2
-                    if acc + pt <= overlap_tokens:
-                        overlap_paras.insert(0, p)
-                        acc += pt
-                    else:
-                        break
-            flush(overlap_paras)
-
-        current.append(para)
-        current_tokens += para_tokens + 2
-
-    flush()
-    return chunks
+    return list(iter_chunks([text], file_id, path, max_tokens, overlap_tokens, overlap_ratio))
 
 
 def chunk_text_simple(
@@ -90,6 +192,5 @@ def chunk_text_simple(
     max_tokens: int = 4000,
     overlap_ratio: float = 0.08,
 ) -> Iterator[Chunk]:
-    """Итератор по чанкам."""
-    for c in chunk_text(text, file_id, path, max_tokens, overlap_ratio=overlap_ratio):
-        yield c
+    """Итератор по чанкам (без построения списка)."""
+    return iter_chunks([text], file_id, path, max_tokens, overlap_ratio=overlap_ratio)
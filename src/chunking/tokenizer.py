@@ -1,17 +1,57 @@
 """Оценка токенов: tiktoken или ~4 символа = 1 токен."""
-from typing import List
+from functools import lru_cache
+from typing import Any, List
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> Any | None:
+    """Кодировка tiktoken для модели — один раз на процесс. None, если tiktoken недоступен."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
 
 
 def estimate_tokens(text: str, model: str = "gpt-4") -> int:
     """Оценка токенов. При ошибке tiktoken — fallback ~4 символа = 1 токен."""
+    enc = _get_encoding(model)
+    if enc is None:
+        return _chars_to_tokens(text)
     try:
-        import tiktoken
-        enc = tiktoken.encoding_for_model(model)
-        return len(enc.encode(text))
+        return len(enc.encode_ordinary(text))
     except Exception:
         return _chars_to_tokens(text)
 
 
+def estimate_tokens_many(texts: List[str], model: str = "gpt-4") -> List[int]:
+    """Оценка токенов для списка текстов одним батчем (tiktoken кодирует в несколько потоков)."""
+    enc = _get_encoding(model)
+    if enc is None:
+        return [_chars_to_tokens(t) for t in texts]
+    try:
+        return [len(ids) for ids in enc.encode_ordinary_batch(list(texts))]
+    except Exception:
+        return [estimate_tokens(t, model) for t in texts]
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    """Обрезать текст до max_tokens токенов (fallback — ~4 символа на токен)."""
+    if max_tokens <= 0:
+        return ""
+    enc = _get_encoding(model)
+    if enc is not None:
+        try:
+            ids = enc.encode_ordinary(text)
+            return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+        except Exception:
+            pass
+    return text[: max_tokens * 4]
+
+
 def _chars_to_tokens(text: str) -> int:
     """Приблизительно: ~4 символа = 1 токен."""
     return (len(text) + 3) // 4
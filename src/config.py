@@ -38,7 +38,7 @@ OPENROUTER_API_KEY: str | None = get_env("OPENROUTER_API_KEY")
 GOOGLE_CREDENTIALS_PATH: str = get_env("GOOGLE_CREDENTIALS_PATH") or "credentials.json"
 GOOGLE_DRIVE_FOLDER_ID: str = get_env("GOOGLE_DRIVE_FOLDER_ID") or "1x6EKNkVw6PlFVTr6cGrsVscmRuwqGrXd"
 PROJECT_ROOT: Path = Path(__file__).resolve().parent.parent
-CACHE_DIR: Path = PROJECT_ROOT / ".cache"
+CACHE_DIR: Path = PROJECT_ROOT / (get_env("CACHE_DIR") or YAML_CONFIG.get("cache_dir") or ".cache")
 CACHE_DOWNLOADS: Path = CACHE_DIR / "downloads"
 CACHE_TEXTS: Path = CACHE_DIR / "texts"
 CACHE_LLM: Path = CACHE_DIR / "llm"
@@ -46,7 +46,38 @@ CACHE_LLM: Path = CACHE_DIR / "llm"
 MODE: str = str(YAML_CONFIG.get("mode", "fast"))
 SOURCE: str = str(YAML_CONFIG.get("source", "drive"))
 CHUNK_TOKENS: int = int(YAML_CONFIG.get("chunk_tokens", 4000))
+DRIVE_LIST_WORKERS: int = int(YAML_CONFIG.get("drive_list_workers", 8))
+DRIVE_DOWNLOAD_WORKERS: int = int(YAML_CONFIG.get("drive_download_workers", 8))
+DRIVE_DOWNLOAD_RETRIES: int = int(YAML_CONFIG.get("drive_download_retries", 3))
+DRIVE_CHUNK_MB: int = int(YAML_CONFIG.get("drive_chunk_mb", 8))
+DRIVE_PARALLEL_MIN_MB: int = int(YAML_CONFIG.get("drive_parallel_min_mb", 64))  # 0 — без диапазонов
+DRIVE_RANGE_PARTS: int = int(YAML_CONFIG.get("drive_range_parts", 4))
+DOWNLOAD_SKIP_MIME_PREFIXES: tuple[str, ...] = tuple(
+    YAML_CONFIG.get("download_skip_mime_prefixes", ["video/", "audio/"]) or ()
+)
+DOWNLOAD_MAX_MB: int = int(YAML_CONFIG.get("download_max_mb", 0))  # 0 — без лимита
+DOWNLOAD_MAX_UNREADABLE_MB: int = int(YAML_CONFIG.get("download_max_unreadable_mb", 20))
+EXTRACT_WORKERS: int = int(YAML_CONFIG.get("extract_workers", 0))  # 0 — по числу ядер
+EXTRACT_TIMEOUT: float = float(YAML_CONFIG.get("extract_timeout", 300))
+PDF_SHARD_MIN_PAGES: int = int(YAML_CONFIG.get("pdf_shard_min_pages", 200))
+PDF_PAGES_PER_SHARD: int = int(YAML_CONFIG.get("pdf_pages_per_shard", 50))
+STREAM_QUEUE_SIZE: int = int(YAML_CONFIG.get("stream_queue_size", 32))
+REDUCE_INPUT_TOKENS: int = int(YAML_CONFIG.get("reduce_input_tokens", 8000))
+REDUCE_FAN_IN: int = int(YAML_CONFIG.get("reduce_fan_in", 10))  # 0 — только бюджет токенов
+REDUCE_MAX_DEPTH: int = int(YAML_CONFIG.get("reduce_max_depth", 6))
 LLM_CONCURRENCY: int = int(YAML_CONFIG.get("llm_concurrency", 2))
+LLM_CONCURRENCY_MIN: int = int(YAML_CONFIG.get("llm_concurrency_min", 1))
+LLM_CONCURRENCY_MAX: int = int(YAML_CONFIG.get("llm_concurrency_max", 16))
+LLM_LATENCY_TARGET: float = float(YAML_CONFIG.get("llm_latency_target", 20.0))
+LLM_ASYNC_CONCURRENCY: int = int(YAML_CONFIG.get("llm_async_concurrency", 100))
+LLM_ASYNC_CONCURRENCY_MAX: int = int(YAML_CONFIG.get("llm_async_concurrency_max", 400))
+LLM_MEMORY_CACHE_ENTRIES: int = int(YAML_CONFIG.get("llm_memory_cache_entries", 10000))
+LLM_MEMORY_CACHE_MB: int = int(YAML_CONFIG.get("llm_memory_cache_mb", 64))
+LLM_POOL_SIZE: int = int(YAML_CONFIG.get("llm_pool_size", 32))
+# Квоты на модель: {model: {rpm, tpm}}, ключ default — для остальных моделей
+RATE_LIMITS: dict[str, dict[str, int]] = dict(YAML_CONFIG.get("rate_limits") or {})
+# OpenAI-совместимый endpoint: OpenRouter или локальный mock (src.llm.mock_server) для нагрузочных прогонов
+LLM_BASE_URL: str = get_env("LLM_BASE_URL") or str(YAML_CONFIG.get("base_url", "https://openrouter.ai/api/v1"))
 OPENROUTER_MODEL: str = get_env("OPENROUTER_MODEL") or str(YAML_CONFIG.get("model", "google/gemini-flash-1.5"))
 
 
@@ -1,6 +1,22 @@
 """Клиент OpenRouter, промпты."""
 
+from src.llm.async_client import achat, achat_cached
+from src.llm.cache_key import make_cache_key
 from src.llm.client import chat, chat_cached, summarize_chunk
-from src.llm.retry import with_retry
+from src.llm.metrics import call_metrics, reset_call_metrics
+from src.llm.pool import pool_stats
+from src.llm.retry import with_async_retry, with_retry
 
-__all__ = ["chat", "chat_cached", "summarize_chunk", "with_retry"]
+__all__ = [
+    "achat",
+    "achat_cached",
+    "call_metrics",
+    "chat",
+    "chat_cached",
+    "make_cache_key",
+    "pool_stats",
+    "reset_call_metrics",
+    "summarize_chunk",
+    "with_async_retry",
+    "with_retry",
+]
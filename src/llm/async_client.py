@@ -0,0 +1,118 @@
+"""Асинхронный OpenRouter клиент — AsyncOpenAI, общий пул соединений на event loop."""
+import asyncio
+import logging
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from src.config import (
+    LLM_ASYNC_CONCURRENCY,
+    LLM_ASYNC_CONCURRENCY_MAX,
+    LLM_CONCURRENCY_MIN,
+    LLM_LATENCY_TARGET,
+    OPENROUTER_API_KEY,
+    OPENROUTER_MODEL,
+)
+from src.llm.client import BASE_URL, DEFAULT_TIMEOUT
+from src.llm.concurrency import AsyncAdaptiveLimiter
+from src.llm.metrics import timed_call
+from src.llm.pool import get_async_client
+from src.llm.ratelimit import estimate_prompt_tokens, get_rate_limiter
+from src.llm.retry import with_async_retry
+from src.llm.singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+_inflight = AsyncSingleFlight()
+# Лимитер привязан к event loop, как и клиенты в src.llm.pool
+_limiters: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAdaptiveLimiter]" = WeakKeyDictionary()
+
+
+def get_async_limiter() -> AsyncAdaptiveLimiter:
+    """AIMD-лимитер текущего event loop (старт — llm_async_concurrency)."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = AsyncAdaptiveLimiter(
+            LLM_ASYNC_CONCURRENCY,
+            min_limit=LLM_CONCURRENCY_MIN,
+            max_limit=LLM_ASYNC_CONCURRENCY_MAX,
+            latency_target=LLM_LATENCY_TARGET,
+        )
+        _limiters[loop] = limiter
+    return limiter
+
+
+@with_async_retry(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
+async def achat(
+    messages: list[dict[str, str]],
+    model: str | None = None,
+    api_key: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    params: dict[str, Any] | None = None,
+) -> str:
+    """
+    Async-вариант chat(): запрос в OpenRouter (chat completions).
+    Квоты RPM/TPM модели, retry при 429/5xx, лимит параллелизма — AIMD на event loop.
+    """
+    key = api_key or OPENROUTER_API_KEY
+    if not key:
+        raise ValueError("OPENROUTER_API_KEY не задан")
+
+    mdl = model or OPENROUTER_MODEL or "google/gemini-flash-1.5"
+
+    rate_limiter = get_rate_limiter(mdl)
+    est_tokens = 0
+    if rate_limiter:
+        est_tokens = estimate_prompt_tokens(messages)
+        await rate_limiter.aacquire(est_tokens)
+
+    try:
+        async with get_async_limiter().track():
+            client = get_async_client(BASE_URL, key, timeout)
+            with timed_call():
+                resp = await client.chat.completions.create(
+                    model=mdl,
+                    messages=messages,
+                    **(params or {}),
+                )
+    except Exception:
+        # Запрос не дошёл до модели (или отклонён) — вернуть оценку в TPM: повтор займёт её снова
+        if rate_limiter:
+            rate_limiter.correct(est_tokens, 0)
+        raise
+    if rate_limiter:
+        usage = getattr(resp, "usage", None)
+        rate_limiter.correct(est_tokens, getattr(usage, "total_tokens", None))
+    choice = resp.choices[0] if resp.choices else None
+    if not choice or not choice.message:
+        return ""
+    return choice.message.content or ""
+
+
+async def achat_cached(
+    messages: list[dict[str, str]],
+    model: str | None = None,
+    *,
+    template: str = "",
+    params: dict[str, Any] | None = None,
+) -> str:
+    """
+    Async-вариант chat_cached(): кеш на диске читается/пишется в отдельном потоке,
+    одинаковые одновременные промахи ждут один achat().
+    """
+    from src.llm.cache_key import make_cache_key, template_stage
+    from src.storage.cache import get_llm_cache, set_llm_cache
+
+    mdl = model or OPENROUTER_MODEL or "google/gemini-flash-1.5"
+    key = make_cache_key(messages, mdl, template, params)
+    stage = template_stage(template)
+    cached = await asyncio.to_thread(get_llm_cache, key, stage)
+    if cached is not None:
+        return cached
+
+    async def call() -> str:
+        out = await achat(messages, model=mdl, params=params)
+        await asyncio.to_thread(set_llm_cache, key, out, mdl, stage)
+        return out
+
+    return await _inflight.do(key, call)
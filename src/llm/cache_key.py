@@ -0,0 +1,37 @@
+"""Канонический ключ кеша LLM: не зависит от repr словарей и пробелов в промптах."""
+import hashlib
+import json
+from typing import Any
+
+from src.loaders.base import normalize_text
+
+KEY_SCHEMA = 2  # смена формата ключа → новое пространство ключей
+
+
+def make_cache_key(
+    messages: list[dict[str, str]],
+    model: str,
+    template: str = "",
+    params: dict[str, Any] | None = None,
+) -> str:
+    """
+    sha256 от канонического JSON: версия схемы, шаблон промпта ("chunk@1"),
+    модель, параметры генерации и сообщения с нормализованным текстом.
+    """
+    payload = {
+        "v": KEY_SCHEMA,
+        "template": template,
+        "model": model,
+        "params": params or {},
+        "messages": [
+            {"role": m.get("role", ""), "content": normalize_text(m.get("content", ""))}
+            for m in messages
+        ],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def template_stage(template: str) -> str:
+    """Этап пайплайна из id шаблона: "chunk@1" → "chunk"."""
+    return template.split("@", 1)[0]
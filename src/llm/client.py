@@ -1,28 +1,46 @@
 """OpenRouter LLM клиент — OpenAI-совместимый API."""
 import logging
-from threading import Semaphore
+from threading import Lock
 from typing import Any
 
 from src.config import (
     LLM_CONCURRENCY,
+    LLM_CONCURRENCY_MAX,
+    LLM_CONCURRENCY_MIN,
+    LLM_BASE_URL,
+    LLM_LATENCY_TARGET,
     OPENROUTER_API_KEY,
     OPENROUTER_MODEL,
 )
+from src.llm.concurrency import AdaptiveLimiter
+from src.llm.metrics import timed_call
+from src.llm.pool import get_client
+from src.llm.ratelimit import estimate_prompt_tokens, get_rate_limiter
 from src.llm.retry import with_retry
+from src.llm.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://openrouter.ai/api/v1"
+BASE_URL = LLM_BASE_URL
 DEFAULT_TIMEOUT = 60.0
 
-_semaphore: Semaphore | None = None
+_inflight = SingleFlight()
+_limiter: AdaptiveLimiter | None = None
+_limiter_lock = Lock()
 
 
-def _get_semaphore() -> Semaphore:
-    global _semaphore
-    if _semaphore is None:
-        _semaphore = Semaphore(LLM_CONCURRENCY)
-    return _semaphore
+def get_limiter() -> AdaptiveLimiter:
+    """AIMD-лимитер параллелизма LLM на процесс (старт — llm_concurrency)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter(
+                LLM_CONCURRENCY,
+                min_limit=LLM_CONCURRENCY_MIN,
+                max_limit=LLM_CONCURRENCY_MAX,
+                latency_target=LLM_LATENCY_TARGET,
+            )
+        return _limiter
 
 
 @with_retry(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
@@ -31,11 +49,13 @@ def chat(
     model: str | None = None,
     api_key: str | None = None,
     timeout: float = DEFAULT_TIMEOUT,
+    params: dict[str, Any] | None = None,
 ) -> str:
     """
     Отправить запрос в OpenRouter (chat completions).
     Вернуть text ответа.
-    Retry при 429/500, лимит параллелизма через Semaphore.
+    Квоты RPM/TPM модели (rate_limits), retry при 429/5xx,
+    лимит параллелизма — адаптивный (AIMD).
     """
     key = api_key or OPENROUTER_API_KEY
     if not key:
@@ -43,28 +63,34 @@ def chat(
 
     mdl = model or OPENROUTER_MODEL or "google/gemini-flash-1.5"
 
-    sem = _get_semaphore()
-    sem.acquire()
+    # Сначала квота RPM/TPM, потом слот параллелизма — не держим слот в очереди за квотой
+    rate_limiter = get_rate_limiter(mdl)
+    est_tokens = 0
+    if rate_limiter:
+        est_tokens = estimate_prompt_tokens(messages)
+        rate_limiter.acquire(est_tokens)
+
     try:
-        from openai import OpenAI
-
-        client = OpenAI(
-            base_url=BASE_URL,
-            api_key=key,
-            timeout=timeout,
-        )
-        resp = client.chat.completions.create(
-            model=mdl,
-            messages=messages,
-        )
-        choice = resp.choices[0] if resp.choices else None
-        if not choice or not choice.message:
-            return ""
-        return choice.message.content or ""
+        with get_limiter().track():
+            client = get_client(BASE_URL, key, timeout)
+            with timed_call():
+                resp = client.chat.completions.create(
+                    model=mdl,
+                    messages=messages,
+                    **(params or {}),
+                )
     except Exception:
+        # Запрос не дошёл до модели (или отклонён) — вернуть оценку в TPM: повтор займёт её снова
+        if rate_limiter:
+            rate_limiter.correct(est_tokens, 0)
         raise
-    finally:
-        sem.release()
+    if rate_limiter:
+        usage = getattr(resp, "usage", None)
+        rate_limiter.correct(est_tokens, getattr(usage, "total_tokens", None))
+    choice = resp.choices[0] if resp.choices else None
+    if not choice or not choice.message:
+        return ""
+    return choice.message.content or ""
 
 
 def summarize_chunk(text: str, system_prompt: str | None = None) -> str:
@@ -82,17 +108,28 @@ def summarize_chunk(text: str, system_prompt: str | None = None) -> str:
 def chat_cached(
     messages: list[dict[str, str]],
     model: str | None = None,
+    *,
+    template: str = "",
+    params: dict[str, Any] | None = None,
 ) -> str:
-    """Chat с кешем по hash(prompt + text + model)."""
-    from src.config import OPENROUTER_MODEL
+    """
+    Chat с кешем по каноническому ключу (src.llm.cache_key): шаблон промпта
+    с версией (prompt_id), модель, параметры генерации, нормализованные сообщения.
+    Одинаковые одновременные запросы (промах кеша) ждут один вызов chat().
+    """
+    from src.llm.cache_key import make_cache_key, template_stage
     from src.storage.cache import get_llm_cache, set_llm_cache
 
     mdl = model or OPENROUTER_MODEL or "google/gemini-flash-1.5"
-    key = str(messages)
-    text = messages[-1].get("content", "") if messages else ""
-    cached = get_llm_cache(key, text, mdl)
+    key = make_cache_key(messages, mdl, template, params)
+    stage = template_stage(template)
+    cached = get_llm_cache(key, stage)
     if cached is not None:
         return cached
-    out = chat(messages, model=mdl)
-    set_llm_cache(key, text, mdl, out)
-    return out
+
+    def call() -> str:
+        out = chat(messages, model=mdl, params=params)
+        set_llm_cache(key, out, mdl, stage)
+        return out
+
+    return _inflight.do(key, call)
@@ -0,0 +1,160 @@
+"""Адаптивный лимит параллелизма LLM (AIMD) по 429/5xx и латентности."""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from src.llm.retry import RETRY_CODES, _is_retryable, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DECREASE_FACTOR = 0.5
+
+
+class _AIMD:
+    """
+    Состояние AIMD: успешный ответ быстрее latency_target → limit += 1/limit
+    (≈ +1 за «круг» запросов), 429/5xx → limit *= decrease_factor
+    не чаще раза за окно, Retry-After → пауза для всех новых запросов.
+    Методы вызываются под блокировкой наследника.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_target: float = 20.0,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _wait_time(self, now: float) -> float | None:
+        """0 — можно занять слот; >0 — пауза по Retry-After; None — ждать освобождения."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight < self.limit:
+            return 0.0
+        return None
+
+    def _on_success(self, latency: float) -> None:
+        self._latency_ewma = latency if not self._latency_ewma else 0.8 * self._latency_ewma + 0.2 * latency
+        if latency <= self.latency_target and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _on_overload(self, retry_after: float | None, now: float) -> None:
+        # Одна волна 429 от запросов, ушедших одновременно, — одно уменьшение
+        window = max(1.0, self._latency_ewma)
+        if now - self._last_decrease >= window:
+            old = self._limit
+            self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+            self._last_decrease = now
+            logger.info("LLM concurrency %.1f → %.1f", old, self._limit)
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "latency_ewma": round(self._latency_ewma, 3),
+        }
+
+
+class AdaptiveLimiter(_AIMD):
+    """Потокобезопасный AIMD-лимитер — замена threading.Semaphore."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._wait_time(time.monotonic())
+                if wait == 0.0:
+                    self._in_flight += 1
+                    return
+                self._cond.wait(timeout=wait)
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Занять слот на время запроса и сообщить контроллеру исход."""
+        self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if _is_retryable(e, RETRY_CODES):
+                with self._cond:
+                    self._on_overload(retry_after_seconds(e), time.monotonic())
+            raise
+        else:
+            with self._cond:
+                self._on_success(time.monotonic() - start)
+        finally:
+            self.release()
+
+
+class AsyncAdaptiveLimiter(_AIMD):
+    """AIMD-лимитер для asyncio — замена asyncio.Semaphore (один на event loop)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            while True:
+                wait = self._wait_time(time.monotonic())
+                if wait == 0.0:
+                    self._in_flight += 1
+                    return
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """Занять слот на время запроса и сообщить контроллеру исход."""
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if _is_retryable(e, RETRY_CODES):
+                self._on_overload(retry_after_seconds(e), time.monotonic())
+            raise
+        else:
+            self._on_success(time.monotonic() - start)
+        finally:
+            await self.release()
@@ -0,0 +1,101 @@
+"""Метрики клиента LLM: латентность каждого HTTP-вызова, ошибки и повторы — для нагрузочных прогонов."""
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator
+
+SAMPLE_SIZE = 10_000  # латентностей для перцентилей: дальше — равномерная выборка (reservoir sampling)
+
+_lock = Lock()
+_latencies: list[float] = []  # не больше SAMPLE_SIZE значений
+_calls = 0
+_latency_sum = 0.0
+_latency_max = 0.0
+_rnd = random.Random(0)
+_errors: Counter = Counter()  # код ответа (или тип исключения) → число
+_retries: Counter = Counter()
+
+
+def _code(e: Exception) -> str:
+    code = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    return str(code) if code else type(e).__name__
+
+
+def _record(elapsed: float) -> None:
+    """Учесть латентность (под _lock): счётчики — точные, перцентили — по выборке из SAMPLE_SIZE."""
+    global _calls, _latency_sum, _latency_max
+    _calls += 1
+    _latency_sum += elapsed
+    _latency_max = max(_latency_max, elapsed)
+    if len(_latencies) < SAMPLE_SIZE:
+        _latencies.append(elapsed)
+    else:
+        k = _rnd.randrange(_calls)
+        if k < SAMPLE_SIZE:
+            _latencies[k] = elapsed
+
+
+@contextmanager
+def timed_call() -> Iterator[None]:
+    """Замерить один вызов API (попытку, не считая повторов); работает и вокруг await."""
+    started = time.monotonic()
+    try:
+        yield
+    except Exception as e:
+        elapsed = time.monotonic() - started
+        with _lock:
+            _record(elapsed)
+            _errors[_code(e)] += 1
+        raise
+    elapsed = time.monotonic() - started
+    with _lock:
+        _record(elapsed)
+
+
+def record_retry(code: int | None) -> None:
+    """Учесть повтор запроса (из src.llm.retry)."""
+    with _lock:
+        _retries[str(code) if code else "other"] += 1
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def call_metrics() -> dict:
+    """
+    Сводка с начала процесса (или reset_call_metrics): calls, errors/retries по кодам,
+    латентность попытки — mean, p50, p95, p99, max (сек). Перцентили — по выборке
+    из SAMPLE_SIZE вызовов, calls, mean и max — по всем.
+    """
+    with _lock:
+        values = sorted(_latencies)
+        calls, total, top = _calls, _latency_sum, _latency_max
+        errors = dict(_errors)
+        retries = dict(_retries)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "retries": retries,
+        "retries_total": sum(retries.values()),
+        "latency_mean": total / calls if calls else 0.0,
+        "latency_p50": _percentile(values, 50),
+        "latency_p95": _percentile(values, 95),
+        "latency_p99": _percentile(values, 99),
+        "latency_max": top,
+    }
+
+
+def reset_call_metrics() -> None:
+    """Обнулить метрики."""
+    global _calls, _latency_sum, _latency_max
+    with _lock:
+        _latencies.clear()
+        _calls, _latency_sum, _latency_max = 0, 0.0, 0.0
+        _errors.clear()
+        _retries.clear()
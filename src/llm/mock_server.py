@@ -0,0 +1,205 @@
+"""
+Локальный OpenAI-совместимый mock (POST /v1/chat/completions) для нагрузочных прогонов без сети и квоты:
+распределение задержки, скорость «генерации», доля 429/5xx с Retry-After.
+Запуск: python -m src.llm.mock_server --port 8089; клиент — LLM_BASE_URL=http://127.0.0.1:8089/v1
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_DISTS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class MockConfig:
+    """Поведение mock-сервера."""
+
+    latency: float = 0.5  # базовая задержка ответа, с (медиана для lognormal)
+    latency_dist: str = "lognormal"  # fixed | uniform | exponential | lognormal
+    jitter: float = 0.5  # разброс: sigma для lognormal, ±доля для uniform
+    tokens_per_sec: float = 200.0  # скорость генерации completion (0 — мгновенно)
+    completion_tokens: int = 150  # длина ответа, токенов (~слов)
+    error_429: float = 0.0  # доля ответов 429
+    error_5xx: float = 0.0  # доля ответов 500/502/503
+    retry_after: float | None = 1.0  # Retry-After у 429/503, с (None — без заголовка)
+    seed: int | None = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, как у OpenRouter
+
+    def log_message(self, format, *args):  # noqa: A002 — без access-лога в stderr
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"not found: {self.path}"}})
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"error": {"message": "invalid JSON"}})
+            return
+        status, payload, headers = self.server.respond(request)
+        self._send(status, payload, headers)
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class MockServer(ThreadingHTTPServer):
+    """Mock chat completions; stats — число ответов по кодам. Как контекстный менеджер — в фоновом потоке."""
+
+    daemon_threads = True
+
+    def __init__(self, config: MockConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or MockConfig()
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _rand(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _latency(self) -> float:
+        cfg = self.config
+        with self._lock:
+            r = self._random
+            if cfg.latency_dist == "uniform":
+                return max(0.0, cfg.latency * (1 + r.uniform(-cfg.jitter, cfg.jitter)))
+            if cfg.latency_dist == "exponential":
+                return r.expovariate(1 / cfg.latency) if cfg.latency > 0 else 0.0
+            if cfg.latency_dist == "lognormal":
+                return cfg.latency * math.exp(r.gauss(0, cfg.jitter))
+            return cfg.latency
+
+    def _error(self) -> tuple[int, dict, dict] | None:
+        cfg = self.config
+        r = self._rand()
+        if r < cfg.error_429:
+            status = 429
+        elif r < cfg.error_429 + cfg.error_5xx:
+            status = (500, 502, 503)[int(self._rand() * 3)]
+        else:
+            return None
+        headers = {}
+        if cfg.retry_after is not None and status in (429, 503):
+            headers["Retry-After"] = f"{cfg.retry_after:g}"
+        return status, {"error": {"message": f"mock error {status}", "code": status}}, headers
+
+    def respond(self, request: dict) -> tuple[int, dict, dict]:
+        """Ответ на запрос chat completions: (статус, тело, заголовки). Задержка — здесь же."""
+        cfg = self.config
+        time.sleep(self._latency())
+        error = self._error()
+        if error is not None:
+            self._count(error[0])
+            return error
+        messages = request.get("messages") or []
+        prompt = " ".join(str(m.get("content") or "") for m in messages)
+        completion = min(cfg.completion_tokens, int(request.get("max_tokens") or cfg.completion_tokens))
+        if cfg.tokens_per_sec > 0:
+            time.sleep(completion / cfg.tokens_per_sec)
+        # Ответ детерминирован по запросу: начало последнего сообщения, ~completion слов
+        words = (str(messages[-1].get("content") or "") if messages else "").split()
+        content = "Mock: " + " ".join(words[:completion])
+        prompt_tokens = len(prompt) // 4
+        self._count(200)
+        return 200, {
+            "id": f"mock-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion,
+                "total_tokens": prompt_tokens + completion,
+            },
+        }, {}
+
+    def _count(self, status: int) -> None:
+        with self._lock:
+            self.stats[status] += 1
+
+    def __enter__(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def add_mock_args(parser: argparse.ArgumentParser) -> None:
+    """Аргументы MockConfig — общие для сервера и loadtest.py."""
+    parser.add_argument("--latency", type=float, default=0.5, help="Базовая задержка ответа, с")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTS, default="lognormal", help="Распределение задержки")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Разброс задержки")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0, help="Скорость генерации, токенов/с")
+    parser.add_argument("--completion-tokens", type=int, default=150, help="Длина ответа, токенов")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Доля ответов 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Доля ответов 5xx")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After у 429/503, с (<0 — без заголовка)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed случайностей")
+
+
+def mock_config(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        latency_dist=args.latency_dist,
+        jitter=args.jitter,
+        tokens_per_sec=args.tokens_per_sec,
+        completion_tokens=args.completion_tokens,
+        error_429=args.error_429,
+        error_5xx=args.error_5xx,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock OpenAI-совместимого API (chat completions)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_mock_args(parser)
+    args = parser.parse_args()
+    server = MockServer(mock_config(args), args.host, args.port)
+    print(f"Mock LLM: {server.base_url} (LLM_BASE_URL), Ctrl-C — остановить")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Ответы:", dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
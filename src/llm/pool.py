@@ -0,0 +1,127 @@
+"""Реестр клиентов OpenAI: один keep-alive пул соединений на (base_url, api_key, timeout)."""
+import asyncio
+import logging
+from threading import Lock
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from src.config import LLM_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+_lock = Lock()
+_clients: dict[tuple[str, str, float], Any] = {}
+# httpx.AsyncClient привязан к event loop — отдельный реестр на каждый loop
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str, float], Any]]" = (
+    WeakKeyDictionary()
+)
+_stats = {"requests": 0, "new_connections": 0}
+
+
+def _count(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def _trace(event_name: str, info: dict) -> None:
+    # httpcore вызывает trace на каждом шаге; connect_tcp — только для нового соединения
+    if event_name == "connection.connect_tcp.complete":
+        _count("new_connections")
+
+
+async def _atrace(event_name: str, info: dict) -> None:
+    _trace(event_name, info)
+
+
+def _on_request(request) -> None:
+    _count("requests")
+    request.extensions["trace"] = _trace
+
+
+async def _aon_request(request) -> None:
+    _count("requests")
+    request.extensions["trace"] = _atrace
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=LLM_POOL_SIZE,
+        max_keepalive_connections=LLM_POOL_SIZE,
+        keepalive_expiry=60.0,
+    )
+
+
+def get_client(base_url: str, api_key: str, timeout: float):
+    """
+    OpenAI-клиент из реестра процесса. httpx.Client потокобезопасен,
+    поэтому один клиент делится всеми рабочими потоками.
+    """
+    key = (base_url, api_key, timeout)
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    from openai import DefaultHttpxClient, OpenAI
+
+    http_client = DefaultHttpxClient(
+        limits=_limits(),
+        timeout=timeout,
+        event_hooks={"request": [_on_request]},
+    )
+    # Повторы делает with_retry: 429 должны доходить до AIMD-лимитера
+    client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0, http_client=http_client)
+    with _lock:
+        # Другой поток мог успеть создать клиент — берём его, свой закрываем
+        existing = _clients.setdefault(key, client)
+    if existing is not client:
+        client.close()
+    return existing
+
+
+def get_async_client(base_url: str, api_key: str, timeout: float):
+    """AsyncOpenAI-клиент из реестра текущего event loop."""
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    key = (base_url, api_key, timeout)
+    client = clients.get(key)
+    if client is None:
+        http_client = DefaultAsyncHttpxClient(
+            limits=_limits(),
+            timeout=timeout,
+            event_hooks={"request": [_aon_request]},
+        )
+        client = AsyncOpenAI(
+            base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0, http_client=http_client
+        )
+        clients[key] = client
+    return client
+
+
+def pool_stats() -> dict[str, int]:
+    """Счётчики: запросы, новые соединения, переиспользованные соединения, клиенты."""
+    with _lock:
+        requests = _stats["requests"]
+        new = _stats["new_connections"]
+        return {
+            "requests": requests,
+            "new_connections": new,
+            "reused_connections": max(0, requests - new),
+            "clients": len(_clients),
+        }
+
+
+def close_clients() -> None:
+    """Закрыть все синхронные клиенты (соединения пула)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug("close client: %s", e)
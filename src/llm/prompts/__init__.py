@@ -3,6 +3,15 @@ from pathlib import Path
 
 _PROMPTS_DIR = Path(__file__).resolve().parent
 
+# Версия шаблона входит в ключ кеша LLM: поменяли смысл <name>.txt — поднимите версию.
+# Правки пробелов/переносов ключ не меняют (сообщения нормализуются).
+PROMPT_VERSIONS = {
+    "chunk": 1,
+    "doc": 1,
+    "folder": 1,
+    "global": 1,
+}
+
 
 def load_prompt(name: str) -> str:
     """Загрузить промпт из файла."""
@@ -10,3 +19,8 @@ def load_prompt(name: str) -> str:
     if path.exists():
         return path.read_text(encoding="utf-8").strip()
     return ""
+
+
+def prompt_id(name: str) -> str:
+    """Идентификатор шаблона для ключа кеша: "<name>@<версия>"."""
+    return f"{name}@{PROMPT_VERSIONS.get(name, 1)}"
@@ -0,0 +1,99 @@
+"""Лимиты RPM/TPM на модель — token bucket, вызовы ждут квоту вместо 429."""
+import asyncio
+import time
+from threading import Lock
+
+from src.config import RATE_LIMITS
+
+
+class TokenBucket:
+    """
+    Ведро на per_minute единиц, пополнение равномерно.
+    reserve() списывает сразу (можно уйти в долг) и возвращает, сколько ждать, —
+    так очередь обслуживается по порядку без опроса.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self._tokens -= amount
+        return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, delta: float, now: float) -> None:
+        """Поправка после факта: delta > 0 — потрачено больше оценки, < 0 — вернуть."""
+        self._refill(now)
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class ModelRateLimiter:
+    """Пара ведер RPM + TPM одной модели."""
+
+    def __init__(self, rpm: int | None = None, tpm: int | None = None):
+        self._rpm = TokenBucket(rpm) if rpm else None
+        self._tpm = TokenBucket(tpm) if tpm else None
+        self._lock = Lock()
+
+    def _tpm_amount(self, tokens: int) -> float:
+        """Сколько списывать с TPM: запрос больше минутного бюджета всё равно должен пройти."""
+        return min(tokens, self._tpm.capacity) if self._tpm else 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            wait = 0.0
+            if self._rpm:
+                wait = max(wait, self._rpm.reserve(1, now))
+            if self._tpm:
+                wait = max(wait, self._tpm.reserve(self._tpm_amount(tokens), now))
+            return wait
+
+    def acquire(self, tokens: int) -> None:
+        """Занять квоту под запрос ~tokens токенов, при нехватке — подождать."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def correct(self, estimated: int, actual: int | None) -> None:
+        """
+        Скорректировать TPM по usage ответа: разница с тем, что acquire действительно
+        списал (оценка, урезанная до минутного бюджета), с тем же ограничением для факта.
+        """
+        if not self._tpm or actual is None:
+            return
+        with self._lock:
+            self._tpm.adjust(self._tpm_amount(actual) - self._tpm_amount(estimated), time.monotonic())
+
+
+_limiters: dict[str, ModelRateLimiter | None] = {}
+_lock = Lock()
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter | None:
+    """Лимитер модели из config.yaml (rate_limits.<model> или rate_limits.default), None — без лимита."""
+    with _lock:
+        if model not in _limiters:
+            cfg = RATE_LIMITS.get(model) or RATE_LIMITS.get("default") or {}
+            rpm, tpm = cfg.get("rpm"), cfg.get("tpm")
+            _limiters[model] = ModelRateLimiter(rpm=rpm, tpm=tpm) if (rpm or tpm) else None
+        return _limiters[model]
+
+
+def estimate_prompt_tokens(messages: list[dict[str, str]], model: str = "gpt-4") -> int:
+    """Оценка токенов промпта до отправки (+4 на служебные токены сообщения)."""
+    from src.chunking.tokenizer import estimate_tokens
+
+    return sum(estimate_tokens(m.get("content", ""), model) + 4 for m in messages)
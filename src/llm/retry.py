@@ -1,18 +1,72 @@
-"""Retry при 429/500 с exponential backoff."""
+"""Retry при 429/5xx: exponential backoff с jitter, учёт Retry-After."""
+import asyncio
 import functools
 import logging
+import random
 import time
-from typing import Any, Callable, TypeVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, TypeVar
+
+from src.llm.metrics import record_retry
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
-RETRY_CODES = (429, 500, 502, 503)
+RETRY_CODES = (429, 500, 502, 503, 504)
 DEFAULT_MAX_RETRIES = 3
 DEFAULT_INITIAL_DELAY = 1.0
 DEFAULT_BACKOFF_FACTOR = 2.0
 
 
+def _status_code(e: Exception) -> int | None:
+    """HTTP-код из исключения OpenAI/httpx, если есть."""
+    return getattr(e, "status_code", None) or getattr(
+        getattr(e, "response", None), "status_code", None
+    ) or getattr(e, "code", None)
+
+
+def _is_retryable(e: Exception, retry_codes: tuple[int, ...]) -> bool:
+    """Повторять ли запрос после ошибки: 429/5xx или упоминание rate limit."""
+    return (
+        _status_code(e) in retry_codes
+        or "429" in str(e)
+        or "500" in str(e)
+        or "rate" in str(e).lower()
+    )
+
+
+def retry_after_seconds(e: Exception) -> float | None:
+    """Задержка из заголовков Retry-After / retry-after-ms ответа, если сервер её прислал."""
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(e: Exception, delay: float) -> float:
+    """Пауза перед повтором: Retry-After (если есть) или backoff; плюс jitter против синхронных волн."""
+    retry_after = retry_after_seconds(e)
+    if retry_after is not None:
+        return retry_after + random.uniform(0, min(delay, 1.0))
+    return random.uniform(delay / 2, delay)
+
+
 def with_retry(
     max_retries: int = DEFAULT_MAX_RETRIES,
     initial_delay: float = DEFAULT_INITIAL_DELAY,
@@ -31,30 +85,59 @@ def with_retry(
                     return func(*args, **kwargs)
                 except Exception as e:
                     last_err = e
-                    if attempt == max_retries:
+                    if attempt == max_retries or not _is_retryable(e, retry_codes):
                         raise
-                    code = getattr(e, "status_code", None) or getattr(
-                        getattr(e, "response", None), "status_code", None
-                    ) or getattr(e, "code", None)
-                    retryable = (
-                        code in retry_codes
-                        or "429" in str(e)
-                        or "500" in str(e)
-                        or "rate" in str(e).lower()
+                    wait = _retry_delay(e, delay)
+                    record_retry(_status_code(e))
+                    logger.warning(
+                        "Retry %s/%s after %.1fs (code=%s): %s",
+                        attempt + 1,
+                        max_retries,
+                        wait,
+                        _status_code(e),
+                        e,
                     )
-                    if retryable:
-                        logger.warning(
-                            "Retry %s/%s after %s (code=%s): %s",
-                            attempt + 1,
-                            max_retries,
-                            delay,
-                            code,
-                            e,
-                        )
-                        time.sleep(delay)
-                        delay *= backoff_factor
-                    else:
+                    time.sleep(wait)
+                    delay *= backoff_factor
+            raise last_err or RuntimeError("Retry failed")
+
+        return wrapper
+
+    return decorator
+
+
+def with_async_retry(
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    retry_codes: tuple[int, ...] = RETRY_CODES,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Декоратор для корутин: то же, что with_retry, но ждёт через asyncio.sleep."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            delay = initial_delay
+            last_err: Exception | None = None
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    last_err = e
+                    if attempt == max_retries or not _is_retryable(e, retry_codes):
                         raise
+                    wait = _retry_delay(e, delay)
+                    record_retry(_status_code(e))
+                    logger.warning(
+                        "Retry %s/%s after %.1fs (code=%s): %s",
+                        attempt + 1,
+                        max_retries,
+                        wait,
+                        _status_code(e),
+                        e,
+                    )
+                    await asyncio.sleep(wait)
+                    delay *= backoff_factor
             raise last_err or RuntimeError("Retry failed")
 
         return wrapper
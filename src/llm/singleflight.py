@@ -0,0 +1,55 @@
+"""Single-flight: одновременные вызовы с одним ключом ждут один результат."""
+import asyncio
+from concurrent.futures import Future
+from threading import Lock
+from typing import Awaitable, Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Для потоков: первый вызов с ключом выполняет fn, остальные ждут его результат."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._calls[key] = fut
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """Для asyncio: общая задача на ключ в рамках event loop; отмена ожидающего её не отменяет."""
+
+    def __init__(self):
+        self._tasks: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]]" = (
+            WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            tasks[key] = task
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+        return await asyncio.shield(task)
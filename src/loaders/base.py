@@ -1,6 +1,7 @@
 """Базовый интерфейс loader — извлечение текста из файла."""
 from pathlib import Path
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 def normalize_text(text: str) -> str:
@@ -19,6 +20,7 @@ class BaseLoader(ABC):
 
     extensions: tuple[str, ...] = ()
     mime_types: tuple[str, ...] = ()
+    version: int = 1  # увеличить при изменении извлечения — кеш текстов пересчитается
 
     @abstractmethod
     def load(self, path: Path) -> str:
@@ -28,3 +30,12 @@ class BaseLoader(ABC):
     def load_normalized(self, path: Path) -> str:
         """Извлечь и нормализовать текст."""
         return normalize_text(self.load(path))
+
+    def iter_text(self, path: Path) -> Iterator[str]:
+        """
+        Текст по фрагментам (страницы, разделы) для потокового chunking.
+        Фрагменты склеиваются через "\n". По умолчанию — один фрагмент load().
+        """
+        text = self.load(path)
+        if text:
+            yield text
@@ -1,8 +1,8 @@
 """Фабрика loaders — регистр по расширению, легко добавить новый формат."""
 from pathlib import Path
-from typing import Type
+from typing import Iterator, Type
 
-from src.loaders.base import BaseLoader
+from src.loaders.base import BaseLoader, normalize_text
 from src.loaders.pdf_loader import PDFLoader
 from src.loaders.docx_loader import DOCXLoader
 from src.loaders.txt_loader import TXTLoader
@@ -38,6 +38,18 @@ def load_text(path: Path | str) -> str:
     return ""
 
 
+def iter_text(path: Path | str) -> Iterator[str]:
+    """Нормализованный текст по фрагментам (страницам) — для iter_chunks."""
+    p = Path(path)
+    loader = get_loader(p)
+    if not loader:
+        return
+    for frag in loader.iter_text(p):
+        frag = normalize_text(frag)
+        if frag:
+            yield frag
+
+
 def register_loader(extensions: tuple[str, ...], loader_cls: Type[BaseLoader]) -> None:
     """Добавить новый loader. Пример: register_loader(('.pptx',), PPTXLoader)"""
     loader = loader_cls()
@@ -0,0 +1,187 @@
+"""Параллельное извлечение текста по файлам в пуле процессов (парсинг PDF/DOCX — CPU-bound)."""
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Iterator
+
+from src.config import EXTRACT_TIMEOUT, EXTRACT_WORKERS
+from src.loaders.factory import load_text
+from src.loaders.pdf_loader import LargePdf, large_pdf_pages, load_large_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def extract_worker(path: str, defer_large: bool = False) -> str | LargePdf:
+    """
+    Точка входа воркера (должна быть на уровне модуля для pickle).
+    defer_large — воркер пула: большой PDF не извлекать здесь (daemon-процесс не может
+    делить его по процессам), а вернуть LargePdf — родитель вызовет load_large_pdf.
+    """
+    if defer_large:
+        pages = large_pdf_pages(path)
+        if pages:
+            return LargePdf(pages)
+    return load_text(path)
+
+
+def extract_many(
+    paths: list[Path],
+    workers: int | None = None,
+    timeout: float | None = None,
+) -> Iterator[tuple[int, str | None, str | None]]:
+    """
+    Извлечь текст из файлов параллельно, выдавая (index, text, None) или
+    (index, None, причина) по мере готовности.
+    timeout — лимит на файл, сек: зависший PDF помечается ошибкой и не блокирует остальные.
+    Большие PDF воркер пула только распознаёт (LargePdf); извлекаются они после пула,
+    в текущем процессе: PDFLoader сам делит их по страницам между процессами
+    (воркеры пула — daemon и не могут порождать свои). Главный процесс PDF не открывает.
+    """
+    workers = workers or EXTRACT_WORKERS or os.cpu_count() or 1
+    timeout = EXTRACT_TIMEOUT if timeout is None else timeout
+    pending = deque(enumerate(paths))
+    if workers <= 1 or len(pending) <= 1:
+        for i, p in pending:
+            try:
+                yield i, extract_worker(str(p)), None
+            except Exception as e:
+                yield i, None, str(e)
+        return
+
+    # spawn — пул создаётся рядом с живыми потоками LLM, fork здесь небезопасен
+    ctx = mp.get_context("spawn")
+    done: "queue.Queue[tuple[int, str | None, str | None]]" = queue.Queue()
+    running: dict[int, float] = {}  # index → дедлайн
+    timed_out: set[int] = set()  # эти задачи всё ещё занимают воркер
+    large: list[tuple[int, int]] = []  # (index, страниц) — извлекаются после пула
+    pool = ctx.Pool(workers)
+    try:
+        while pending or running:
+            while pending and len(running) + len(timed_out) < workers:
+                i, p = pending.popleft()
+                pool.apply_async(
+                    extract_worker,
+                    (str(p), True),
+                    callback=lambda text, i=i: done.put((i, text, None)),
+                    error_callback=lambda e, i=i: done.put((i, None, str(e) or type(e).__name__)),
+                )
+                running[i] = time.monotonic() + timeout if timeout else float("inf")
+
+            wait = min(running.values()) - time.monotonic()
+            try:
+                i, text, reason = done.get(timeout=max(0.0, wait) if wait != float("inf") else None)
+            except queue.Empty:
+                now = time.monotonic()
+                for i, deadline in list(running.items()):
+                    if deadline <= now:
+                        del running[i]
+                        timed_out.add(i)
+                        yield i, None, f"таймаут извлечения ({timeout:.0f} с)"
+                if len(timed_out) >= workers:
+                    # Все воркеры заняты зависшими файлами — пересоздать пул
+                    logger.warning("Все воркеры извлечения зависли, перезапуск пула")
+                    pool.terminate()
+                    pool = ctx.Pool(workers)
+                    timed_out.clear()
+                continue
+
+            if i in timed_out:
+                timed_out.discard(i)  # поздний результат: воркер освободился
+                continue
+            if running.pop(i, None) is None:
+                continue
+            if isinstance(text, LargePdf):
+                large.append((i, text.pages))
+            else:
+                yield i, text, reason
+    finally:
+        pool.terminate()
+        pool.join()
+
+    for i, pages in large:
+        try:
+            yield i, load_large_pdf(paths[i], pages), None
+        except Exception as e:
+            yield i, None, str(e)
+
+
+class ExtractPool:
+    """
+    Пул процессов извлечения, общий для нескольких потоков (run --stream): extract(path)
+    из любого потока, как extract_many — таймаут на файл и перезапуск пула, когда все
+    воркеры заняты зависшими файлами.
+    Задача отправляется, только когда есть свободный воркер (зависший держит свой слот
+    до позднего ответа или перезапуска), поэтому таймаут считается от начала работы
+    над файлом, а не от постановки в очередь пула.
+    Большие PDF (LargePdf от воркера) извлекаются по одному: каждый поднимает свой пул по страницам.
+    """
+
+    def __init__(self, workers: int | None = None, timeout: float | None = None):
+        self.workers = workers or EXTRACT_WORKERS or os.cpu_count() or 1
+        self.timeout = EXTRACT_TIMEOUT if timeout is None else timeout
+        # spawn — пул создаётся рядом с живыми потоками LLM, fork здесь небезопасен
+        self._ctx = mp.get_context("spawn")
+        self._pool = self._ctx.Pool(self.workers)
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(self.workers)  # свободные воркеры
+        self._running: set[object] = set()  # задачи, держащие слот
+        self._stuck: set[object] = set()  # из них — после таймаута
+        self._large = threading.Semaphore(1)
+
+    def _finished(self, task: object) -> None:
+        """Воркер освободился (ответ пула, в том числе поздний после таймаута)."""
+        with self._lock:
+            if task not in self._running:
+                return  # пул уже перезапущен, слот возвращён
+            self._running.discard(task)
+            self._stuck.discard(task)
+        self._slots.release()
+
+    def _timed_out(self, task: object) -> None:
+        with self._lock:
+            if task not in self._running:
+                return  # ответ пришёл одновременно с таймаутом
+            self._stuck.add(task)
+            if len(self._stuck) < self.workers:
+                return
+            # Все воркеры заняты зависшими файлами — пересоздать пул
+            logger.warning("Все воркеры извлечения зависли, перезапуск пула")
+            self._pool.terminate()
+            self._pool = self._ctx.Pool(self.workers)
+            freed = len(self._running)
+            self._running.clear()
+            self._stuck.clear()
+        for _ in range(freed):
+            self._slots.release()
+
+    def extract(self, path: str) -> str:
+        """Текст файла; зависший дольше timeout — TimeoutError, ошибка парсинга — исключение воркера."""
+        self._slots.acquire()
+        task = object()
+        with self._lock:
+            self._running.add(task)
+            result = self._pool.apply_async(
+                extract_worker,
+                (path, True),
+                callback=lambda _: self._finished(task),
+                error_callback=lambda _: self._finished(task),
+            )
+        try:
+            text = result.get(timeout=self.timeout or None)
+        except mp.TimeoutError:
+            self._timed_out(task)
+            raise TimeoutError(f"таймаут извлечения ({self.timeout:.0f} с)") from None
+        if isinstance(text, LargePdf):
+            with self._large:
+                text = load_large_pdf(path, text.pages)
+        return text
+
+    def close(self) -> None:
+        with self._lock:
+            self._pool.terminate()
+            self._pool.join()
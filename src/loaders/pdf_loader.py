@@ -1,22 +1,162 @@
 """PDF loader — извлечение текста через pypdf."""
+import hashlib
+import logging
+import multiprocessing as mp
+import os
+import shutil
 from pathlib import Path
+from typing import Iterator, NamedTuple
 
+from src.config import CACHE_TEXTS, EXTRACT_TIMEOUT, EXTRACT_WORKERS, PDF_PAGES_PER_SHARD, PDF_SHARD_MIN_PAGES
 from src.loaders.base import BaseLoader, normalize_text
 
+logger = logging.getLogger(__name__)
+
+
+def _has_text_layer(page) -> bool:
+    """
+    Дешёвая проверка до extract_text: без шрифтов (и form XObject) на странице
+    текста нет — типичный скан-картинка.
+    """
+    try:
+        res = page.get("/Resources")
+        res = res.get_object() if res is not None else None
+        if not res:
+            return False
+        if res.get("/Font"):
+            return True
+        xobjects = res.get("/XObject")
+        xobjects = xobjects.get_object() if xobjects is not None else {}
+        return any(x.get_object().get("/Subtype") == "/Form" for x in xobjects.values())
+    except Exception:
+        return True
+
+
+def _page_text(page) -> str:
+    return (page.extract_text() or "") if _has_text_layer(page) else ""
+
+
+def _page_cache_dir(path: Path) -> Path:
+    """Кеш страниц файла: ключ — путь, размер и mtime (файл изменился → новый каталог)."""
+    st = path.stat()
+    key = hashlib.sha256(f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()[:32]
+    return CACHE_TEXTS / "pages" / key
+
+
+def _page_file(cache_dir: Path, i: int) -> Path:
+    return cache_dir / f"{i:06d}.txt"
+
+
+def _extract_shard(args: tuple[str, str, list[int]]) -> int:
+    """Воркер: извлечь страницы в кеш (каждая — отдельный файл, атомарно)."""
+    from pypdf import PdfReader
+
+    path, cache_dir, pages = args
+    reader = PdfReader(path)
+    for i in pages:
+        out = _page_file(Path(cache_dir), i)
+        tmp = out.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(_page_text(reader.pages[i]), encoding="utf-8")
+        os.replace(tmp, out)
+    return len(pages)
+
+
+class LargePdf(NamedTuple):
+    """Ответ воркера извлечения: PDF большой — делить по страницам между процессами должен родитель."""
+
+    pages: int
+
+
+def large_pdf_pages(path: Path | str) -> int:
+    """
+    Число страниц, если PDF будет делиться на диапазоны (>= pdf_shard_min_pages), иначе 0.
+    Открывает PDF — вызывать в воркере пула, а не в главном процессе.
+    """
+    path = Path(path)
+    try:
+        # Файл меньше 1 МБ не бывает на сотни страниц с текстом — не открываем
+        if path.suffix.lower() != ".pdf" or path.stat().st_size < (1 << 20):
+            return 0
+        from pypdf import PdfReader
+        pages = len(PdfReader(str(path)).pages)
+        return pages if pages >= PDF_SHARD_MIN_PAGES else 0
+    except Exception:
+        return 0
+
+
+def load_large_pdf(path: Path | str, pages: int) -> str:
+    """Текст большого PDF с делением страниц по процессам (число страниц — из LargePdf воркера)."""
+    try:
+        return PDFLoader()._load_sharded(Path(path), pages)
+    except Exception as e:
+        logger.debug("PDF %s: %s", path, e)
+        return ""
+
 
 class PDFLoader(BaseLoader):
     extensions = (".pdf",)
     mime_types = ("application/pdf",)
+    version = 2  # пропуск страниц без текстового слоя
 
     def load(self, path: Path) -> str:
         try:
             from pypdf import PdfReader
             reader = PdfReader(str(path))
+            if len(reader.pages) >= PDF_SHARD_MIN_PAGES:
+                return self._load_sharded(Path(path), len(reader.pages))
             parts = []
             for page in reader.pages:
-                t = page.extract_text()
+                t = _page_text(page)
                 if t:
                     parts.append(t)
             return normalize_text("\n".join(parts))
-        except Exception:
+        except Exception as e:
+            logger.debug("PDF %s: %s", path, e)
             return ""
+
+    def _load_sharded(self, path: Path, n_pages: int) -> str:
+        """
+        Большой PDF: страницы делятся на диапазоны по процессам, текст каждой
+        страницы кешируется — повторный запуск извлекает только недостающие.
+        """
+        cache_dir = _page_cache_dir(path)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        missing = [i for i in range(n_pages) if not _page_file(cache_dir, i).exists()]
+        if missing:
+            shards = [
+                (str(path), str(cache_dir), missing[k : k + PDF_PAGES_PER_SHARD])
+                for k in range(0, len(missing), PDF_PAGES_PER_SHARD)
+            ]
+            workers = min(len(shards), EXTRACT_WORKERS or os.cpu_count() or 1)
+            # Дочерние процессы daemon-пула не могут создавать свои — тогда последовательно
+            if workers <= 1 or mp.current_process().daemon:
+                for shard in shards:
+                    _extract_shard(shard)
+            else:
+                logger.info("PDF %s: %s стр. в %s процессах", path.name, len(missing), workers)
+                with mp.get_context("spawn").Pool(workers) as pool:
+                    it = pool.imap_unordered(_extract_shard, shards)
+                    for _ in shards:
+                        it.next(timeout=EXTRACT_TIMEOUT or None)
+
+        parts = []
+        for i in range(n_pages):
+            t = _page_file(cache_dir, i).read_text(encoding="utf-8")
+            if t:
+                parts.append(t)
+        text = normalize_text("\n".join(parts))
+        # Документ собран — дальше его хранит кеш текстов, постраничный не нужен
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return text
+
+    def iter_text(self, path: Path) -> Iterator[str]:
+        """Текст постранично: в памяти одна страница, а не весь документ."""
+        try:
+            from pypdf import PdfReader
+            reader = PdfReader(str(path))
+            for page in reader.pages:
+                t = normalize_text(_page_text(page))
+                if t:
+                    yield t
+        except Exception as e:
+            logger.debug("PDF %s: %s", path, e)
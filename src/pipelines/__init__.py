@@ -1,7 +1,22 @@
 """Конвейер: chunks → doc → folder → global."""
 
-from src.pipelines.chunk_to_doc import chunks_to_doc_summary
-from src.pipelines.doc_to_folder import docs_to_folder_summary
-from src.pipelines.folder_to_global import folder_to_global_summary
+from src.pipelines.chunk_to_doc import achunks_to_doc_summary, chunks_to_doc_summary
+from src.pipelines.doc_to_folder import adocs_to_folder_summary, docs_to_folder_summary
+from src.pipelines.folder_to_global import afolder_to_global_summary, folder_to_global_summary
+from src.pipelines.folders import asummarize_tree, build_folder_tree, summarize_tree
+from src.pipelines.reduce import areduce_tree, pack_groups, reduce_tree
 
-__all__ = ["chunks_to_doc_summary", "docs_to_folder_summary", "folder_to_global_summary"]
+__all__ = [
+    "achunks_to_doc_summary",
+    "adocs_to_folder_summary",
+    "afolder_to_global_summary",
+    "areduce_tree",
+    "asummarize_tree",
+    "build_folder_tree",
+    "chunks_to_doc_summary",
+    "docs_to_folder_summary",
+    "folder_to_global_summary",
+    "pack_groups",
+    "reduce_tree",
+    "summarize_tree",
+]
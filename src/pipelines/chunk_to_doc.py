@@ -1,30 +1,70 @@
 """Chunks → Doc: свести чанки в саммари документа."""
+import asyncio
+from itertools import islice
+from typing import Iterable
+
 from src.chunking import Chunk
+from src.config import LLM_ASYNC_CONCURRENCY
+from src.llm.async_client import achat_cached
 from src.llm.client import chat_cached
-from src.llm.prompts import load_prompt
+from src.llm.prompts import load_prompt, prompt_id
+from src.pipelines.executor import imap_ordered
+from src.pipelines.reduce import areduce_tree, reduce_tree
 
 
-def chunks_to_doc_summary(chunks: list[Chunk]) -> str:
-    """Свести чанки в краткое саммари документа (5–10 тезисов)."""
-    if not chunks:
-        return ""
-    if len(chunks) == 1:
-        return _summarize_chunk(chunks[0].text)
-    summaries = [_summarize_chunk(c.text) for c in chunks]
-    prompt = load_prompt("doc") or "Объедини саммари в единый документ. 5–10 тезисов. На русском."
-    merged = "\n---\n".join(summaries)
-    messages = [
-        {"role": "system", "content": prompt},
-        {"role": "user", "content": merged[:12000]},
-    ]
-    return chat_cached(messages)
+def chunks_to_doc_summary(chunks: Iterable[Chunk]) -> str:
+    """
+    Свести чанки в краткое саммари документа (5–10 тезисов).
+    Чанки саммаризуются параллельно в общем пуле LLM, порядок сохраняется;
+    саммари чанков сводятся деревом по бюджету токенов (reduce_tree).
+    chunks может быть потоком (iter_chunks): в памяти — только окно чанков в работе.
+    """
+    return reduce_chunk_summaries(list(imap_ordered(summarize_chunk, (c.text for c in chunks))))
+
+
+def reduce_chunk_summaries(summaries: list[str]) -> str:
+    """Саммари чанков (в порядке документа) → саммари документа; один чанк — как есть."""
+    if len(summaries) <= 1:
+        return summaries[0] if summaries else ""
+    return reduce_tree(summaries, _doc_messages, "doc")
+
+
+async def achunks_to_doc_summary(chunks: Iterable[Chunk]) -> str:
+    """
+    Async-вариант chunks_to_doc_summary: чанки идут через asyncio.gather окнами
+    по llm_async_concurrency; поток чанков читается в рабочем потоке (парсинг не блокирует loop).
+    """
+    it = iter(chunks)
+    summaries: list[str] = []
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(it, max(1, LLM_ASYNC_CONCURRENCY))))
+        if not batch:
+            break
+        summaries += await asyncio.gather(
+            *(achat_cached(_chunk_messages(c.text), template=prompt_id("chunk")) for c in batch)
+        )
+    if len(summaries) <= 1:
+        return summaries[0] if summaries else ""
+    return await areduce_tree(summaries, _doc_messages, "doc")
 
 
-def _summarize_chunk(text: str) -> str:
+def summarize_chunk(text: str) -> str:
     """Саммари одного чанка (с кешем)."""
+    return chat_cached(_chunk_messages(text), template=prompt_id("chunk"))
+
+
+def _chunk_messages(text: str) -> list[dict[str, str]]:
     prompt = load_prompt("chunk") or "Извлеки тезисы и факты. Кратко на русском."
-    messages = [
+    return [
         {"role": "system", "content": prompt},
         {"role": "user", "content": text[:15000]},
     ]
-    return chat_cached(messages)
+
+
+def _doc_messages(summaries: list[str]) -> list[dict[str, str]]:
+    prompt = load_prompt("doc") or "Объедини саммари в единый документ. 5–10 тезисов. На русском."
+    merged = "\n---\n".join(summaries)
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": merged},
+    ]
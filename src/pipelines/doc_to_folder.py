@@ -1,19 +1,31 @@
 """Docs → Folder: обобщить саммари документов в саммари папки."""
-from src.llm.client import chat_cached
 from src.llm.prompts import load_prompt
+from src.pipelines.reduce import areduce_tree, reduce_tree
 
 
 def docs_to_folder_summary(doc_summaries: list[str], folder_name: str = "") -> str:
-    """Обобщить саммари документов в саммари папки."""
+    """Обобщить саммари документов в саммари папки (дерево свёрток по бюджету токенов)."""
     if not doc_summaries:
         return ""
     if len(doc_summaries) == 1:
         return doc_summaries[0]
+    return reduce_tree(doc_summaries, lambda group: _folder_messages(group, folder_name), "folder")
+
+
+async def adocs_to_folder_summary(doc_summaries: list[str], folder_name: str = "") -> str:
+    """Async-вариант docs_to_folder_summary."""
+    if not doc_summaries:
+        return ""
+    if len(doc_summaries) == 1:
+        return doc_summaries[0]
+    return await areduce_tree(doc_summaries, lambda group: _folder_messages(group, folder_name), "folder")
+
+
+def _folder_messages(doc_summaries: list[str], folder_name: str) -> list[dict[str, str]]:
     prompt = load_prompt("folder") or "Обобщи саммари документов. Ключевые темы, факты. На русском."
     merged = "\n---\n".join(doc_summaries)
     ctx = f"Папка: {folder_name}\n\n" if folder_name else ""
-    messages = [
+    return [
         {"role": "system", "content": prompt},
-        {"role": "user", "content": ctx + merged[:12000]},
+        {"role": "user", "content": ctx + merged},
     ]
-    return chat_cached(messages)
@@ -0,0 +1,58 @@
+"""Общий пул потоков для map-фазы: LLM-вызовы по чанкам всех документов."""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from src.config import LLM_CONCURRENCY_MAX
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_executor: ThreadPoolExecutor | None = None
+_lock = Lock()
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """
+    Пул потоков для LLM-вызовов, размер = llm_concurrency_max;
+    реальное число запросов в полёте ограничивает AIMD-лимитер в src.llm.client.
+    Задачи в пуле не должны сами ждать задач этого же пула (deadlock).
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, LLM_CONCURRENCY_MAX),
+                thread_name_prefix="llm",
+            )
+        return _executor
+
+
+def map_ordered(func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+    """Параллельный map через общий пул, порядок результатов сохраняется."""
+    items = list(items)
+    if len(items) <= 1:
+        return [func(x) for x in items]
+    return list(get_llm_executor().map(func, items))
+
+
+def imap_ordered(func: Callable[[T], R], items: Iterable[T], window: int | None = None) -> Iterator[R]:
+    """
+    Ленивый map_ordered: items читаются по мере освобождения окна, в работе не больше
+    window задач (по умолчанию 2 × llm_concurrency_max) — память ограничена окном.
+    Прерванный итератор отменяет ещё не начатые задачи.
+    """
+    window = max(1, window or 2 * max(1, LLM_CONCURRENCY_MAX))
+    executor = get_llm_executor()
+    pending: deque[Future] = deque()
+    try:
+        for item in items:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for fut in pending:
+            fut.cancel()
@@ -1,20 +1,40 @@
 """Folder → Global: финальный общий саммари папки."""
-from src.llm.client import chat_cached
 from src.llm.prompts import load_prompt
+from src.pipelines.doc_to_folder import _folder_messages
+from src.pipelines.reduce import areduce_tree, reduce_tree
 
 
 def folder_to_global_summary(folder_summaries: list[str]) -> str:
-    """Финальный общий саммари: Executive Summary, карта тем, ключевые факты."""
+    """
+    Финальный общий саммари: Executive Summary, карта тем, ключевые факты.
+    Много саммари папок — сначала сводятся группами промптом папки, итог — промптом global.
+    """
     if not folder_summaries:
         return ""
     if len(folder_summaries) == 1:
         return folder_summaries[0]
+    return reduce_tree(folder_summaries, _global_messages, "global", _merge_messages, "folder")
+
+
+async def afolder_to_global_summary(folder_summaries: list[str]) -> str:
+    """Async-вариант folder_to_global_summary."""
+    if not folder_summaries:
+        return ""
+    if len(folder_summaries) == 1:
+        return folder_summaries[0]
+    return await areduce_tree(folder_summaries, _global_messages, "global", _merge_messages, "folder")
+
+
+def _global_messages(folder_summaries: list[str]) -> list[dict[str, str]]:
     prompt = load_prompt("global") or (
         "Создай финальное саммари: Executive Summary (1–2 абзаца), карта тем, ключевые факты. На русском."
     )
     merged = "\n---\n".join(folder_summaries)
-    messages = [
+    return [
         {"role": "system", "content": prompt},
-        {"role": "user", "content": merged[:15000]},
+        {"role": "user", "content": merged},
     ]
-    return chat_cached(messages)
+
+
+def _merge_messages(folder_summaries: list[str]) -> list[dict[str, str]]:
+    return _folder_messages(folder_summaries, "")
@@ -0,0 +1,179 @@
+"""Docs → дерево папок → Global: саммари каждой подпапки снизу вверх по FileMeta.path."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.config import LLM_CONCURRENCY_MAX, OPENROUTER_MODEL, REDUCE_FAN_IN, REDUCE_INPUT_TOKENS, REDUCE_MAX_DEPTH
+from src.llm.prompts import prompt_id
+from src.pipelines.doc_to_folder import adocs_to_folder_summary, docs_to_folder_summary
+from src.pipelines.folder_to_global import afolder_to_global_summary, folder_to_global_summary
+from src.storage.manifest import SummaryManifest, inputs_hash
+
+ROOT = ""
+
+
+@dataclass
+class FolderNode:
+    """Папка: документы прямо в ней и подпапки."""
+
+    path: str
+    docs: list[tuple[str, str]] = field(default_factory=list)  # (name, summary)
+    children: list[str] = field(default_factory=list)
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/") + 1 if self.path else 0
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+
+def _parent(path: str) -> str:
+    return path.rsplit("/", 1)[0] if "/" in path else ROOT
+
+
+def build_folder_tree(doc_summaries: list[tuple[str, str, str]]) -> dict[str, FolderNode]:
+    """Дерево папок из путей документов: {path: FolderNode}, корень — ""."""
+    tree: dict[str, FolderNode] = {ROOT: FolderNode(ROOT)}
+
+    def node(path: str) -> FolderNode:
+        if path not in tree:
+            tree[path] = FolderNode(path)
+            parent = node(_parent(path))
+            parent.children.append(path)
+        return tree[path]
+
+    for path, name, summary in doc_summaries:
+        node(_parent(path)).docs.append((name, summary))
+    for n in tree.values():
+        n.children.sort()
+    return tree
+
+
+def _levels(tree: dict[str, FolderNode]) -> list[list[FolderNode]]:
+    """Папки по уровням от самых глубоких к первому (корень — отдельно)."""
+    max_depth = max(n.depth for n in tree.values())
+    return [
+        [n for n in tree.values() if n.depth == depth]
+        for depth in range(max_depth, 0, -1)
+    ]
+
+
+def _node_inputs(node: FolderNode, summaries: dict[str, str]) -> list[tuple[str, str]]:
+    """Входы свёртки папки: (подпись, саммари) документов и подпапок — для LLM важна структура."""
+    items = [(f"Документ: {name}", summary) for name, summary in node.docs if summary]
+    items += [
+        (f"Папка: {child.rsplit('/', 1)[-1]}", summaries[child])
+        for child in node.children
+        if summaries.get(child)
+    ]
+    return items
+
+
+def _reduce_key(node: FolderNode, inputs: list[str]) -> str:
+    """Входы свёртки + всё, что влияет на результат (промпты, модель, бюджет свёртки)."""
+    prompts = prompt_id("global") + prompt_id("folder") if node.path == ROOT else prompt_id("folder")
+    budget = f"{REDUCE_INPUT_TOKENS}/{REDUCE_FAN_IN}/{REDUCE_MAX_DEPTH}"
+    return inputs_hash(prompts, OPENROUTER_MODEL or "", budget, node.path, *inputs)
+
+
+def _step(node: FolderNode) -> str:
+    return "global" if node.path == ROOT else f"folder:{node.path}"
+
+
+def _reduce_node(node: FolderNode, summaries: dict[str, str], manifest: SummaryManifest | None) -> str:
+    items = _node_inputs(node, summaries)
+    if len(items) <= 1:
+        # Единственный вход — он и есть саммари папки, без LLM
+        return items[0][1] if items else ""
+    inputs = [f"{label}\n{summary}" for label, summary in items]
+    key = _reduce_key(node, inputs)
+    if manifest is not None:
+        cached = manifest.get_reduce(_step(node), key)
+        if cached is not None:
+            return cached
+    if node.path == ROOT:
+        summary = folder_to_global_summary(inputs)
+    else:
+        summary = docs_to_folder_summary(inputs, folder_name=node.path)
+    if manifest is not None:
+        manifest.set_reduce(_step(node), key, summary)
+    return summary
+
+
+async def _areduce_node(node: FolderNode, summaries: dict[str, str], manifest: SummaryManifest | None) -> str:
+    items = _node_inputs(node, summaries)
+    if len(items) <= 1:
+        # Единственный вход — он и есть саммари папки, без LLM
+        return items[0][1] if items else ""
+    inputs = [f"{label}\n{summary}" for label, summary in items]
+    key = _reduce_key(node, inputs)
+    if manifest is not None:
+        cached = manifest.get_reduce(_step(node), key)
+        if cached is not None:
+            return cached
+    if node.path == ROOT:
+        summary = await afolder_to_global_summary(inputs)
+    else:
+        summary = await adocs_to_folder_summary(inputs, folder_name=node.path)
+    if manifest is not None:
+        manifest.set_reduce(_step(node), key, summary)
+    return summary
+
+
+def _prune(tree: dict[str, FolderNode], manifest: SummaryManifest | None) -> None:
+    if manifest is not None:
+        manifest.prune_reduces({_step(n) for n in tree.values()})
+
+
+def summarize_tree(
+    doc_summaries: list[tuple[str, str, str]],
+    manifest: SummaryManifest | None = None,
+) -> tuple[str, list[dict]]:
+    """
+    Саммари папок снизу вверх: папки одного уровня сводятся параллельно,
+    корень — промптом global. Результат папки хранится в манифесте по хешу входов:
+    изменение в одной подпапке пересчитывает только её ветку до корня.
+    Вернуть (global_summary, папки — см. _folder_rows).
+    """
+    tree = build_folder_tree(doc_summaries)
+    summaries: dict[str, str] = {}
+    # Отдельный пул: свёртка папки сама ждёт задач общего пула LLM (src.pipelines.executor)
+    with ThreadPoolExecutor(max_workers=max(1, LLM_CONCURRENCY_MAX), thread_name_prefix="folder") as pool:
+        for level in _levels(tree):
+            done = pool.map(lambda n: _reduce_node(n, summaries, manifest), level)
+            summaries.update(zip((n.path for n in level), done))
+    global_summary = _reduce_node(tree[ROOT], summaries, manifest)
+    _prune(tree, manifest)
+    return global_summary, _folder_rows(tree, summaries)
+
+
+async def asummarize_tree(
+    doc_summaries: list[tuple[str, str, str]],
+    manifest: SummaryManifest | None = None,
+) -> tuple[str, list[dict]]:
+    """Async-вариант summarize_tree: папки одного уровня — через asyncio.gather."""
+    tree = build_folder_tree(doc_summaries)
+    summaries: dict[str, str] = {}
+    for level in _levels(tree):
+        done = await asyncio.gather(*(_areduce_node(n, summaries, manifest) for n in level))
+        summaries.update(zip((n.path for n in level), done))
+    global_summary = await _areduce_node(tree[ROOT], summaries, manifest)
+    _prune(tree, manifest)
+    return global_summary, _folder_rows(tree, summaries)
+
+
+def _folder_rows(tree: dict[str, FolderNode], summaries: dict[str, str]) -> list[dict]:
+    """Папки для результата/отчёта: путь, глубина, число документов, подпапки, саммари."""
+    return [
+        {
+            "path": path,
+            "name": tree[path].name,
+            "depth": tree[path].depth,
+            "documents": len(tree[path].docs),
+            "subfolders": list(tree[path].children),
+            "summary": summaries[path],
+        }
+        for path in sorted(summaries, key=lambda p: p.split("/"))  # подпапки — сразу за родителем
+    ]
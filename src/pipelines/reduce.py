@@ -0,0 +1,119 @@
+"""Иерархическая свёртка: саммари пакуются в группы по бюджету токенов и сводятся уровень за уровнем."""
+import asyncio
+import logging
+from typing import Callable
+
+from src.chunking import estimate_tokens_many, truncate_to_tokens
+from src.config import REDUCE_FAN_IN, REDUCE_INPUT_TOKENS, REDUCE_MAX_DEPTH
+from src.llm.async_client import achat_cached
+from src.llm.client import chat_cached
+from src.llm.prompts import prompt_id
+from src.pipelines.executor import map_ordered
+
+logger = logging.getLogger(__name__)
+
+SEP_TOKENS = 3  # "\n---\n" между саммари в сообщении
+
+MessagesFn = Callable[[list[str]], list[dict[str, str]]]
+
+
+def pack_groups(
+    texts: list[str],
+    max_tokens: int = REDUCE_INPUT_TOKENS,
+    fan_in: int = REDUCE_FAN_IN,
+) -> list[list[str]]:
+    """
+    Разложить тексты по порядку в группы: до max_tokens токенов и до fan_in текстов (0 — без лимита).
+    Текст длиннее бюджета обрезается до него и идёт отдельной группой.
+    """
+    fan_in = max(2, fan_in) if fan_in else 0
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for text, n in zip(texts, estimate_tokens_many(texts)):
+        if n > max_tokens:
+            text, n = truncate_to_tokens(text, max_tokens), max_tokens
+        cost = n + (SEP_TOKENS if current else 0)
+        if current and (current_tokens + cost > max_tokens or (fan_in and len(current) >= fan_in)):
+            groups.append(current)
+            current, current_tokens, cost = [], 0, n
+        current.append(text)
+        current_tokens += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _plan_level(texts: list[str], depth: int) -> list[list[str]]:
+    """
+    Группы очередного уровня. На последнем допустимом уровне (reduce_max_depth) всё
+    сводится одной группой: каждый текст обрезается до равной доли бюджета.
+    """
+    groups = pack_groups(texts)
+    if len(groups) > 1 and depth >= REDUCE_MAX_DEPTH - 1:
+        share = max(1, REDUCE_INPUT_TOKENS // len(texts) - SEP_TOKENS)
+        logger.warning(
+            "Свёртка: глубина %s, %s саммари сокращены до %s токенов каждое", depth + 1, len(texts), share
+        )
+        groups = [[truncate_to_tokens(t, share) for t in texts]]
+    return groups
+
+
+def reduce_tree(
+    texts: list[str],
+    messages_fn: MessagesFn,
+    step: str,
+    level_messages_fn: MessagesFn | None = None,
+    level_step: str = "",
+) -> str:
+    """
+    Свести тексты в один: группы одного уровня — параллельно в общем пуле LLM,
+    результаты уровня снова пакуются, пока не останется одна группа.
+    Последний вызов — промпт step; промежуточные — level_step (по умолчанию тот же).
+    """
+    if not texts:
+        return ""
+    level_messages_fn = level_messages_fn or messages_fn
+    level_template = prompt_id(level_step or step)
+
+    def reduce_group(group: list[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        return chat_cached(level_messages_fn(group), template=level_template)
+
+    depth = 0
+    while True:
+        groups = _plan_level(texts, depth)
+        if len(groups) == 1:
+            return chat_cached(messages_fn(groups[0]), template=prompt_id(step))
+        logger.debug("Свёртка %s: уровень %s, %s → %s", step, depth + 1, len(texts), len(groups))
+        texts = map_ordered(reduce_group, groups)
+        depth += 1
+
+
+async def areduce_tree(
+    texts: list[str],
+    messages_fn: MessagesFn,
+    step: str,
+    level_messages_fn: MessagesFn | None = None,
+    level_step: str = "",
+) -> str:
+    """Async-вариант reduce_tree: группы уровня идут через asyncio.gather."""
+    if not texts:
+        return ""
+    level_messages_fn = level_messages_fn or messages_fn
+    level_template = prompt_id(level_step or step)
+
+    async def reduce_group(group: list[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        return await achat_cached(level_messages_fn(group), template=level_template)
+
+    depth = 0
+    while True:
+        groups = _plan_level(texts, depth)
+        if len(groups) == 1:
+            return await achat_cached(messages_fn(groups[0]), template=prompt_id(step))
+        logger.debug("Свёртка %s: уровень %s, %s → %s", step, depth + 1, len(texts), len(groups))
+        texts = list(await asyncio.gather(*(reduce_group(g) for g in groups)))
+        depth += 1
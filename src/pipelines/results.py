@@ -0,0 +1,221 @@
+"""Общее для run и stream: результат документа, журнал и чекпоинт, summary_result.json, лог ошибок."""
+import json
+import logging
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+
+from src.config import (
+    CACHE_DIR,
+    CHUNK_TOKENS,
+    OPENROUTER_MODEL,
+    REDUCE_FAN_IN,
+    REDUCE_INPUT_TOKENS,
+    REDUCE_MAX_DEPTH,
+    ensure_cache_dirs,
+)
+from src.llm.prompts import prompt_id
+from src.sources.models import FileMeta
+from src.storage.cache import flush_llm_cache
+from src.storage.journal import SummaryJournal
+from src.storage.manifest import SummaryManifest, inputs_hash
+from src.storage.texts import source_version
+
+logger = logging.getLogger(__name__)
+SUMMARY_RESULT_PATH = CACHE_DIR / "summary_result.json"
+ERRORS_LOG_PATH = CACHE_DIR / "errors.log"
+_errors_lock = Lock()
+
+# Результат документа: ((path, name, summary), None) или (None, причина)
+DocResult = tuple[tuple[str, str, str] | None, str | None]
+
+
+def log_error(path: str, reason: str) -> None:
+    """Логировать ошибку и в logger, и в файл .cache/errors.log."""
+    msg = f"Ошибка: {path} — {reason}"
+    logger.warning(msg)
+    ensure_cache_dirs()
+    try:
+        with _errors_lock, open(ERRORS_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(msg + "\n")
+    except OSError:
+        pass
+
+
+@contextmanager
+def stop_on_signals():
+    """
+    SIGTERM на время блока — как Ctrl-C (KeyboardInterrupt): пайплайн успевает
+    дописать журнал и сохранить манифест. Вне главного потока — без изменений.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handler(signum, frame):
+        raise KeyboardInterrupt(f"signal {signum}")
+
+    previous = signal.signal(signal.SIGTERM, handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def journal_doc(journal: SummaryJournal, meta: FileMeta, version: str, res: DocResult) -> None:
+    """Записать результат документа в журнал (ошибки журнала не роняют саммаризацию)."""
+    doc, reason = res
+    try:
+        journal.record(
+            meta.file_id,
+            version,
+            meta.path,
+            meta.name,
+            summary=doc[2] if doc is not None else None,
+            reason=reason,
+        )
+    except OSError as e:
+        logger.warning("Журнал не записан: %s", e)
+
+
+def checkpoint(journal: SummaryJournal, manifest: SummaryManifest) -> None:
+    """
+    Прерывание (Ctrl-C, SIGTERM): журнал — на диск, готовые документы — в манифест, кеш LLM — в SQLite.
+    Журнал не очищается: повторный запуск продолжит с него, даже если манифест не записался.
+    """
+    journal.sync()
+    saved = journal.replay(manifest)
+    manifest.save()
+    flush_llm_cache()
+    journal.close()
+    logger.warning("Прервано: сохранено %s документов, повторный запуск продолжит с них", saved)
+
+
+def doc_version(meta: FileMeta) -> str:
+    """
+    Версия саммари документа: содержимое и loader, шаблоны промптов, размер чанка, модель,
+    бюджет свёртки саммари чанков. Изменилось что-то из этого — документ саммаризуется заново.
+    """
+    source = source_version(meta)
+    if not source:
+        return ""
+    budget = f"{REDUCE_INPUT_TOKENS}/{REDUCE_FAN_IN}/{REDUCE_MAX_DEPTH}"
+    return inputs_hash(source, prompt_id("chunk"), prompt_id("doc"), str(CHUNK_TOKENS), OPENROUTER_MODEL or "", budget)
+
+
+def results_from_journal(
+    files_meta: list[FileMeta],
+    versions: list[str],
+    journal: SummaryJournal,
+    manifest: SummaryManifest,
+) -> list[DocResult]:
+    """
+    Результаты документов для summary_result.json — из журнала, а не из памяти процесса:
+    последняя запись журнала по документу (с текущей версией), иначе готовое саммари
+    из манифеста (документ не менялся).
+    """
+    last = {e["file_id"]: e for e in journal.entries()}
+    results: list[DocResult] = []
+    for meta, version in zip(files_meta, versions):
+        e = last.get(meta.file_id)
+        if e is not None and e.get("version", "") == version:
+            if e.get("summary") is not None:
+                results.append(((meta.path, meta.name, e["summary"]), None))
+            else:
+                results.append((None, e.get("reason") or "ошибка"))
+            continue
+        entry = manifest.get_doc(meta.file_id, version) if version else None
+        if entry is not None:
+            results.append(((meta.path, meta.name, entry["summary"]), None))
+        else:
+            results.append((None, "нет результата в журнале"))
+    return results
+
+
+def commit_result(result: dict, journal: SummaryJournal) -> Path:
+    """Записать summary_result.json и только после этого очистить журнал (он — чекпоинт до этой точки)."""
+    path = save_summary_result(result)
+    journal.clear()
+    return path
+
+
+def collect_results(
+    files_meta: list[FileMeta],
+    results: list[DocResult],
+) -> tuple[list[tuple[str, str, str]], list[dict]]:
+    """Разложить результаты по doc_summaries и failed в порядке входного списка."""
+    doc_summaries: list[tuple[str, str, str]] = []
+    failed: list[dict] = []
+    for meta, (doc, reason) in zip(files_meta, results):
+        if doc is not None:
+            doc_summaries.append(doc)
+        else:
+            failed.append({"path": meta.path, "reason": reason})
+    return doc_summaries, failed
+
+
+def build_result(
+    global_summary: str,
+    doc_summaries: list[tuple[str, str, str]],
+    files_meta: list[FileMeta],
+    failed: list[dict],
+    folder_summaries: list[dict] | None = None,
+) -> dict:
+    """Результат саммаризации в формате summary_result.json."""
+    if not doc_summaries:
+        return {
+            "global_summary": "",
+            "doc_summaries": [],
+            "folder_summaries": [],
+            "files_meta": [],
+            "failed": failed,
+        }
+    return {
+        "global_summary": global_summary,
+        "doc_summaries": doc_summaries,
+        "folder_summaries": folder_summaries or [],
+        "files_meta": [
+            {
+                "file_id": f.file_id,
+                "name": f.name,
+                "mime_type": f.mime_type,
+                "size": f.size,
+                "path": f.path,
+            }
+            for f in files_meta
+        ],
+        "failed": failed,
+    }
+
+
+def save_summary_result(result: dict) -> Path:
+    """Сохранить результат саммаризации в кеш."""
+    ensure_cache_dirs()
+    data = {
+        "global_summary": result.get("global_summary", ""),
+        "doc_summaries": result.get("doc_summaries", []),
+        "folder_summaries": result.get("folder_summaries", []),
+        "files_meta": result.get("files_meta", []),
+        "failed": result.get("failed", []),
+    }
+    # tmp + rename: падение посреди записи не оставляет обрезанный результат
+    tmp = SUMMARY_RESULT_PATH.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(data, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    os.replace(tmp, SUMMARY_RESULT_PATH)
+    return SUMMARY_RESULT_PATH
+
+
+def load_summary_result() -> dict | None:
+    """Загрузить результат саммаризации из кеша."""
+    if not SUMMARY_RESULT_PATH.exists():
+        return None
+    try:
+        return json.loads(SUMMARY_RESULT_PATH.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return None
@@ -1,132 +1,314 @@
 """Полный пайплайн: ingest → summarize → report."""
-import json
+import asyncio
 import logging
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+from typing import Iterator
 
 from tqdm import tqdm
 
-from src.chunking import chunk_text
-from src.config import CACHE_DIR, CHUNK_TOKENS, ensure_cache_dirs
-from src.loaders import load_text
-from src.pipelines import chunks_to_doc_summary, docs_to_folder_summary, folder_to_global_summary
+from src.chunking import Chunk, iter_chunks
+from src.config import CHUNK_TOKENS, LLM_CONCURRENCY_MAX, ensure_cache_dirs
+from src.loaders.parallel import extract_many
+from src.pipelines import achunks_to_doc_summary, asummarize_tree, chunks_to_doc_summary, summarize_tree
+from src.pipelines.results import (
+    SUMMARY_RESULT_PATH,
+    DocResult,
+    build_result,
+    checkpoint,
+    collect_results,
+    commit_result,
+    doc_version,
+    journal_doc,
+    load_summary_result,
+    log_error,
+    results_from_journal,
+    save_summary_result,
+    stop_on_signals,
+)
 from src.report import build_report, build_report_md, build_report_json
 from src.sources.models import FileMeta
+from src.storage.cache import flush_llm_cache
+from src.storage.journal import SummaryJournal
 from src.storage.load_cached import load_cached_files
+from src.storage.manifest import SummaryManifest
+from src.storage.texts import get_cached_text, iter_text_cached, set_cached_text
 
 logger = logging.getLogger(__name__)
-SUMMARY_RESULT_PATH = CACHE_DIR / "summary_result.json"
-ERRORS_LOG_PATH = CACHE_DIR / "errors.log"
 
 
-def _log_error(path: str, reason: str) -> None:
-    """Логировать ошибку и в logger, и в файл .cache/errors.log."""
-    msg = f"Ошибка: {path} — {reason}"
-    logger.warning(msg)
-    ensure_cache_dirs()
+def _extract_texts(
+    files_meta: list[FileMeta],
+    resume: bool = False,
+    progress: bool = True,
+) -> dict[int, str]:
+    """
+    Извлечь текст файлов, которых нет в .cache/texts, в пуле процессов.
+    Вернуть {index: причина} для файлов, которые извлечь не удалось.
+    """
+    todo = [
+        i
+        for i, meta in enumerate(files_meta)
+        if meta.local_path
+        and meta.local_path.exists()
+        and get_cached_text(meta, verify=not resume) is None
+    ]
+    failures: dict[int, str] = {}
+    if not todo:
+        return failures
+    results = extract_many([files_meta[i].local_path for i in todo])
+    if progress:
+        results = tqdm(results, total=len(todo), desc="Извлечение текста", unit="файл")
+    for j, text, reason in results:
+        meta = files_meta[todo[j]]
+        if reason is not None:
+            failures[todo[j]] = reason
+        else:
+            set_cached_text(meta, text or "")
+    return failures
+
+
+def _prepare_chunks(meta: FileMeta, resume: bool = False) -> tuple[Iterator[Chunk], str | None]:
+    """
+    Текст (из .cache/texts или поток loader'а) → поток чанков. Вернуть (chunks, None) или (пусто, причина).
+    Промах кеша не грузит документ целиком: страницы идут в iter_chunks и по пути пишутся в кеш.
+    resume — доверять кешу текстов без сверки версии файла.
+    """
+    if not meta.local_path or not meta.local_path.exists():
+        return iter(()), "файл не найден"
+    chunks = iter_chunks(
+        iter_text_cached(meta, verify=not resume),
+        file_id=meta.file_id,
+        path=meta.path,
+        max_tokens=CHUNK_TOKENS,
+    )
+    first = next(chunks, None)
+    if first is None:
+        return iter(()), "пустой текст"
+    return chain([first], chunks), None
+
+
+def _summarize_file(
+    meta: FileMeta,
+    resume: bool = False,
+) -> DocResult:
+    """Саммари одного файла. Вернуть ((path, name, summary), None) или (None, причина)."""
     try:
-        with open(ERRORS_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(msg + "\n")
-    except OSError:
-        pass
+        chunks, reason = _prepare_chunks(meta, resume)
+        if reason:
+            return None, reason
+        summary = chunks_to_doc_summary(chunks)
+        return (meta.path, meta.name, summary), None
+    except Exception as e:
+        return None, str(e)
+
+
+async def _asummarize_file(
+    meta: FileMeta,
+    resume: bool = False,
+) -> DocResult:
+    """Async-вариант _summarize_file: парсинг в потоке, LLM — в event loop."""
+    try:
+        chunks, reason = await asyncio.to_thread(_prepare_chunks, meta, resume)
+        if reason:
+            return None, reason
+        summary = await achunks_to_doc_summary(chunks)
+        return (meta.path, meta.name, summary), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _plan_docs(
+    files_meta: list[FileMeta],
+    manifest: SummaryManifest,
+) -> tuple[list[DocResult], list[str], list[int]]:
+    """
+    Сверить файлы с манифестом. Вернуть (results, versions, todo):
+    results — готовые саммари неизменённых документов, todo — индексы к пересчёту.
+    """
+    results: list[DocResult] = [(None, None)] * len(files_meta)
+    versions = [doc_version(meta) for meta in files_meta]
+    todo: list[int] = []
+    for i, meta in enumerate(files_meta):
+        entry = manifest.get_doc(meta.file_id, versions[i])
+        if entry is not None:
+            # Путь/имя — текущие: переименование не требует пересчёта
+            results[i] = ((meta.path, meta.name, entry["summary"]), None)
+        else:
+            todo.append(i)
+    if files_meta:
+        logger.info("Без изменений: %s из %s документов", len(files_meta) - len(todo), len(files_meta))
+    return results, versions, todo
+
+
+def _record_docs(
+    files_meta: list[FileMeta],
+    results: list[DocResult],
+    versions: list[str],
+    todo: list[int],
+    manifest: SummaryManifest,
+    prune: bool,
+) -> None:
+    """Записать новые саммари в манифест; prune — убрать документы, удалённые из источника."""
+    for i in todo:
+        doc = results[i][0]
+        if doc is not None and versions[i]:
+            manifest.set_doc(files_meta[i].file_id, versions[i], doc[2])
+    if prune:
+        dropped = manifest.prune({meta.file_id for meta in files_meta})
+        if dropped:
+            logger.info("Манифест: удалено %s документов, которых нет в источнике", dropped)
+    manifest.save()
 
 
 def run_summarize(
     files_meta: list[FileMeta],
     max_files: int | None = None,
     progress: bool = True,
+    resume: bool = False,
 ) -> dict:
     """
     Прогнать саммаризацию по файлам.
+    Документы обрабатываются параллельно (до llm_concurrency_max), чанки — в общем пуле LLM;
+    число запросов в полёте регулирует AIMD-лимитер.
+    Инкрементально: документы, чья версия совпала с .cache/doc_manifest.json, не пересчитываются,
+    удалённые из источника выпадают из манифеста (кроме запуска с max_files);
+    Саммари папок строятся снизу вверх по путям файлов (summarize_tree), корень — итоговое;
+    свёртка папки повторяется, только если изменились её входы.
+    Текст берётся из .cache/texts, недостающее извлекается в пуле процессов;
+    resume — без сверки версий кеша текстов (парсинг пропускается).
     Graceful degradation: ошибка на одном файле → логировать и идти дальше.
-    Вернуть dict: {global_summary, doc_summaries, files_meta, failed: [{path, reason}]}
+    Каждый готовый документ сразу дописывается в .cache/summary_journal.jsonl; Ctrl-C/SIGTERM
+    дожидается документов в работе и сохраняет манифест, следующий запуск продолжает с журнала.
+    summary_result.json собирается из журнала и записывается здесь же; журнал очищается после записи.
+    Вернуть dict: {global_summary, doc_summaries, folder_summaries, files_meta, failed: [{path, reason}]}
     """
     ensure_cache_dirs()
+    prune = not max_files
     if max_files:
         files_meta = files_meta[:max_files]
 
-    doc_summaries: list[tuple[str, str, str]] = []
-    failed: list[dict] = []
-    it = tqdm(files_meta, desc="Саммаризация", unit="файл") if progress else files_meta
-
-    for meta in it:
-        try:
-            if not meta.local_path or not meta.local_path.exists():
-                _log_error(meta.path, "файл не найден")
-                failed.append({"path": meta.path, "reason": "файл не найден"})
-                continue
-            text = load_text(meta.local_path)
-            if not text.strip():
-                _log_error(meta.path, "пустой текст")
-                failed.append({"path": meta.path, "reason": "пустой текст"})
-                continue
-            chunks = chunk_text(
-                text,
-                file_id=meta.file_id,
-                path=meta.path,
-                max_tokens=CHUNK_TOKENS,
-            )
-            if not chunks:
-                _log_error(meta.path, "нет чанков")
-                failed.append({"path": meta.path, "reason": "нет чанков"})
-                continue
-            summary = chunks_to_doc_summary(chunks)
-            doc_summaries.append((meta.path, meta.name, summary))
-        except Exception as e:
-            _log_error(meta.path, str(e))
-            failed.append({"path": meta.path, "reason": str(e)})
-
-    if not doc_summaries:
-        return {
-            "global_summary": "",
-            "doc_summaries": [],
-            "files_meta": [],
-            "failed": failed,
-        }
-
-    folder_summary = docs_to_folder_summary(
-        [s[2] for s in doc_summaries],
-        folder_name="",
-    )
-    global_summary = folder_to_global_summary([folder_summary])
-
-    return {
-        "global_summary": global_summary,
-        "doc_summaries": doc_summaries,
-        "files_meta": [
-            {
-                "file_id": f.file_id,
-                "name": f.name,
-                "mime_type": f.mime_type,
-                "size": f.size,
-                "path": f.path,
-            }
-            for f in files_meta
-        ],
-        "failed": failed,
-    }
-
-
-def save_summary_result(result: dict) -> Path:
-    """Сохранить результат саммаризации в кеш."""
+    manifest = SummaryManifest.load()
+    journal = SummaryJournal()
+    journal.replay(manifest)
+    results, versions, todo = _plan_docs(files_meta, manifest)
+
+    def summarize_one(i: int) -> DocResult:
+        res = _summarize_file(files_meta[i], resume)
+        journal_doc(journal, files_meta[i], versions[i], res)
+        return res
+
+    try:
+        with stop_on_signals():
+            extract_failed = _extract_texts([files_meta[i] for i in todo], resume, progress)
+            for j, reason in extract_failed.items():
+                i = todo[j]
+                results[i] = (None, reason)
+                journal_doc(journal, files_meta[i], versions[i], results[i])
+                log_error(files_meta[i].path, reason)
+            todo = [i for j, i in enumerate(todo) if j not in extract_failed]
+
+            pool = ThreadPoolExecutor(max_workers=max(1, LLM_CONCURRENCY_MAX), thread_name_prefix="doc")
+            try:
+                futures = {pool.submit(summarize_one, i): i for i in todo}
+                done = as_completed(futures)
+                if progress:
+                    done = tqdm(done, total=len(futures), desc="Саммаризация", unit="файл")
+                for fut in done:
+                    i = futures[fut]
+                    results[i] = fut.result()
+                    if results[i][1] is not None:
+                        log_error(files_meta[i].path, results[i][1])
+            finally:
+                # При прерывании очередь отменяется, документы в работе дописываются в журнал
+                pool.shutdown(wait=True, cancel_futures=True)
+            _record_docs(files_meta, results, versions, todo, manifest, prune)
+
+            # Результат — из журнала; журнал очищается только после записи summary_result.json
+            journal.sync()
+            from_journal = results_from_journal(files_meta, versions, journal, manifest)
+            doc_summaries, failed = collect_results(files_meta, from_journal)
+            if doc_summaries:
+                global_summary, folders = summarize_tree(doc_summaries, manifest)
+                manifest.save()
+                flush_llm_cache()
+                result = build_result(global_summary, doc_summaries, files_meta, failed, folders)
+            else:
+                result = build_result("", doc_summaries, files_meta, failed)
+            commit_result(result, journal)
+    except KeyboardInterrupt:
+        checkpoint(journal, manifest)
+        raise
+    return result
+
+
+async def run_summarize_async(
+    files_meta: list[FileMeta],
+    max_files: int | None = None,
+    progress: bool = True,
+    resume: bool = False,
+) -> dict:
+    """
+    Async-вариант run_summarize: все LLM-вызовы в одном event loop,
+    одновременно до llm_async_concurrency запросов. Результат — как у run_summarize.
+    """
     ensure_cache_dirs()
-    data = {
-        "global_summary": result.get("global_summary", ""),
-        "doc_summaries": result.get("doc_summaries", []),
-        "files_meta": result.get("files_meta", []),
-        "failed": result.get("failed", []),
-    }
-    SUMMARY_RESULT_PATH.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-    return SUMMARY_RESULT_PATH
+    prune = not max_files
+    if max_files:
+        files_meta = files_meta[:max_files]
+
+    manifest = await asyncio.to_thread(SummaryManifest.load)
+    journal = SummaryJournal()
+    await asyncio.to_thread(journal.replay, manifest)
+    results, versions, todo = await asyncio.to_thread(_plan_docs, files_meta, manifest)
+    pbar = None
 
+    async def one(i: int) -> DocResult:
+        res = await _asummarize_file(files_meta[i], resume)
+        await asyncio.to_thread(journal_doc, journal, files_meta[i], versions[i], res)
+        if res[1] is not None:
+            log_error(files_meta[i].path, res[1])
+        if pbar is not None:
+            pbar.update(1)
+        return res
 
-def load_summary_result() -> dict | None:
-    """Загрузить результат саммаризации из кеша."""
-    if not SUMMARY_RESULT_PATH.exists():
-        return None
     try:
-        return json.loads(SUMMARY_RESULT_PATH.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return None
+        with stop_on_signals():
+            extract_failed = await asyncio.to_thread(
+                _extract_texts, [files_meta[i] for i in todo], resume, progress
+            )
+            for j, reason in extract_failed.items():
+                i = todo[j]
+                results[i] = (None, reason)
+                await asyncio.to_thread(journal_doc, journal, files_meta[i], versions[i], results[i])
+                log_error(files_meta[i].path, reason)
+            todo = [i for j, i in enumerate(todo) if j not in extract_failed]
+
+            pbar = tqdm(total=len(todo), desc="Саммаризация", unit="файл") if progress else None
+            try:
+                done = await asyncio.gather(*(one(i) for i in todo))
+                for i, res in zip(todo, done):
+                    results[i] = res
+            finally:
+                if pbar is not None:
+                    pbar.close()
+            await asyncio.to_thread(_record_docs, files_meta, results, versions, todo, manifest, prune)
+
+            await asyncio.to_thread(journal.sync)
+            from_journal = await asyncio.to_thread(results_from_journal, files_meta, versions, journal, manifest)
+            doc_summaries, failed = collect_results(files_meta, from_journal)
+            if doc_summaries:
+                global_summary, folders = await asummarize_tree(doc_summaries, manifest)
+                await asyncio.to_thread(manifest.save)
+                await asyncio.to_thread(flush_llm_cache)
+                result = build_result(global_summary, doc_summaries, files_meta, failed, folders)
+            else:
+                result = build_result("", doc_summaries, files_meta, failed)
+            await asyncio.to_thread(commit_result, result, journal)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # asyncio.run на Ctrl-C отменяет задачу: готовое уже в журнале, запросы в полёте теряются
+        checkpoint(journal, manifest)
+        raise
+    return result
+
+
@@ -0,0 +1,312 @@
+"""
+Потоковый пайплайн: скачивание → извлечение → чанкинг → LLM по чанкам → свёртка документа;
+стадии — группы потоков, связанные ограниченными очередями.
+"""
+import logging
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable
+
+from tqdm import tqdm
+
+from src.chunking import iter_chunks
+from src.config import CHUNK_TOKENS, EXTRACT_WORKERS, LLM_CONCURRENCY_MAX, STREAM_QUEUE_SIZE, ensure_cache_dirs
+from src.loaders.parallel import ExtractPool
+from src.pipelines import summarize_tree
+from src.pipelines.chunk_to_doc import reduce_chunk_summaries, summarize_chunk
+from src.pipelines.results import (
+    DocResult,
+    build_result,
+    checkpoint,
+    collect_results,
+    commit_result,
+    doc_version,
+    journal_doc,
+    log_error,
+    results_from_journal,
+    stop_on_signals,
+)
+from src.sources.models import FileMeta
+from src.storage.cache import flush_llm_cache
+from src.storage.journal import SummaryJournal
+from src.storage.manifest import SummaryManifest
+from src.storage.texts import get_cached_text, set_cached_text
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # конец очереди
+
+
+@dataclass
+class _Doc:
+    """Документ между стадиями LLM и свёртки: саммари чанков по мере готовности."""
+
+    summaries: dict[int, str] = field(default_factory=dict)
+    total: int | None = None  # число чанков — известно, когда чанкинг документа закончен
+    done: int = 0  # обработано чанков (с ошибкой — тоже)
+    error: str | None = None
+
+
+def _extract_text(meta: FileMeta, pool: ExtractPool, resume: bool) -> str:
+    """Текст файла: из .cache/texts или парсинг в пуле процессов (таймаут, большие PDF — см. ExtractPool)."""
+    text = get_cached_text(meta, verify=not resume)
+    if text is not None:
+        return text
+    text = pool.extract(str(meta.local_path))
+    set_cached_text(meta, text or "")
+    return text or ""
+
+
+def run_stream(
+    files: Iterable[FileMeta],
+    max_files: int | None = None,
+    progress: bool = True,
+    resume: bool = False,
+) -> dict:
+    """
+    Саммаризация по мере поступления файлов (run --stream): первый документ
+    саммаризуется, пока остальные ещё скачиваются.
+    Стадии — потоки, связанные очередями на stream_queue_size элементов:
+    источник (files — например, ingest_iter) → извлечение (extract_workers потоков,
+    парсинг в пуле процессов) → чанкинг → LLM по чанкам (llm_concurrency_max потоков)
+    → свёртка документа. Полная очередь останавливает стадию перед ней, вплоть до
+    скачивания, поэтому в памяти — несколько очередей текстов и чанков, а не вся папка.
+    Манифест, журнал, папки, итоговое саммари и summary_result.json — как у run_summarize;
+    Ctrl-C/SIGTERM останавливает подачу файлов, очереди сбрасываются,
+    вызовы в полёте дописываются в журнал.
+    """
+    ensure_cache_dirs()
+    prune = not max_files
+    source = iter(files)
+    items = islice(source, max_files) if max_files else source
+
+    manifest = SummaryManifest.load()
+    journal = SummaryJournal()
+    journal.replay(manifest)
+    stop = threading.Event()
+    lock = threading.Lock()
+    metas: list[FileMeta] = []
+    versions: dict[int, str] = {}
+    docs: dict[int, _Doc] = {}
+    unchanged = 0
+    errors: list[BaseException] = []
+
+    size = max(1, STREAM_QUEUE_SIZE)
+    extract_q: "queue.Queue" = queue.Queue(maxsize=size)  # индексы файлов
+    text_q: "queue.Queue" = queue.Queue(maxsize=size)  # (i, текст)
+    chunk_q: "queue.Queue" = queue.Queue(maxsize=size)  # (i, номер чанка, текст чанка)
+    reduce_q: "queue.Queue" = queue.Queue(maxsize=size)  # индексы документов с готовыми чанками
+    n_extract = EXTRACT_WORKERS or os.cpu_count() or 1
+    n_llm = max(1, LLM_CONCURRENCY_MAX)
+    bar = tqdm(total=0, desc="Поток", unit="файл", disable=not progress)
+
+    def finish(i: int, res: DocResult, record: bool = True) -> None:
+        """Итог документа; record — в журнал (кроме неизменённых: их саммари уже в манифесте)."""
+        if record:
+            journal_doc(journal, metas[i], versions.get(i, ""), res)
+        with lock:
+            bar.set_postfix(
+                extract=extract_q.qsize(), chunk=text_q.qsize(), llm=chunk_q.qsize(), reduce=reduce_q.qsize(),
+                refresh=False,
+            )
+            bar.update(1)
+        if res[1] is not None:
+            log_error(metas[i].path, res[1])
+
+    def fail(i: int, e: Exception) -> None:
+        finish(i, (None, str(e) or type(e).__name__))
+
+    def feed() -> None:
+        try:
+            for meta in items:
+                if stop.is_set():
+                    break
+                with lock:
+                    i = len(metas)
+                    metas.append(meta)
+                    bar.total = len(metas)
+                extract_q.put(i)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            if stop.is_set() and hasattr(source, "close"):
+                source.close()  # ingest_iter отменяет незапущенные скачивания
+            for _ in range(n_extract):
+                extract_q.put(_DONE)
+
+    def extract(i: int) -> None:
+        nonlocal unchanged
+        meta = metas[i]
+        try:
+            versions[i] = doc_version(meta)
+            entry = manifest.get_doc(meta.file_id, versions[i])
+            if entry is not None:
+                with lock:
+                    unchanged += 1
+                finish(i, ((meta.path, meta.name, entry["summary"]), None), record=False)
+                return
+            if not meta.local_path or not meta.local_path.exists():
+                finish(i, (None, "файл не найден"))
+                return
+            text = _extract_text(meta, pool, resume)
+        except Exception as e:
+            fail(i, e)
+            return
+        if not text.strip():
+            finish(i, (None, "пустой текст"))
+            return
+        text_q.put((i, text))
+
+    def chunk(item: tuple[int, str]) -> None:
+        i, text = item
+        meta = metas[i]
+        doc = _Doc()
+        with lock:
+            docs[i] = doc
+        total = 0
+        try:
+            for c in iter_chunks([text], file_id=meta.file_id, path=meta.path, max_tokens=CHUNK_TOKENS):
+                if stop.is_set():
+                    return
+                chunk_q.put((i, c.chunk_index, c.text))
+                total += 1
+        except Exception as e:
+            with lock:
+                doc.error = doc.error or (str(e) or type(e).__name__)
+        with lock:
+            doc.total = total
+            ready = doc.done == total
+        if ready:
+            reduce_q.put(i)
+
+    def summarize(item: tuple[int, int, str]) -> None:
+        i, k, text = item
+        with lock:
+            doc = docs[i]
+            skip = doc.error is not None
+        summary, error = None, None
+        if not skip:
+            try:
+                summary = summarize_chunk(text)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        with lock:
+            if summary is not None:
+                doc.summaries[k] = summary
+            if error is not None and doc.error is None:
+                doc.error = error
+            doc.done += 1
+            ready = doc.done == doc.total
+        if ready:
+            reduce_q.put(i)
+
+    def reduce(i: int) -> None:
+        meta = metas[i]
+        with lock:
+            doc = docs.pop(i)
+        if doc.total == 0 and doc.error is None:
+            res: DocResult = (None, "нет чанков")
+        elif doc.error is not None:
+            res = (None, doc.error)
+        else:
+            try:
+                summaries = [doc.summaries[k] for k in range(doc.total or 0)]
+                res = ((meta.path, meta.name, reduce_chunk_summaries(summaries)), None)
+            except Exception as e:
+                res = (None, str(e) or type(e).__name__)
+        if res[0] is not None and versions.get(i):
+            manifest.set_doc(meta.file_id, versions[i], res[0][2])
+        finish(i, res)
+
+    threads: list[threading.Thread] = []
+
+    def stage(name: str, n: int, in_q: "queue.Queue", handle: Callable, out_q: "queue.Queue | None", n_out: int) -> None:
+        """
+        n потоков стадии: берут элементы из in_q до _DONE; последний завершившийся
+        передаёт _DONE каждому потоку следующей стадии. После stop элементы
+        вычитываются без обработки — стадии выше никогда не блокируются на put.
+        """
+        remaining = [n]
+
+        def run() -> None:
+            try:
+                while (item := in_q.get()) is not _DONE:
+                    if stop.is_set():
+                        continue
+                    try:
+                        handle(item)
+                    except Exception as e:  # ошибка самой стадии, а не документа — остановить конвейер
+                        errors.append(e)
+                        stop.set()
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and out_q is not None:
+                    for _ in range(n_out):
+                        out_q.put(_DONE)
+
+        threads.extend(threading.Thread(target=run, name=f"stream-{name}-{k}", daemon=True) for k in range(n))
+
+    pool = ExtractPool(n_extract)
+    threads.append(threading.Thread(target=feed, name="stream-feed", daemon=True))
+    stage("extract", n_extract, extract_q, extract, text_q, 1)
+    stage("chunk", 1, text_q, chunk, chunk_q, n_llm)
+    stage("llm", n_llm, chunk_q, summarize, reduce_q, n_llm)
+    stage("reduce", n_llm, reduce_q, reduce, None, 0)
+
+    try:
+        with stop_on_signals():
+            for t in threads:
+                t.start()
+            try:
+                for t in threads:
+                    t.join()
+            except KeyboardInterrupt:
+                # Стадии сами доводят _DONE до конца конвейера; здесь только ждём
+                stop.set()
+                for t in threads:
+                    t.join()
+                raise
+    except KeyboardInterrupt:
+        checkpoint(journal, manifest)
+        raise
+    finally:
+        bar.close()
+        pool.close()
+    if errors:
+        manifest.save()
+        raise errors[0]
+
+    if metas:
+        logger.info("Без изменений: %s из %s документов", unchanged, len(metas))
+    if prune:
+        dropped = manifest.prune({meta.file_id for meta in metas})
+        if dropped:
+            logger.info("Манифест: удалено %s документов, которых нет в источнике", dropped)
+    manifest.save()
+
+    # Результат — из журнала; журнал очищается только после записи summary_result.json
+    ordered = sorted(range(len(metas)), key=lambda i: metas[i].path)
+    files_meta = [metas[i] for i in ordered]
+    journal.sync()
+    from_journal = results_from_journal(files_meta, [versions.get(i, "") for i in ordered], journal, manifest)
+    doc_summaries, failed = collect_results(files_meta, from_journal)
+    try:
+        with stop_on_signals():
+            if doc_summaries:
+                global_summary, folders = summarize_tree(doc_summaries, manifest)
+                manifest.save()
+                flush_llm_cache()
+                result = build_result(global_summary, doc_summaries, files_meta, failed, folders)
+            else:
+                result = build_result("", doc_summaries, files_meta, failed)
+            commit_result(result, journal)
+    except KeyboardInterrupt:
+        checkpoint(journal, manifest)
+        raise
+    return result
@@ -3,7 +3,7 @@ import re
 from collections import Counter
 from typing import Any
 
-from src.report.models import DocSummary, ReportData
+from src.report.models import DocSummary, FolderSummary, ReportData
 from src.sources.models import FileMeta
 
 
@@ -11,14 +11,27 @@ def build_report(
     global_summary: str,
     doc_summaries: list[tuple[str, str, str]] | None = None,
     files_meta: list[FileMeta] | None = None,
+    folder_summaries: list[dict] | None = None,
 ) -> ReportData:
     """
     Собрать ReportData.
     doc_summaries: [(path, name, summary), ...]
     files_meta: список FileMeta для метаданных и оглавления.
+    folder_summaries: [{path, name, depth, documents, subfolders, summary}, ...] — дерево папок.
     """
     doc_summaries = doc_summaries or []
     files_meta = files_meta or []
+    folders = [
+        FolderSummary(
+            path=f["path"],
+            name=f.get("name") or f["path"].rsplit("/", 1)[-1],
+            summary=f.get("summary", ""),
+            depth=f.get("depth", f["path"].count("/") + 1),
+            documents=f.get("documents", 0),
+            subfolders=list(f.get("subfolders", [])),
+        )
+        for f in folder_summaries or []
+    ]
 
     exec_summary, topic_map, key_facts = _parse_summary(global_summary)
 
@@ -44,6 +57,7 @@ def build_report(
     type_counts = Counter(_mime(f) or "unknown" for f in files_meta)
     metadata: dict[str, Any] = {
         "file_count": len(files_meta),
+        "folder_count": len(folders),
         "total_size": total_size,
         "types": dict(type_counts),
     }
@@ -53,6 +67,7 @@ def build_report(
         topic_map=topic_map,
         key_facts=key_facts,
         table_of_contents=toc,
+        folders=folders,
         metadata=metadata,
         raw_summary=global_summary,
     )
@@ -11,7 +11,7 @@ def build_report_md(
 ) -> str:
     """
     Собрать отчёт в Markdown.
-    Executive Summary, Карта тем, Ключевые факты, Оглавление, Метаданные.
+    Executive Summary, Карта тем, Ключевые факты, Структура папок, Оглавление, Метаданные.
     """
     lines = []
     lines.append(f"# {title}")
@@ -34,6 +34,17 @@ def build_report_md(
             lines.append(f"- {fact}")
         lines.append("")
 
+    if report.folders:
+        lines.append("## Структура папок\n")
+        for folder in report.folders:
+            lines.append(f"{'  ' * (folder.depth - 1)}- `{folder.path}/` — документов: {folder.documents}")
+        lines.append("")
+        for folder in report.folders:
+            lines.append(f"### {folder.path}/")
+            lines.append("")
+            lines.append(folder.summary)
+            lines.append("")
+
     if report.table_of_contents:
         lines.append("## Оглавление\n")
         for doc in report.table_of_contents:
@@ -50,6 +61,8 @@ def build_report_md(
     if report.metadata:
         lines.append("## Метаданные\n")
         lines.append(f"- **Файлов:** {report.metadata.get('file_count', 0)}")
+        if report.metadata.get("folder_count"):
+            lines.append(f"- **Папок:** {report.metadata['folder_count']}")
         lines.append(f"- **Общий размер:** {_fmt_size(report.metadata.get('total_size', 0))}")
         types_str = ", ".join(f"{k}: {v}" for k, v in report.metadata.get("types", {}).items())
         if types_str:
@@ -86,6 +99,17 @@ def build_report_json(report: ReportData) -> str:
             }
             for d in report.table_of_contents
         ],
+        "folders": [
+            {
+                "path": f.path,
+                "name": f.name,
+                "depth": f.depth,
+                "documents": f.documents,
+                "subfolders": f.subfolders,
+                "summary": f.summary,
+            }
+            for f in report.folders
+        ],
         "metadata": report.metadata,
     }
     return json.dumps(data, ensure_ascii=False, indent=2)
@@ -14,6 +14,18 @@ class DocSummary:
     size: int | None = None
 
 
+@dataclass
+class FolderSummary:
+    """Саммари подпапки (дерево папок источника)."""
+
+    path: str
+    name: str
+    summary: str
+    depth: int = 1
+    documents: int = 0  # документов прямо в папке
+    subfolders: list[str] = field(default_factory=list)
+
+
 @dataclass
 class ReportData:
     """Структура итогового отчёта."""
@@ -22,5 +34,6 @@ class ReportData:
     topic_map: list[str] = field(default_factory=list)
     key_facts: list[str] = field(default_factory=list)
     table_of_contents: list[DocSummary] = field(default_factory=list)
+    folders: list[FolderSummary] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
     raw_summary: str = ""
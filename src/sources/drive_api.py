@@ -1,13 +1,35 @@
 """Google Drive API — ингест файлов."""
 
-import json
+import hashlib
 import logging
+import os
+import random
+import shutil
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Generator
 
 from tqdm import tqdm
 
-from src.config import CACHE_DOWNLOADS, ensure_cache_dirs
+from src.config import (
+    CACHE_DOWNLOADS,
+    DOWNLOAD_MAX_MB,
+    DOWNLOAD_MAX_UNREADABLE_MB,
+    DOWNLOAD_SKIP_MIME_PREFIXES,
+    DRIVE_CHUNK_MB,
+    DRIVE_DOWNLOAD_RETRIES,
+    DRIVE_DOWNLOAD_WORKERS,
+    DRIVE_LIST_WORKERS,
+    DRIVE_PARALLEL_MIN_MB,
+    DRIVE_RANGE_PARTS,
+    ensure_cache_dirs,
+)
+from src.loaders import get_loader
 from src.sources.models import FileMeta
 
 logger = logging.getLogger(__name__)
@@ -26,13 +48,20 @@ EXPORT_MIME = {
     "application/vnd.google-apps.presentation": "application/pdf",
 }
 
+LIST_PAGE_SIZE = 1000  # максимум files.list
+LIST_FIELDS = "nextPageToken, files(id, name, mimeType, size, modifiedTime)"
+API_RETRIES = 5  # повторы execute() при 429/5xx (экспоненциальная пауза внутри клиента)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MB = 1024 * 1024
 
-def _get_service(credentials_path: Path):
-    """Создать Drive API service с OAuth2 (Desktop OAuth, run_local_server)."""
+_local = threading.local()
+
+
+def _get_credentials(credentials_path: Path):
+    """OAuth2-учётные данные (Desktop OAuth, run_local_server); токен — token.json рядом с credentials."""
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
 
     SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
     creds_path = str(Path(credentials_path).resolve())
@@ -56,85 +85,285 @@ def _get_service(credentials_path: Path):
             creds = flow.run_local_server(port=REDIRECT_PORT)
         with open(token_path, "w", encoding="utf-8") as f:
             f.write(creds.to_json())
+    return creds
+
+
+def _build_service(creds):
+    from googleapiclient.discovery import build
 
     return build("drive", "v3", credentials=creds)
 
 
+def _get_service(credentials_path: Path):
+    """Создать Drive API service с OAuth2 (Desktop OAuth, run_local_server)."""
+    return _build_service(_get_credentials(credentials_path))
+
+
+def _thread_service(creds):
+    """
+    Service потока: httplib2 под googleapiclient не потокобезопасен,
+    поэтому у каждого потока пула свой объект (учётные данные общие).
+    """
+    service = getattr(_local, "service", None)
+    if service is None or getattr(_local, "creds", None) is not creds:
+        service = _local.service = _build_service(creds)
+        _local.creds = creds
+    return service
+
+
+def _list_page(service, folder_id: str, page_token: str | None) -> dict:
+    """Одна страница содержимого папки (до LIST_PAGE_SIZE объектов, только нужные поля)."""
+    return (
+        service.files()
+        .list(
+            q=f"'{folder_id}' in parents and trashed = false",
+            pageSize=LIST_PAGE_SIZE,
+            pageToken=page_token,
+            fields=LIST_FIELDS,
+            supportsAllDrives=True,
+            includeItemsFromAllDrives=True,
+        )
+        .execute(num_retries=API_RETRIES)
+    )
+
+
+def _to_meta(f: dict, path_prefix: str) -> FileMeta:
+    return FileMeta(
+        file_id=f["id"],
+        name=f["name"],
+        mime_type=f.get("mimeType", ""),
+        size=int(f["size"]) if f.get("size") else None,
+        modified_time=f.get("modifiedTime"),
+        path=f"{path_prefix}{f['name']}".strip("/"),
+        is_folder=f.get("mimeType") == FOLDER_MIME,
+    )
+
+
 def list_files(
     service,
     folder_id: str,
     path_prefix: str = "",
 ) -> Generator[FileMeta, None, None]:
-    """Рекурсивно получить список файлов в папке."""
+    """Рекурсивно получить список файлов в папке (последовательно; для больших деревьев — list_files_parallel)."""
     page_token = None
     while True:
-        resp = (
-            service.files()
-            .list(
-                q=f"'{folder_id}' in parents and trashed = false",
-                pageSize=100,
-                pageToken=page_token,
-                fields="nextPageToken, files(id, name, mimeType, size, modifiedTime)",
-                supportsAllDrives=True,
-                includeItemsFromAllDrives=True,
-            )
-            .execute()
-        )
+        resp = _list_page(service, folder_id, page_token)
         for f in resp.get("files", []):
-            meta = FileMeta(
-                file_id=f["id"],
-                name=f["name"],
-                mime_type=f.get("mimeType", ""),
-                size=int(f["size"]) if f.get("size") else None,
-                modified_time=f.get("modifiedTime"),
-                path=f"{path_prefix}{f['name']}".strip("/"),
-                is_folder=f.get("mimeType") == FOLDER_MIME,
-            )
+            meta = _to_meta(f, path_prefix)
             if meta.mime_type in SKIP_MIME:
                 continue
+            yield meta
             if meta.is_folder:
-                yield meta
                 yield from list_files(service, meta.file_id, f"{meta.path}/")
-            else:
-                yield meta
         page_token = resp.get("nextPageToken")
         if not page_token:
             break
 
 
-def _cache_meta_path(file_id: str) -> Path:
-    """Путь к файлу метаданных в кеше."""
-    return CACHE_DOWNLOADS / file_id / "meta.json"
+def list_files_parallel(
+    creds,
+    folder_id: str,
+    path_prefix: str = "",
+    workers: int = DRIVE_LIST_WORKERS,
+) -> Generator[FileMeta, None, None]:
+    """
+    Обход дерева в ширину: страницы разных папок запрашиваются параллельно
+    (до workers запросов, service на поток). FileMeta отдаются по мере ответов,
+    порядок — не как у list_files, пути те же.
+    """
+    # Очередь страниц к запросу: (folder_id, path_prefix, page_token)
+    pending: deque[tuple[str, str, str | None]] = deque([(folder_id, path_prefix, None)])
+    running: dict[Future, tuple[str, str]] = {}
 
+    def fetch(fid: str, token: str | None) -> dict:
+        return _list_page(_thread_service(creds), fid, token)
 
-def _cached_modified_time(file_id: str) -> str | None:
-    """Вернуть modifiedTime из кеша или None."""
-    p = _cache_meta_path(file_id)
-    if p.exists():
-        try:
-            with open(p, encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get("modified_time")
-        except (json.JSONDecodeError, OSError):
-            pass
-    return None
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="drive-list") as pool:
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                fid, prefix, token = pending.popleft()
+                running[pool.submit(fetch, fid, token)] = (fid, prefix)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                fid, prefix = running.pop(fut)
+                resp = fut.result()
+                if resp.get("nextPageToken"):
+                    # Следующая страница той же папки — вперёд подпапок, чтобы папка не висела
+                    pending.appendleft((fid, prefix, resp["nextPageToken"]))
+                for f in resp.get("files", []):
+                    meta = _to_meta(f, prefix)
+                    if meta.mime_type in SKIP_MIME:
+                        continue
+                    if meta.is_folder:
+                        pending.append((meta.file_id, f"{meta.path}/", None))
+                    yield meta
 
 
 def _save_meta(file_id: str, meta: FileMeta, local_path: Path) -> None:
-    """Сохранить метаданные в кеш."""
-    dir_path = CACHE_DOWNLOADS / file_id
-    dir_path.mkdir(parents=True, exist_ok=True)
-    data = {
-        "file_id": meta.file_id,
-        "name": meta.name,
-        "mime_type": meta.mime_type,
-        "size": meta.size,
-        "modified_time": meta.modified_time,
-        "path": meta.path,
-        "local_path": str(local_path),
+    """Записать скачанный файл в индекс кеша."""
+    from src.storage.files_index import STATUS_DOWNLOADED, set_file
+
+    set_file(meta, STATUS_DOWNLOADED, local_path)
+
+
+def _cached_download(meta: FileMeta) -> Path | None:
+    """local_path из индекса кеша, если файл скачан и modifiedTime совпадает, иначе None."""
+    from src.storage.files_index import STATUS_DOWNLOADED, get_file
+
+    found = get_file(meta.file_id)
+    if found is None:
+        return None
+    cached, status = found
+    if status != STATUS_DOWNLOADED or not cached.local_path or not cached.modified_time:
+        return None
+    if cached.modified_time != meta.modified_time:
+        return None
+    if cached.path != meta.path or cached.name != meta.name:
+        # Перенос/переименование без правки содержимого — обновить только метаданные
+        _save_meta(meta.file_id, meta, cached.local_path)
+    return cached.local_path
+
+
+def _local_path(meta: FileMeta) -> Path:
+    """Куда скачивать: .cache/downloads/<file_id>/file<ext>."""
+    # Расширение из имени или по MIME
+    ext_map = {
+        "application/pdf": ".pdf",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+        "text/plain": ".txt",
+        "text/markdown": ".md",
     }
-    with open(_cache_meta_path(file_id), "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    ext = Path(meta.name).suffix or ext_map.get(meta.mime_type, ".bin")
+    return CACHE_DOWNLOADS / meta.file_id / f"file{ext}"
+
+
+class DownloadSkipped(Exception):
+    """Файл не скачивается по политике (тип или размер) — не ошибка, повторять не нужно."""
+
+
+def _skip_reason(meta: FileMeta) -> str | None:
+    """Причина пропуска по политике download_* в config.yaml или None."""
+    if meta.mime_type in EXPORT_MIME:
+        return None
+    if any(meta.mime_type.startswith(prefix) for prefix in DOWNLOAD_SKIP_MIME_PREFIXES):
+        return f"тип {meta.mime_type}"
+    size_mb = (meta.size or 0) / MB
+    if DOWNLOAD_MAX_MB and size_mb > DOWNLOAD_MAX_MB:
+        return f"{size_mb:.0f} МБ > download_max_mb"
+    if DOWNLOAD_MAX_UNREADABLE_MB and size_mb > DOWNLOAD_MAX_UNREADABLE_MB and get_loader(_local_path(meta)) is None:
+        return f"{size_mb:.0f} МБ, формат не читается ни одним loader"
+    return None
+
+
+def _part_path(local_path: Path, meta: FileMeta, k: int | None = None) -> Path:
+    """
+    Недокачанный файл: версия (modifiedTime) в имени — после правки файла
+    в Drive старая часть не продолжается. k — номер диапазона при параллельной загрузке.
+    """
+    tag = hashlib.sha1((meta.modified_time or "").encode()).hexdigest()[:10]
+    suffix = "" if k is None else str(k)
+    return local_path.with_name(f"{local_path.name}.{tag}.part{suffix}")
+
+
+def _drop_stale_parts(local_path: Path, meta: FileMeta) -> None:
+    current = _part_path(local_path, meta).name
+    for p in local_path.parent.glob(f"{local_path.name}.*.part*"):
+        if not p.name.startswith(current):
+            p.unlink(missing_ok=True)
+
+
+def _download_whole(request, part: Path) -> int:
+    """Размер заранее неизвестен (экспорт Google Docs): потоково целиком, без докачки."""
+    from googleapiclient.http import MediaIoBaseDownload
+
+    with open(part, "wb") as fh:
+        downloader = MediaIoBaseDownload(fh, request, chunksize=DRIVE_CHUNK_MB * MB)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk(num_retries=API_RETRIES)
+    return part.stat().st_size
+
+
+def _download_range(request, part: Path, start: int, end: int) -> int:
+    """
+    Байты [start, end] кусками по drive_chunk_mb в part (дозапись): уже скачанное
+    не запрашивается повторно. Вернуть число байт, скачанных сейчас.
+    """
+    from googleapiclient.errors import HttpError
+
+    have = part.stat().st_size if part.exists() else 0
+    if have > end - start + 1:
+        part.unlink()
+        have = 0
+    pos = start + have
+    with open(part, "ab") as fh:
+        while pos <= end:
+            hi = min(pos + DRIVE_CHUNK_MB * MB - 1, end)
+            resp, content = request.http.request(request.uri, method="GET", headers={"range": f"bytes={pos}-{hi}"})
+            if resp.status not in (200, 206) or (resp.status == 200 and pos != 0):
+                raise HttpError(resp, content, uri=request.uri)
+            if not content:
+                raise ConnectionError(f"пустой ответ на диапазон {pos}-{hi}")
+            fh.write(content[: end - pos + 1])
+            pos += min(len(content), end - pos + 1)
+    return pos - start - have
+
+
+def _download_parallel(creds, meta: FileMeta, local_path: Path, part: Path) -> int:
+    """Большой файл: drive_range_parts диапазонов одновременно, каждый — своим service, затем склейка."""
+    size = meta.size or 0
+    parts = max(1, DRIVE_RANGE_PARTS)
+    step = -(-size // parts)
+    ranges = [(k, k * step, min(size, (k + 1) * step) - 1) for k in range(parts) if k * step < size]
+
+    def fetch(k: int, start: int, end: int) -> int:
+        request = _thread_service(creds).files().get_media(fileId=meta.file_id, supportsAllDrives=True)
+        return _download_range(request, _part_path(local_path, meta, k), start, end)
+
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="drive-range") as pool:
+        nbytes = sum(pool.map(lambda r: fetch(*r), ranges))
+    with open(part, "wb") as out:
+        for k, _, _ in ranges:
+            piece = _part_path(local_path, meta, k)
+            with open(piece, "rb") as fh:
+                shutil.copyfileobj(fh, out, DRIVE_CHUNK_MB * MB)
+    for k, _, _ in ranges:
+        _part_path(local_path, meta, k).unlink(missing_ok=True)
+    return nbytes
+
+
+def _fetch(service, meta: FileMeta, creds=None) -> tuple[Path, int]:
+    """
+    Скачать файл (без проверки кеша) потоково в .part и атомарно переименовать.
+    Прерванная загрузка продолжается с места обрыва; файл от drive_parallel_min_mb
+    (при переданных creds) качается параллельными диапазонами.
+    Вернуть (local_path, скачано байт). Ошибки API — наружу.
+    """
+    reason = _skip_reason(meta)
+    if reason:
+        raise DownloadSkipped(reason)
+    local_path = _local_path(meta)
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    _drop_stale_parts(local_path, meta)
+    part = _part_path(local_path, meta)
+    files = service.files()
+    if meta.mime_type in EXPORT_MIME:
+        export_mime = EXPORT_MIME[meta.mime_type]
+        if "document" in meta.mime_type:
+            export_mime = "text/plain"  # проще парсить текст
+        nbytes = _download_whole(files.export_media(fileId=meta.file_id, mimeType=export_mime), part)
+    elif not meta.size:
+        nbytes = _download_whole(files.get_media(fileId=meta.file_id, supportsAllDrives=True), part)
+    elif creds is not None and DRIVE_PARALLEL_MIN_MB and meta.size >= DRIVE_PARALLEL_MIN_MB * MB:
+        nbytes = _download_parallel(creds, meta, local_path, part)
+    else:
+        request = files.get_media(fileId=meta.file_id, supportsAllDrives=True)
+        nbytes = _download_range(request, part, 0, meta.size - 1)
+
+    os.replace(part, local_path)
+    meta.local_path = local_path
+    _save_meta(meta.file_id, meta, local_path)
+    return local_path, nbytes
 
 
 def download_file(
@@ -146,72 +375,181 @@ def download_file(
     Скачать файл в кеш. Вернуть local_path или None при ошибке.
     Не качает повторно, если modifiedTime совпадает с кешем.
     """
-    cached_mtime = _cached_modified_time(meta.file_id)
-    if not force and cached_mtime and cached_mtime == meta.modified_time:
-        p = _cache_meta_path(meta.file_id)
-        if p.exists():
-            try:
-                with open(p, encoding="utf-8") as f:
-                    data = json.load(f)
-                return Path(data.get("local_path", "")) if data.get("local_path") else None
-            except (json.JSONDecodeError, OSError):
-                pass
+    if not force:
+        cached = _cached_download(meta)
+        if cached is not None:
+            return cached
+    try:
+        return _fetch(service, meta)[0]
+    except Exception:
+        return None
 
-    dir_path = CACHE_DOWNLOADS / meta.file_id
-    dir_path.mkdir(parents=True, exist_ok=True)
 
-    # Расширение из имени или по MIME
-    ext_map = {
-        "application/pdf": ".pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
-        "text/plain": ".txt",
-        "text/markdown": ".md",
-    }
-    ext = Path(meta.name).suffix or ext_map.get(meta.mime_type, ".bin")
-    local_path = dir_path / f"file{ext}"
+def _http_status(e: Exception) -> int | None:
+    resp = getattr(e, "resp", None)
+    try:
+        return int(getattr(resp, "status", None))
+    except (TypeError, ValueError):
+        return None
+
 
+def _is_retryable(e: Exception) -> bool:
+    """
+    429/5xx и сетевые сбои (обрыв соединения, таймаут, транспорт httplib2) — повторять;
+    прочие 4xx, пропуск по политике и локальные ошибки (диск, баги) — нет.
+    """
+    if isinstance(e, DownloadSkipped):
+        return False
+    status = _http_status(e)
+    if status is not None:
+        return status in RETRY_STATUSES
+    if isinstance(e, (ConnectionError, TimeoutError, socket.timeout)):
+        return True
     try:
-        if meta.mime_type in EXPORT_MIME:
-            export_mime = EXPORT_MIME[meta.mime_type]
-            if "document" in meta.mime_type:
-                export_mime = "text/plain"  # проще парсить текст
-            content = service.files().export_media(fileId=meta.file_id, mimeType=export_mime).execute()
-        else:
-            content = service.files().get_media(fileId=meta.file_id).execute()
+        from httplib2 import HttpLib2Error
+    except ImportError:
+        return False
+    return isinstance(e, HttpLib2Error)
 
-        with open(local_path, "wb") as f:
-            f.write(content)
-        meta.local_path = local_path
-        _save_meta(meta.file_id, meta, local_path)
-        return local_path
-    except Exception:
-        return None
+
+def _download_one(creds, meta: FileMeta, force: bool) -> tuple[Path | None, int]:
+    """
+    Воркер пула: кеш по modifiedTime, иначе скачивание service'ом потока
+    с повторами (пауза 1, 2, 4... с); повтор продолжает .part с места обрыва.
+    Вернуть (local_path, скачано байт).
+    """
+    if not force:
+        cached = _cached_download(meta)
+        if cached is not None:
+            return cached, 0
+    attempt, delay = 0, 1.0
+    while True:
+        try:
+            return _fetch(_thread_service(creds), meta, creds)
+        except Exception as e:
+            if attempt >= DRIVE_DOWNLOAD_RETRIES or not _is_retryable(e):
+                raise
+            attempt += 1
+            logger.debug("Повтор %s (%s/%s): %s", meta.path, attempt, DRIVE_DOWNLOAD_RETRIES, e)
+            time.sleep(delay * (0.5 + random.random()))
+            delay *= 2
 
 
-def ingest(
+def download_many(
+    creds,
+    metas: list[FileMeta],
+    force: bool = False,
+    workers: int = DRIVE_DOWNLOAD_WORKERS,
+    window: int | None = None,
+) -> Generator[tuple[FileMeta, Path | None, int, Exception | None], None, None]:
+    """
+    Параллельное скачивание: workers потоков, у каждого свой service и HTTP-соединение.
+    Отдаёт (meta, local_path, скачано байт, ошибка) по мере готовности;
+    неизменённые по modifiedTime файлы берутся из кеша (0 байт).
+    В работе не больше window файлов (по умолчанию 2 × workers): следующий ставится,
+    когда потребитель забрал готовый, — медленный потребитель тормозит скачивание.
+    Закрытие генератора отменяет ещё не начатые скачивания.
+    """
+    workers = max(1, workers)
+    window = max(1, window or 2 * workers)
+    todo = iter(metas)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive-dl")
+    futures: dict[Future, FileMeta] = {}
+
+    def submit_next() -> None:
+        meta = next(todo, None)
+        if meta is not None:
+            futures[pool.submit(_download_one, creds, meta, force)] = meta
+
+    try:
+        for _ in range(window):
+            submit_next()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in done:
+                meta = futures.pop(fut)
+                try:
+                    local_path, nbytes = fut.result()
+                    yield meta, local_path, nbytes, None
+                except Exception as e:
+                    yield meta, None, 0, e
+                submit_next()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def ingest_iter(
     folder_id: str,
     credentials_path: Path,
     force: bool = False,
-) -> list[FileMeta]:
+    full: bool = False,
+    progress: bool = True,
+) -> Generator[FileMeta, None, None]:
     """
-    Ингест: получить список файлов, скачать в кеш.
-    Вернуть список FileMeta с заполненным local_path для скачанных.
+    Ингест по мере скачивания: FileMeta отдаётся, как только файл готов
+    (local_path заполнен; None — пропущен или ошибка).
+    Список — по ленте изменений Drive от прошлого ингеста (src.sources.drive_changes),
+    первый раз или full=True — полный листинг дерева. Скачивание — в drive_download_workers потоков.
     """
+    from src.sources.drive_changes import sync_tree
+    from src.storage.files_index import STATUS_SKIPPED, set_failed, set_file
+
     ensure_cache_dirs()
     credentials_path = Path(credentials_path)
     if not credentials_path.exists():
         raise FileNotFoundError(f"Credentials not found: {credentials_path}")
 
-    service = _get_service(credentials_path)
-    files_meta: list[FileMeta] = []
-    all_files = list(list_files(service, folder_id))
-    file_items = [m for m in all_files if not m.is_folder]
-    for meta in tqdm(file_items, desc="Скачивание", unit="файл"):
-        try:
-            local = download_file(service, meta, force=force)
-            if local:
+    creds = _get_credentials(credentials_path)
+    file_items = sync_tree(creds, folder_id, full=full).metas()
+    downloaded = total_bytes = 0
+    started = time.monotonic()
+    bar = tqdm(total=len(file_items), desc="Скачивание", unit="файл", disable=not progress)
+    downloads = download_many(creds, file_items, force=force)
+    try:
+        for meta, local, nbytes, error in downloads:
+            if isinstance(error, DownloadSkipped):
+                logger.info("Пропуск %s: %s", meta.path, error)
+                set_file(meta, STATUS_SKIPPED)
+            elif error is not None:
+                previous = set_failed(meta)
+                if previous is not None:
+                    # Прежняя копия цела — остаётся в индексе и идёт дальше вместо новой версии
+                    logger.warning("Ошибка %s: %s — оставлена прежняя копия", meta.path, error)
+                    meta = replace(previous, name=meta.name, path=meta.path)
+                else:
+                    logger.warning("Ошибка %s: %s", meta.path, error)
+            elif local:
                 meta.local_path = local
-        except Exception as e:
-            logger.warning("Ошибка %s: %s", meta.path, e)
-        files_meta.append(meta)
-    return files_meta
+            if nbytes:
+                downloaded += 1
+                total_bytes += nbytes
+                bar.set_postfix_str(_fmt_rate(total_bytes, time.monotonic() - started))
+            bar.update(1)
+            yield meta
+    finally:
+        # Потребитель остановился (close) — незапущенные скачивания отменяются
+        downloads.close()
+        bar.close()
+    elapsed = time.monotonic() - started
+    if downloaded:
+        logger.info(
+            "Скачано %s файлов, %.1f МБ за %.1f с (%s)",
+            downloaded, total_bytes / 1e6, elapsed, _fmt_rate(total_bytes, elapsed),
+        )
+
+
+def ingest(
+    folder_id: str,
+    credentials_path: Path,
+    force: bool = False,
+    full: bool = False,
+) -> list[FileMeta]:
+    """
+    Ингест: получить список файлов, скачать в кеш.
+    Вернуть список FileMeta (в порядке путей) с заполненным local_path для скачанных.
+    """
+    return sorted(ingest_iter(folder_id, credentials_path, force=force, full=full), key=lambda m: m.path)
+
+
+def _fmt_rate(nbytes: int, seconds: float) -> str:
+    return f"{nbytes / max(seconds, 1e-6) / 1e6:.2f} МБ/с"
@@ -0,0 +1,211 @@
+"""Инкрементальный ингест Drive через Changes API: .cache/drive_changes.json — токен и индекс дерева."""
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+
+from src.config import CACHE_DIR, CACHE_DOWNLOADS, ensure_cache_dirs
+from src.sources.drive_api import (
+    API_RETRIES,
+    FOLDER_MIME,
+    LIST_PAGE_SIZE,
+    SKIP_MIME,
+    _build_service,
+    _to_meta,
+    list_files_parallel,
+)
+from src.sources.models import FileMeta
+from src.storage.files_index import delete_files
+
+logger = logging.getLogger(__name__)
+
+CHANGES_STATE_PATH = CACHE_DIR / "drive_changes.json"
+CHANGES_FIELDS = (
+    "nextPageToken, newStartPageToken, "
+    "changes(fileId, removed, file(id, name, mimeType, size, modifiedTime, parents, trashed))"
+)
+
+
+@dataclass
+class ChangesState:
+    """Состояние синхронизации папки: токен ленты изменений и индекс дерева."""
+
+    folder_id: str
+    page_token: str
+    folders: dict[str, str] = field(default_factory=dict)  # folder_id → path ("" — корень)
+    files: dict[str, dict] = field(default_factory=dict)  # file_id → {name, mime_type, size, modified_time, path}
+
+    @classmethod
+    def load(cls, folder_id: str) -> "ChangesState | None":
+        """Состояние для папки или None (нет, битое или другая папка)."""
+        if not CHANGES_STATE_PATH.exists():
+            return None
+        try:
+            data = json.loads(CHANGES_STATE_PATH.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return None
+        if data.get("folder_id") != folder_id or not data.get("page_token"):
+            return None
+        return cls(folder_id, data["page_token"], data.get("folders", {}), data.get("files", {}))
+
+    def save(self) -> None:
+        """Записать атомарно (tmp + rename)."""
+        ensure_cache_dirs()
+        data = {
+            "folder_id": self.folder_id,
+            "page_token": self.page_token,
+            "folders": self.folders,
+            "files": self.files,
+        }
+        tmp = CHANGES_STATE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, CHANGES_STATE_PATH)
+
+    def add(self, meta: FileMeta) -> None:
+        if meta.is_folder:
+            self.folders[meta.file_id] = meta.path
+        else:
+            self.files[meta.file_id] = {
+                "name": meta.name,
+                "mime_type": meta.mime_type,
+                "size": meta.size,
+                "modified_time": meta.modified_time,
+                "path": meta.path,
+            }
+
+    def metas(self) -> list[FileMeta]:
+        """Файлы дерева (без папок) в порядке путей."""
+        return sorted(
+            (
+                FileMeta(
+                    file_id=fid,
+                    name=f["name"],
+                    mime_type=f["mime_type"],
+                    size=f.get("size"),
+                    modified_time=f.get("modified_time"),
+                    path=f["path"],
+                    is_folder=False,
+                )
+                for fid, f in self.files.items()
+            ),
+            key=lambda m: m.path,
+        )
+
+
+def _start_page_token(service) -> str:
+    resp = service.changes().getStartPageToken(supportsAllDrives=True).execute(num_retries=API_RETRIES)
+    return resp["startPageToken"]
+
+
+def bootstrap(creds, folder_id: str) -> ChangesState:
+    """
+    Полный листинг дерева. Токен берётся до листинга: изменения, случившиеся
+    во время обхода, придут в следующей синхронизации, а не потеряются.
+    """
+    token = _start_page_token(_build_service(creds))
+    state = ChangesState(folder_id, token, folders={folder_id: ""})
+    for meta in list_files_parallel(creds, folder_id):
+        state.add(meta)
+    return state
+
+
+def _fetch_changes(service, page_token: str) -> tuple[list[dict], str]:
+    """Все изменения с page_token. Вернуть (changes, новый стартовый токен)."""
+    changes: list[dict] = []
+    while True:
+        resp = (
+            service.changes()
+            .list(
+                pageToken=page_token,
+                pageSize=LIST_PAGE_SIZE,
+                fields=CHANGES_FIELDS,
+                includeRemoved=True,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            )
+            .execute(num_retries=API_RETRIES)
+        )
+        changes.extend(resp.get("changes", []))
+        if resp.get("newStartPageToken"):
+            return changes, resp["newStartPageToken"]
+        page_token = resp["nextPageToken"]
+
+
+def _apply_changes(state: ChangesState, changes: list[dict], creds) -> tuple[int, int, bool]:
+    """
+    Применить изменения к индексу. Вернуть (добавлено/изменено, удалено, нужен_полный_листинг).
+    Переименование, перенос или удаление папки меняет пути всех потомков —
+    такие изменения требуют полного листинга.
+    """
+    changed = removed = 0
+    for ch in changes:
+        fid = ch.get("fileId")
+        f = ch.get("file") or {}
+        gone = ch.get("removed") or f.get("trashed")
+        parent_path = next((state.folders[p] for p in f.get("parents", []) if p in state.folders), None)
+
+        if fid == state.folder_id:
+            if gone:
+                return changed, removed, True
+            continue
+        if fid in state.folders:
+            if gone or parent_path is None or _to_meta(f, _prefix(parent_path)).path != state.folders[fid]:
+                return changed, removed, True
+            continue
+        if gone or parent_path is None or f.get("mimeType") in SKIP_MIME:
+            # Удалён, в корзине или перенесён за пределы дерева
+            if state.files.pop(fid, None) is not None:
+                removed += 1
+            continue
+
+        meta = _to_meta(f, _prefix(parent_path))
+        state.add(meta)
+        changed += 1
+        if f.get("mimeType") == FOLDER_MIME:
+            # Новая папка в дереве (создана или перенесена извне вместе с содержимым)
+            for child in list_files_parallel(creds, fid, path_prefix=f"{meta.path}/"):
+                state.add(child)
+                changed += 1
+    return changed, removed, False
+
+
+def _prefix(parent_path: str) -> str:
+    return f"{parent_path}/" if parent_path else ""
+
+
+def _drop_downloads(file_ids: set[str]) -> None:
+    """Убрать из кеша (и индекса файлов) скачанное для файлов, которых больше нет в дереве."""
+    if not file_ids:
+        return
+    delete_files(file_ids)
+    for fid in file_ids:
+        shutil.rmtree(CACHE_DOWNLOADS / fid, ignore_errors=True)
+
+
+def sync_tree(creds, folder_id: str, full: bool = False) -> ChangesState:
+    """
+    Актуальный индекс дерева: по ленте изменений от сохранённого токена,
+    без состояния (или full) — полный листинг. Удалённые файлы убираются из кеша.
+    """
+    state = None if full else ChangesState.load(folder_id)
+    if state is not None:
+        changes, token = _fetch_changes(_build_service(creds), state.page_token)
+        before = set(state.files)
+        changed, removed, relist = _apply_changes(state, changes, creds)
+        if relist:
+            logger.info("Drive: переименована/перенесена папка — полный листинг")
+            fresh = bootstrap(creds, folder_id)
+            _drop_downloads(before - set(fresh.files))
+            state = fresh
+        else:
+            logger.info("Drive: изменений %s, изменено %s, удалено %s", len(changes), changed, removed)
+            _drop_downloads(before - set(state.files))
+            state.page_token = token
+    else:
+        previous = ChangesState.load(folder_id)
+        state = bootstrap(creds, folder_id)
+        if previous is not None:
+            _drop_downloads(set(previous.files) - set(state.files))
+    state.save()
+    return state
@@ -28,4 +28,4 @@ class DriveSource(BaseSource):
         from src.config import GOOGLE_DRIVE_FOLDER_ID
 
         fid = folder_id or kwargs.get("folder_id") or GOOGLE_DRIVE_FOLDER_ID
-        return drive_ingest(fid, self.credentials_path, force=force)
+        return drive_ingest(fid, self.credentials_path, force=force, full=kwargs.get("full", False))
@@ -1,6 +1,32 @@
 """Кеш: файлы, тексты, результаты LLM."""
 
-from src.storage.cache import get_llm_cache, set_llm_cache
+from src.storage.cache import (
+    flush_llm_cache,
+    get_llm_cache,
+    llm_cache_stage_stats,
+    llm_cache_stats,
+    reset_llm_cache_stats,
+    set_llm_cache,
+)
+from src.storage.files_index import get_file, iter_files, query_files, set_file, status_counts
 from src.storage.load_cached import load_cached_files
+from src.storage.texts import get_cached_text, iter_text_cached, load_text_cached, set_cached_text
 
-__all__ = ["get_llm_cache", "set_llm_cache", "load_cached_files"]
+__all__ = [
+    "flush_llm_cache",
+    "get_llm_cache",
+    "llm_cache_stage_stats",
+    "llm_cache_stats",
+    "reset_llm_cache_stats",
+    "set_llm_cache",
+    "get_file",
+    "iter_files",
+    "query_files",
+    "set_file",
+    "status_counts",
+    "load_cached_files",
+    "get_cached_text",
+    "iter_text_cached",
+    "load_text_cached",
+    "set_cached_text",
+]
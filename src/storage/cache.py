@@ -1,35 +1,225 @@
-"""Кеш LLM по hash(prompt + text + model)."""
-import hashlib
-import json
-from pathlib import Path
-
-from src.config import CACHE_LLM, ensure_cache_dirs
-
-
-def _hash_key(prompt: str, text: str, model: str) -> str:
-    return hashlib.sha256(f"{prompt}|{text}|{model}".encode()).hexdigest()
-
-
-def get_llm_cache(prompt: str, text: str, model: str) -> str | None:
-    """Вернуть кешированный ответ или None."""
-    ensure_cache_dirs()
-    key = _hash_key(prompt, text, model)
-    path = CACHE_LLM / f"{key}.json"
-    if path.exists():
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            return data.get("content")
-        except (json.JSONDecodeError, OSError):
-            pass
-    return None
-
-
-def set_llm_cache(prompt: str, text: str, model: str, content: str) -> None:
-    """Сохранить ответ в кеш."""
-    ensure_cache_dirs()
-    key = _hash_key(prompt, text, model)
-    path = CACHE_LLM / f"{key}.json"
-    path.write_text(
-        json.dumps({"content": content, "model": model}, ensure_ascii=False, indent=0),
-        encoding="utf-8",
-    )
+"""Кеш ответов LLM по каноническому ключу (src.llm.cache_key) — один файл SQLite (WAL)."""
+import atexit
+import logging
+import time
+from threading import Lock
+
+from src.config import CACHE_DIR, CACHE_LLM, LLM_MEMORY_CACHE_ENTRIES, LLM_MEMORY_CACHE_MB
+from src.storage.lru import LRUCache
+from src.storage.sqlite import connect, db_size
+
+logger = logging.getLogger(__name__)
+
+LLM_DB_PATH = CACHE_DIR / "llm.sqlite3"
+WRITE_BATCH = 64  # записей в одной транзакции
+WRITE_INTERVAL = 1.0  # сек: буфер сбрасывается не реже
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    model TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    stage TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS stage_stats (
+    stage TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+_lock = Lock()
+_initialized = False
+_pending: dict[str, tuple[str, str, str]] = {}  # key → (content, model, stage), ещё не в базе
+_flushing: dict[str, tuple[str, str, str]] = {}  # пишутся сейчас — видны читателям до COMMIT
+_last_flush = time.monotonic()
+_stats = {"hits": 0, "memory_hits": 0, "misses": 0, "writes": 0}
+_stage_delta: dict[str, list[int]] = {}  # stage → [hits, misses], ещё не в stage_stats
+# Горячий слой в памяти: повторные промпты не ходят в SQLite
+_memory = LRUCache(LLM_MEMORY_CACHE_ENTRIES, LLM_MEMORY_CACHE_MB * 1024 * 1024)
+
+
+def _db():
+    """Соединение потока; при первом обращении в процессе — апгрейд схемы."""
+    global _initialized
+    conn = connect(LLM_DB_PATH, _SCHEMA)
+    if not _initialized:
+        with _lock:
+            if not _initialized:
+                _upgrade_schema(conn)
+                _initialized = True
+    return conn
+
+
+def _upgrade_schema(conn) -> None:
+    """
+    Базы, созданные до колонки stage, получают её с пустым значением. Такие записи
+    (и старый JSON-кеш) по каноническим ключам недостижимы — см. purge_orphaned_llm_cache.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_cache)")}
+    if "stage" not in columns:
+        conn.execute("ALTER TABLE llm_cache ADD COLUMN stage TEXT NOT NULL DEFAULT ''")
+
+
+def purge_orphaned_llm_cache() -> tuple[int, int]:
+    """
+    Удалить записи, недостижимые по каноническим ключам: строки без этапа (записаны до
+    src.llm.cache_key) и файлы старого JSON-кеша .cache/llm/*.json. Вернуть (строк, файлов).
+    """
+    flush_llm_cache()
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute("DELETE FROM llm_cache WHERE stage = ''").rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if rows:
+        conn.execute("VACUUM")  # вернуть место на диске
+    files = 0
+    if CACHE_LLM.exists():
+        for path in CACHE_LLM.glob("*.json"):
+            try:
+                path.unlink()
+                files += 1
+            except OSError:
+                continue
+    return rows, files
+
+
+def _count(stage: str, hit: bool) -> None:
+    """Учёт попадания/промаха (вызывать под _lock)."""
+    _stats["hits" if hit else "misses"] += 1
+    delta = _stage_delta.setdefault(stage, [0, 0])
+    delta[0 if hit else 1] += 1
+
+
+def get_llm_cache(key: str, stage: str = "") -> str | None:
+    """
+    Вернуть кешированный ответ или None: память → буфер записи → SQLite.
+    stage — этап пайплайна (chunk, doc, folder, global) для статистики попаданий.
+    """
+    content = _memory.get(key)
+    if content is not None:
+        with _lock:
+            _stats["memory_hits"] += 1
+            _count(stage, True)
+        return content
+    with _lock:
+        pending = _pending.get(key) or _flushing.get(key)
+    if pending is not None:
+        content = pending[0]
+    else:
+        row = _db().execute("SELECT content FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        content = row[0] if row else None
+    if content is not None:
+        _memory.set(key, content)
+    with _lock:
+        _count(stage, content is not None)
+    return content
+
+
+def set_llm_cache(key: str, content: str, model: str = "", stage: str = "") -> None:
+    """Сохранить ответ в кеш (пачками: WRITE_BATCH записей или раз в WRITE_INTERVAL)."""
+    _memory.set(key, content)
+    with _lock:
+        _pending[key] = (content, model, stage)
+        due = len(_pending) >= WRITE_BATCH or time.monotonic() - _last_flush >= WRITE_INTERVAL
+    if due:
+        flush_llm_cache()
+
+
+def flush_llm_cache() -> None:
+    """Записать буфер ответов и счётчики этапов в базу одной транзакцией."""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _flushing.update(batch)
+        deltas = {stage: tuple(d) for stage, d in _stage_delta.items()}
+        _stage_delta.clear()
+        _last_flush = time.monotonic()
+    if not batch and not deltas:
+        return
+    now = time.time()
+    conn = _db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR REPLACE INTO llm_cache (key, content, model, created, stage) VALUES (?, ?, ?, ?, ?)",
+            [(key, content, model, now, stage) for key, (content, model, stage) in batch.items()],
+        )
+        conn.executemany(
+            "INSERT INTO stage_stats (stage, hits, misses) VALUES (?, ?, ?) "
+            "ON CONFLICT(stage) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+            [(stage, hits, misses) for stage, (hits, misses) in deltas.items()],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        with _lock:
+            # Вернуть в буфер то, что не перезаписали новыми значениями
+            for key, value in batch.items():
+                _pending.setdefault(key, value)
+                _flushing.pop(key, None)
+            for stage, (hits, misses) in deltas.items():
+                delta = _stage_delta.setdefault(stage, [0, 0])
+                delta[0] += hits
+                delta[1] += misses
+        raise
+    with _lock:
+        for key in batch:
+            _flushing.pop(key, None)
+        _stats["writes"] += len(batch)
+
+
+def llm_cache_stats() -> dict[str, float]:
+    """Статистика: попадания/промахи за процесс, число записей и размер базы."""
+    entries = _db().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_ratio": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "pending": len(_pending) + len(_flushing),
+            "size_bytes": db_size(LLM_DB_PATH),
+            "memory_entries": _memory.stats()["entries"],
+            "memory_bytes": _memory.stats()["bytes"],
+        }
+
+
+def llm_cache_stage_stats() -> list[dict]:
+    """Накопленная (по всем запускам) статистика по этапам: попадания, промахи, записи."""
+    flush_llm_cache()
+    conn = _db()
+    rows: dict[str, dict] = {}
+    for stage, hits, misses in conn.execute("SELECT stage, hits, misses FROM stage_stats"):
+        rows[stage] = {"stage": stage, "hits": hits, "misses": misses, "entries": 0, "bytes": 0}
+    for stage, entries, size in conn.execute(
+        "SELECT stage, COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM llm_cache GROUP BY stage"
+    ):
+        row = rows.setdefault(stage, {"stage": stage, "hits": 0, "misses": 0, "entries": 0, "bytes": 0})
+        row["entries"], row["bytes"] = entries, size
+    for row in rows.values():
+        lookups = row["hits"] + row["misses"]
+        row["hit_ratio"] = round(row["hits"] / lookups, 3) if lookups else 0.0
+    return sorted(rows.values(), key=lambda r: r["stage"])
+
+
+def reset_llm_cache_stats() -> None:
+    """Обнулить накопленную статистику этапов (записи кеша не трогаются)."""
+    flush_llm_cache()
+    _db().execute("DELETE FROM stage_stats")
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    try:
+        flush_llm_cache()
+    except Exception as e:
+        logger.warning("Кеш LLM: не удалось сбросить буфер: %s", e)
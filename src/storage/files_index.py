@@ -0,0 +1,207 @@
+"""Индекс файлов источника: .cache/files.sqlite3 — FileMeta по file_id, выборки по пути, MIME и статусу."""
+import json
+import logging
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Iterator
+
+from src.config import CACHE_DIR, CACHE_DOWNLOADS
+from src.sources.models import FileMeta
+from src.storage.sqlite import connect
+
+logger = logging.getLogger(__name__)
+
+FILES_DB_PATH = CACHE_DIR / "files.sqlite3"
+
+STATUS_DOWNLOADED = "downloaded"
+STATUS_SKIPPED = "skipped"  # пропущен по политике скачивания
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    mime_type TEXT NOT NULL DEFAULT '',
+    size INTEGER,
+    modified_time TEXT,
+    path TEXT NOT NULL DEFAULT '',
+    local_path TEXT,
+    status TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_path ON files(path);
+CREATE INDEX IF NOT EXISTS files_mime ON files(mime_type);
+CREATE INDEX IF NOT EXISTS files_status ON files(status);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+_COLUMNS = "file_id, name, mime_type, size, modified_time, path, local_path, status"
+
+_lock = Lock()
+_initialized = False
+
+
+def _db():
+    """Соединение потока; при первом обращении в процессе — импорт старых meta.json."""
+    global _initialized
+    conn = connect(FILES_DB_PATH, _SCHEMA)
+    if not _initialized:
+        with _lock:
+            if not _initialized:
+                _import_meta_json(conn)
+                _initialized = True
+    return conn
+
+
+def _import_meta_json(conn) -> None:
+    """Однократно перенести .cache/downloads/<file_id>/meta.json в индекс."""
+    if conn.execute("SELECT 1 FROM meta WHERE name = 'meta_json_imported'").fetchone():
+        return
+    rows = []
+    if CACHE_DOWNLOADS.exists():
+        for meta_path in CACHE_DOWNLOADS.glob("*/meta.json"):
+            try:
+                data = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                continue
+            if not data.get("local_path"):
+                continue
+            rows.append((
+                data.get("file_id", meta_path.parent.name),
+                data.get("name", ""),
+                data.get("mime_type", ""),
+                data.get("size"),
+                data.get("modified_time"),
+                data.get("path", ""),
+                data["local_path"],
+                STATUS_DOWNLOADED,
+                meta_path.stat().st_mtime,
+            ))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(f"INSERT OR IGNORE INTO files ({_COLUMNS}, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('meta_json_imported', ?)", (str(time.time()),))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if rows:
+        logger.info("Индекс файлов: перенесено %s записей из meta.json", len(rows))
+
+
+def _to_meta(row: tuple) -> FileMeta:
+    file_id, name, mime_type, size, modified_time, path, local_path, _ = row
+    return FileMeta(
+        file_id=file_id,
+        name=name,
+        mime_type=mime_type,
+        size=size,
+        modified_time=modified_time,
+        path=path,
+        is_folder=False,
+        local_path=Path(local_path) if local_path else None,
+    )
+
+
+def get_file(file_id: str) -> tuple[FileMeta, str] | None:
+    """(FileMeta, статус) по file_id или None."""
+    row = _db().execute(f"SELECT {_COLUMNS} FROM files WHERE file_id = ?", (file_id,)).fetchone()
+    return (_to_meta(row), row[-1]) if row else None
+
+
+def set_file(meta: FileMeta, status: str, local_path: Path | None = None) -> None:
+    """Записать/обновить файл в индексе."""
+    local = local_path or meta.local_path
+    _db().execute(
+        f"INSERT OR REPLACE INTO files ({_COLUMNS}, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            meta.file_id,
+            meta.name,
+            meta.mime_type,
+            meta.size,
+            meta.modified_time,
+            meta.path,
+            str(local) if local else None,
+            status,
+            time.time(),
+        ),
+    )
+
+
+def set_failed(meta: FileMeta) -> FileMeta | None:
+    """
+    Отметить неудачное скачивание. Если в индексе уже есть скачанная копия и файл на месте,
+    запись не трогается (временная ошибка не выкидывает файл из summarize) — вернуть её FileMeta.
+    """
+    found = get_file(meta.file_id)
+    if found is not None:
+        cached, status = found
+        if status == STATUS_DOWNLOADED and cached.local_path and cached.local_path.exists():
+            return cached
+    set_file(meta, STATUS_FAILED)
+    return None
+
+
+def delete_files(file_ids: list[str] | set[str]) -> None:
+    """Убрать файлы из индекса."""
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("DELETE FROM files WHERE file_id = ?", [(fid,) for fid in file_ids])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def iter_files(
+    path_prefix: str = "",
+    mime_type: str = "",
+    status: str | None = STATUS_DOWNLOADED,
+    limit: int | None = None,
+) -> Iterator[FileMeta]:
+    """
+    Файлы из индекса в порядке путей, по мере чтения курсора. path_prefix — начало пути ("docs/");
+    mime_type — точный тип или префикс с "/" на конце ("image/"); status=None — любой.
+    Фильтры идут по индексам, без чтения файлов кеша.
+    """
+    where, args = [], []
+    if path_prefix:
+        # Диапазон вместо LIKE: использует индекс по path
+        where.append("path >= ? AND path < ?")
+        args += [path_prefix, path_prefix[:-1] + chr(ord(path_prefix[-1]) + 1)]
+    if mime_type:
+        if mime_type.endswith("/"):
+            where.append("mime_type >= ? AND mime_type < ?")
+            args += [mime_type, mime_type[:-1] + "0"]
+        else:
+            where.append("mime_type = ?")
+            args.append(mime_type)
+    if status:
+        where.append("status = ?")
+        args.append(status)
+    sql = f"SELECT {_COLUMNS} FROM files"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY path"
+    if limit:
+        sql += " LIMIT ?"
+        args.append(limit)
+    for row in _db().execute(sql, args):
+        yield _to_meta(row)
+
+
+def query_files(
+    path_prefix: str = "",
+    mime_type: str = "",
+    status: str | None = STATUS_DOWNLOADED,
+    limit: int | None = None,
+) -> list[FileMeta]:
+    """Список файлов из индекса, см. iter_files."""
+    return list(iter_files(path_prefix, mime_type, status, limit))
+
+
+def status_counts() -> dict[str, int]:
+    """Число файлов по статусам."""
+    return dict(_db().execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
@@ -0,0 +1,97 @@
+"""Журнал саммаризации: .cache/summary_journal.jsonl — результат каждого документа дописывается сразу по готовности."""
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+
+from src.config import CACHE_DIR, ensure_cache_dirs
+from src.storage.manifest import SummaryManifest
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = CACHE_DIR / "summary_journal.jsonl"
+
+
+class SummaryJournal:
+    """
+    Append-only журнал документов текущего запуска: строка JSON на документ
+    {file_id, version, path, name, summary | reason}. Переживает падение процесса:
+    прерванный запуск продолжается с того, что успело попасть в журнал (replay в манифест).
+    Очищается, когда манифест с этими документами сохранён.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or JOURNAL_PATH
+        self._lock = Lock()
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            ensure_cache_dirs()
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def record(
+        self,
+        file_id: str,
+        version: str,
+        path: str,
+        name: str,
+        summary: str | None = None,
+        reason: str | None = None,
+    ) -> None:
+        """Дописать результат документа (саммари или причину ошибки); строка сразу уходит в ОС."""
+        entry = {"file_id": file_id, "version": version, "path": path, "name": name}
+        if summary is not None:
+            entry["summary"] = summary
+        else:
+            entry["reason"] = reason
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+
+    def sync(self) -> None:
+        """fsync журнала — перед выходом по сигналу."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def entries(self) -> list[dict]:
+        """Записи журнала по порядку; оборванная последняя строка (падение посреди записи) пропускается."""
+        if not self.path.exists():
+            return []
+        out = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return out
+
+    def replay(self, manifest: SummaryManifest) -> int:
+        """Перенести готовые саммари из журнала в манифест. Вернуть число документов."""
+        done = {e["file_id"]: e for e in self.entries() if e.get("summary") is not None and e.get("version")}
+        for fid, e in done.items():
+            manifest.set_doc(fid, e["version"], e["summary"])
+        if done:
+            logger.info("Журнал: восстановлено %s документов прерванного запуска", len(done))
+        return len(done)
+
+    def clear(self) -> None:
+        """Очистить журнал: всё из него уже в манифесте."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,41 +1,25 @@
 """Загрузка списка файлов из кеша после ingest."""
-import json
-from pathlib import Path
-
-from src.config import CACHE_DOWNLOADS, ensure_cache_dirs
+from src.config import ensure_cache_dirs
 from src.sources.models import FileMeta
+from src.storage.files_index import STATUS_DOWNLOADED, iter_files
 
 
-def load_cached_files(max_files: int | None = None) -> list[FileMeta]:
-    """Вернуть список FileMeta из кеша .cache/downloads/."""
+def load_cached_files(
+    max_files: int | None = None,
+    path_prefix: str = "",
+    mime_type: str = "",
+) -> list[FileMeta]:
+    """
+    Вернуть скачанные файлы из индекса .cache/files.sqlite3 (в порядке путей).
+    path_prefix / mime_type — выборка по индексу, см. iter_files.
+    Файлы, которых уже нет на диске (кеш почищен вручную), пропускаются.
+    """
     ensure_cache_dirs()
     files: list[FileMeta] = []
-    if not CACHE_DOWNLOADS.exists():
-        return files
-    for dir_path in CACHE_DOWNLOADS.iterdir():
-        if not dir_path.is_dir():
-            continue
-        meta_path = dir_path / "meta.json"
-        if not meta_path.exists():
-            continue
-        try:
-            data = json.loads(meta_path.read_text(encoding="utf-8"))
-            local_path = data.get("local_path")
-            if not local_path or not Path(local_path).exists():
-                continue
-            meta = FileMeta(
-                file_id=data.get("file_id", dir_path.name),
-                name=data.get("name", ""),
-                mime_type=data.get("mime_type", ""),
-                size=data.get("size"),
-                modified_time=data.get("modified_time"),
-                path=data.get("path", ""),
-                is_folder=False,
-                local_path=Path(local_path),
-            )
-            files.append(meta)
-            if max_files and len(files) >= max_files:
-                break
-        except (json.JSONDecodeError, OSError, KeyError):
+    for meta in iter_files(path_prefix=path_prefix, mime_type=mime_type, status=STATUS_DOWNLOADED):
+        if not meta.local_path or not meta.local_path.exists():
             continue
+        files.append(meta)
+        if max_files and len(files) >= max_files:
+            break
     return files
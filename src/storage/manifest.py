@@ -0,0 +1,102 @@
+"""Манифест саммаризации: .cache/doc_manifest.json — что уже посчитано и из каких входов."""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+
+from src.config import CACHE_DIR, ensure_cache_dirs
+
+logger = logging.getLogger(__name__)
+
+DOC_MANIFEST_PATH = CACHE_DIR / "doc_manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def inputs_hash(*parts: str) -> str:
+    """Хеш входов шага (саммари документов, id промпта) — сверка перед повторным reduce."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SummaryManifest:
+    """
+    Саммари документов по file_id с версией содержимого и результаты reduce-шагов
+    с хешем входов. Совпала версия/хеш — шаг не пересчитывается.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or DOC_MANIFEST_PATH
+        self.docs: dict[str, dict] = {}
+        self.reduces: dict[str, dict] = {}
+        self._lock = Lock()
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "SummaryManifest":
+        """Прочитать манифест; битый или другого формата — начать с пустого."""
+        manifest = cls(path)
+        if not manifest.path.exists():
+            return manifest
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Манифест %s не прочитан: %s", manifest.path, e)
+            return manifest
+        if data.get("format") == MANIFEST_FORMAT:
+            manifest.docs = data.get("docs", {})
+            manifest.reduces = data.get("reduces", {})
+        return manifest
+
+    def save(self) -> None:
+        """Записать атомарно (tmp + rename)."""
+        ensure_cache_dirs()
+        with self._lock:
+            data = {"format": MANIFEST_FORMAT, "docs": self.docs, "reduces": self.reduces}
+            raw = json.dumps(data, ensure_ascii=False)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp.write_text(raw, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Манифест %s не сохранён: %s", self.path, e)
+
+    def get_doc(self, file_id: str, version: str) -> dict | None:
+        """Запись документа {version, summary}, если версия совпадает."""
+        with self._lock:
+            entry = self.docs.get(file_id)
+        if entry and version and entry.get("version") == version:
+            return entry
+        return None
+
+    def set_doc(self, file_id: str, version: str, summary: str) -> None:
+        with self._lock:
+            self.docs[file_id] = {"version": version, "summary": summary}
+
+    def prune(self, file_ids: set[str]) -> int:
+        """Удалить документы, которых больше нет в источнике. Вернуть число удалённых."""
+        with self._lock:
+            gone = [fid for fid in self.docs if fid not in file_ids]
+            for fid in gone:
+                del self.docs[fid]
+        return len(gone)
+
+    def prune_reduces(self, steps: set[str]) -> None:
+        """Оставить только результаты перечисленных reduce-шагов (папки, которых больше нет, — удалить)."""
+        with self._lock:
+            self.reduces = {step: entry for step, entry in self.reduces.items() if step in steps}
+
+    def get_reduce(self, step: str, input_hash: str) -> str | None:
+        """Результат reduce-шага, если его входы не изменились."""
+        with self._lock:
+            entry = self.reduces.get(step)
+        if entry and entry.get("inputs") == input_hash:
+            return entry.get("summary")
+        return None
+
+    def set_reduce(self, step: str, input_hash: str, summary: str) -> None:
+        with self._lock:
+            self.reduces[step] = {"inputs": input_hash, "summary": summary}
@@ -0,0 +1,34 @@
+"""SQLite-хранилища кеша: WAL, соединение на поток, ожидание блокировок между процессами."""
+import sqlite3
+import threading
+from pathlib import Path
+
+BUSY_TIMEOUT_MS = 30_000
+
+_local = threading.local()
+
+
+def connect(path: Path, schema: str = "") -> sqlite3.Connection:
+    """
+    Соединение текущего потока с базой path (создаётся один раз на поток).
+    WAL: читатели не блокируют писателя, несколько процессов работают с одним файлом.
+    """
+    conns: dict[str, sqlite3.Connection] = getattr(_local, "conns", None) or {}
+    _local.conns = conns
+    key = str(path)
+    conn = conns.get(key)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(key, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if schema:
+            conn.executescript(schema)
+        conns[key] = conn
+    return conn
+
+
+def db_size(path: Path) -> int:
+    """Размер базы на диске вместе с WAL, байт."""
+    return sum(p.stat().st_size for p in (path, Path(f"{path}-wal")) if p.exists())
@@ -0,0 +1,167 @@
+"""Кеш извлечённого текста: .cache/texts/<file_id>.json — без повторного парсинга PDF/DOCX."""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from src.config import CACHE_TEXTS, ensure_cache_dirs
+from src.loaders import get_loader, iter_text, load_text
+from src.sources.models import FileMeta
+
+logger = logging.getLogger(__name__)
+
+
+def _text_path(file_id: str) -> Path:
+    return CACHE_TEXTS / f"{file_id}.json"
+
+
+def _loader_tag(path: Path) -> str:
+    """Имя и версия loader — смена версии инвалидирует кеш."""
+    loader = get_loader(path)
+    return f"{type(loader).__name__}:{loader.version}" if loader else ""
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def text_version(meta: FileMeta) -> str:
+    """Версия содержимого: modifiedTime из источника, иначе sha256 файла."""
+    if meta.modified_time:
+        return f"mtime:{meta.modified_time}"
+    if meta.local_path and meta.local_path.exists():
+        return f"sha256:{_file_hash(meta.local_path)}"
+    return ""
+
+
+def source_version(meta: FileMeta) -> str:
+    """Версия входа для шагов поверх текста: содержимое файла + loader ("" — неизвестна)."""
+    version = text_version(meta)
+    if not version or not meta.local_path:
+        return ""
+    return f"{version}|{_loader_tag(meta.local_path)}"
+
+
+def get_cached_text(meta: FileMeta, verify: bool = True) -> str | None:
+    """
+    Текст из кеша или None.
+    verify=False (--resume) — не сверять версию содержимого, только loader.
+    """
+    p = _text_path(meta.file_id)
+    if not p.exists() or not meta.local_path:
+        return None
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return None
+    if data.get("loader") != _loader_tag(meta.local_path):
+        return None
+    if verify and data.get("version") != text_version(meta):
+        return None
+    return data.get("text")
+
+
+def _header(meta: FileMeta) -> dict:
+    return {
+        "file_id": meta.file_id,
+        "version": text_version(meta),
+        "loader": _loader_tag(meta.local_path),
+    }
+
+
+def _tmp_path(p: Path) -> Path:
+    return p.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def set_cached_text(meta: FileMeta, text: str) -> None:
+    """Сохранить нормализованный текст (атомарно: tmp + rename)."""
+    ensure_cache_dirs()
+    if not meta.local_path:
+        return
+    data = {**_header(meta), "text": text}
+    p = _text_path(meta.file_id)
+    tmp = _tmp_path(p)
+    try:
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+    except OSError as e:
+        logger.warning("Кеш текста %s: %s", meta.path, e)
+
+
+def tee_cached_text(meta: FileMeta, fragments: Iterable[str], joiner: str = "\n") -> Iterator[str]:
+    """
+    Пропустить фрагменты текста насквозь, дописывая их в кеш по мере чтения
+    (текст кеша = joiner.join(fragments)). Кеш фиксируется, только если поток дочитан
+    до конца; прерванный поток (ошибка, close) оставляет прежний кеш.
+    Ошибка записи кеша не прерывает поток — кеш просто не сохраняется.
+    """
+    ensure_cache_dirs()
+    if not meta.local_path:
+        yield from fragments
+        return
+    p = _text_path(meta.file_id)
+    tmp = _tmp_path(p)
+    sep = json.dumps(joiner, ensure_ascii=False)[1:-1]
+    f = None
+    try:
+        try:
+            f = open(tmp, "w", encoding="utf-8")
+            # Тот же JSON, что у set_cached_text: заголовок, затем строка text по частям
+            f.write(json.dumps(_header(meta), ensure_ascii=False)[:-1] + ', "text": "')
+        except OSError as e:
+            logger.warning("Кеш текста %s: %s", meta.path, e)
+            f = None
+        first = True
+        for frag in fragments:
+            if f is not None:
+                try:
+                    f.write((sep if not first else "") + json.dumps(frag, ensure_ascii=False)[1:-1])
+                except OSError as e:
+                    logger.warning("Кеш текста %s: %s", meta.path, e)
+                    f.close()
+                    f = None
+            first = False
+            yield frag
+        if f is not None:
+            try:
+                f.write('"}')
+                f.close()
+                os.replace(tmp, p)
+            except OSError as e:
+                logger.warning("Кеш текста %s: %s", meta.path, e)
+            f = None
+    finally:
+        if f is not None:
+            f.close()
+        tmp.unlink(missing_ok=True)
+
+
+def iter_text_cached(meta: FileMeta, verify: bool = True) -> Iterator[str]:
+    """
+    Текст файла по фрагментам: из кеша — одним фрагментом, иначе поток loader'а
+    (страницы PDF), который по пути пишется в кеш. Весь документ в памяти не держится.
+    """
+    cached = get_cached_text(meta, verify=verify)
+    if cached is not None:
+        if cached:
+            yield cached
+        return
+    if meta.local_path:
+        yield from tee_cached_text(meta, iter_text(meta.local_path))
+
+
+def load_text_cached(meta: FileMeta, verify: bool = True) -> str:
+    """Текст файла: из кеша, иначе парсинг loader'ом и запись в кеш."""
+    cached = get_cached_text(meta, verify=verify)
+    if cached is not None:
+        return cached
+    text = load_text(meta.local_path) if meta.local_path else ""
+    set_cached_text(meta, text)
+    return text
@@ -0,0 +1,55 @@
+"""
+Общие фикстуры. Конфиг читается при импорте src, поэтому кеш (LLM, индекс файлов, тексты)
+переносится во временную папку здесь — до импорта тестовых модулей.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_CACHE_ROOT = Path(tempfile.mkdtemp(prefix="tests-cache-"))
+os.environ["CACHE_DIR"] = str(_CACHE_ROOT)
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_CACHE_ROOT, ignore_errors=True)
+
+
+@pytest.fixture
+def cache_dir() -> Path:
+    """Папка кеша тестовой сессии (общая: тесты используют уникальные file_id/ключи)."""
+    from src.config import ensure_cache_dirs
+
+    ensure_cache_dirs()
+    return _CACHE_ROOT
+
+
+@pytest.fixture
+def clean_state(cache_dir):
+    """Пустые манифест, журнал и summary_result.json — для прогонов пайплайна."""
+    from src.pipelines.results import SUMMARY_RESULT_PATH
+    from src.storage.journal import JOURNAL_PATH
+    from src.storage.manifest import DOC_MANIFEST_PATH
+
+    for p in (DOC_MANIFEST_PATH, JOURNAL_PATH, SUMMARY_RESULT_PATH):
+        p.unlink(missing_ok=True)
+    yield cache_dir
+
+
+def write_corpus(root: Path, n: int, prefix: str, paragraphs: int = 6) -> list:
+    """n TXT-файлов в двух папках с FileMeta (local_path заполнен)."""
+    from src.sources.models import FileMeta
+
+    metas = []
+    for i in range(n):
+        rel = f"dept{i % 2}/{prefix}{i:03}.txt"
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n\n".join(f"Документ {i}, абзац {k}. " + "текст " * 20 for k in range(paragraphs)),
+                        encoding="utf-8")
+        metas.append(FileMeta(f"{prefix}-{i}", path.name, "text/plain", path.stat().st_size,
+                              "2024-01-01T00:00:00Z", rel, False, path))
+    return metas
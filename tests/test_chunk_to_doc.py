@@ -0,0 +1,57 @@
+import threading
+
+import src.pipelines.chunk_to_doc as chunk_to_doc
+from src.pipelines.run import _prepare_chunks
+from src.sources.models import FileMeta
+from src.storage.texts import get_cached_text
+
+
+def _meta(tmp_path, file_id, text):
+    path = tmp_path / f"{file_id}.txt"
+    path.write_text(text, encoding="utf-8")
+    return FileMeta(file_id, path.name, "text/plain", path.stat().st_size, "2024-01-01T00:00:00Z", path.name, False, path)
+
+
+def test_prepare_chunks_streams_and_caches(cache_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.pipelines.run.CHUNK_TOKENS", 30)
+    text = "\n\n".join(f"Абзац {i}: " + "слово " * 15 for i in range(20))
+    meta = _meta(tmp_path, "prepare-stream", text)
+    chunks, reason = _prepare_chunks(meta)
+    assert reason is None
+    assert not isinstance(chunks, list)
+    chunks = list(chunks)
+    assert len(chunks) > 1
+    cached = get_cached_text(meta)
+    assert cached is not None
+    for c in chunks:
+        assert c.text.split("\n\n")[0] in cached[c.start_char : c.end_char]
+
+
+def test_prepare_chunks_reasons(cache_dir, tmp_path):
+    missing = FileMeta("prepare-missing", "x.txt", "text/plain", 0, None, "x.txt", False, tmp_path / "nope.txt")
+    assert _prepare_chunks(missing)[1] == "файл не найден"
+    empty = _meta(tmp_path, "prepare-empty", "  \n\n ")
+    assert _prepare_chunks(empty)[1] == "пустой текст"
+
+
+def test_chunks_to_doc_summary_order(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_chunk(text):
+        with lock:
+            calls.append(text)
+        return f"S({text})"
+
+    reduced = []
+    monkeypatch.setattr(chunk_to_doc, "summarize_chunk", fake_chunk)
+    monkeypatch.setattr(chunk_to_doc, "reduce_tree", lambda s, fn, kind: reduced.append(s) or "doc")
+
+    class C:
+        def __init__(self, text):
+            self.text = text
+
+    assert chunk_to_doc.chunks_to_doc_summary(iter([])) == ""
+    assert chunk_to_doc.chunks_to_doc_summary(iter([C("a")])) == "S(a)"
+    assert chunk_to_doc.chunks_to_doc_summary(C(str(i)) for i in range(30)) == "doc"
+    assert reduced == [[f"S({i})" for i in range(30)]]
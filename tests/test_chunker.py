@@ -0,0 +1,140 @@
+import random
+
+from src.chunking import chunk_text, estimate_tokens, estimate_tokens_many, iter_chunks, iter_paragraph_spans
+
+
+def _paragraphs(text: str) -> list[str]:
+    return [p.strip() for p in text.split("\n\n") if p.strip()]
+
+
+def _squeeze(text: str) -> str:
+    """Текст без пробельных символов: абзац, разрезанный по строкам или пробелам, сравнивается с целым."""
+    return "".join(text.split())
+
+
+def _random_text(rnd: random.Random) -> str:
+    pieces = ["Title", "Para one.", "  x  ", "\n", "\n\n", "\n\n\n", " ", "\t", "слово " * 30, "a b c d " * 50]
+    return "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 60)))
+
+
+def test_offsets_point_into_real_text():
+    text = "Title\n\n\n\n  Para one.  \n\n\nPara two."
+    chunks = chunk_text(text, "f", max_tokens=4, overlap_tokens=0)
+    assert [c.text for c in chunks] == ["Title", "Para one.", "Para two."]
+    for c in chunks:
+        assert text[c.start_char : c.end_char] == c.text
+
+
+def test_offsets_random_texts():
+    rnd = random.Random(0)
+    for _ in range(300):
+        text = _random_text(rnd)
+        for c in chunk_text(text, "f", max_tokens=rnd.choice([5, 20, 60, 200])):
+            segment = text[c.start_char : c.end_char]
+            assert _squeeze(segment) == _squeeze(c.text)
+        for c in chunk_text(text, "f", max_tokens=10_000):  # абзацы короче лимита не режутся
+            assert _paragraphs(text[c.start_char : c.end_char]) == c.text.split("\n\n")
+
+
+def test_chunks_cover_all_paragraphs_in_order():
+    rnd = random.Random(1)
+    text = _random_text(rnd) * 5
+    chunks = chunk_text(text, "f", max_tokens=50, overlap_tokens=0)
+    assert _squeeze("".join(c.text for c in chunks)) == _squeeze(text)
+    assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+    assert all(a.end_char <= b.start_char for a, b in zip(chunks, chunks[1:]))
+
+
+def test_overlap_repeats_tail():
+    text = "\n\n".join(f"Абзац номер {i} " + "слово " * 10 for i in range(30))
+    chunks = chunk_text(text, "f", max_tokens=100, overlap_tokens=30)
+    assert len(chunks) > 1
+    for a, b in zip(chunks, chunks[1:]):
+        assert b.start_char < a.end_char
+        assert a.text.endswith(b.text.split("\n\n")[0])
+
+
+def test_streaming_fragments_match_joined_document():
+    rnd = random.Random(2)
+    for _ in range(200):
+        text = _random_text(rnd)
+        cuts = sorted(rnd.sample(range(len(text) + 1), min(3, len(text) + 1)))
+        fragments = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        document = "\n".join(f for f in fragments if f)
+        streamed = list(iter_chunks(fragments, "f", max_tokens=40))
+        whole = chunk_text(document, "f", max_tokens=40)
+        assert [(c.text, c.start_char, c.end_char) for c in streamed] == [
+            (c.text, c.start_char, c.end_char) for c in whole
+        ]
+
+
+def test_paragraph_spans():
+    fragments = ["A\n", "\n  B  \n\n", "", "C"]
+    document = "\n".join(f for f in fragments if f)
+    spans = list(iter_paragraph_spans(fragments))
+    assert [p for p, _, _ in spans] == ["A", "B", "C"]
+    for para, start, end in spans:
+        assert document[start:end] == para
+
+
+def test_tokens_many_matches_single():
+    texts = ["", "a", "абзац текста", "x" * 1001]
+    assert estimate_tokens_many(texts) == [estimate_tokens(t) for t in texts]
+
+
+def test_chunks_respect_token_limit():
+    rnd = random.Random(1)
+    text = "\n\n".join("слово " * rnd.randint(5, 80) for _ in range(300))
+    chunks = chunk_text(text, file_id="f", max_tokens=300)
+    assert len(chunks) > 10
+    assert all(c.token_estimate <= 300 for c in chunks)
+    assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+
+
+def test_token_estimate_is_sum_of_paragraphs():
+    from src.chunking.chunker import SEP_TOKENS
+
+    text = "\n\n".join(f"Абзац {i}. " + "слово " * (i % 17 + 3) for i in range(200))
+    for c in chunk_text(text, file_id="f", max_tokens=120, overlap_tokens=40):
+        paras = _paragraphs(c.text)
+        assert c.token_estimate == sum(estimate_tokens(p) for p in paras) + SEP_TOKENS * (len(paras) - 1)
+
+
+def test_chunking_is_linear():
+    import time
+
+    def elapsed(n: int) -> float:
+        text = "\n\n".join(f"Абзац {i}. " + "текст " * 20 for i in range(n))
+        started = time.perf_counter()
+        chunk_text(text, file_id="f", max_tokens=500)
+        return time.perf_counter() - started
+
+    elapsed(1000)  # прогрев
+    # Квадратичный чанкер на 8× данных медленнее в ~64 раза; запас — на шум
+    assert elapsed(16_000) < 20 * elapsed(2000) + 0.05
+
+
+def test_spans_with_size_cap_point_into_text():
+    rnd = random.Random(2)
+    for _ in range(200):
+        fragments = [_random_text(rnd) for _ in range(rnd.randint(1, 6))]
+        text = "\n".join(f for f in fragments if f)
+        cap = rnd.choice([8, 30, 100])
+        spans = list(iter_paragraph_spans(fragments, max_chars=cap))
+        for para, start, end in spans:
+            assert text[start:end] == para
+            assert len(para) <= cap
+        assert all(a[2] <= b[1] for a, b in zip(spans, spans[1:]))
+        assert _squeeze("".join(p for p, _, _ in spans)) == _squeeze(text)
+
+
+def test_pages_without_blank_lines_stay_bounded():
+    import time
+
+    # Страницы PDF через "\n" без пустых строк: раньше — один абзац на весь документ
+    page = "\n".join(f"Line {k} of the report text, with some words." for k in range(22))
+    started = time.perf_counter()
+    chunks = list(iter_chunks((page for _ in range(5000)), file_id="f", max_tokens=1000))
+    assert time.perf_counter() - started < 5
+    assert len(chunks) > 100
+    assert max(c.token_estimate for c in chunks) <= 1000
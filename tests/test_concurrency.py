@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.llm.concurrency import AdaptiveLimiter, AsyncAdaptiveLimiter
+
+
+class Overloaded(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str | None = None):
+        super().__init__("429 rate limited")
+        self.response = type("R", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+def test_additive_increase_on_fast_success():
+    limiter = AdaptiveLimiter(initial=2, max_limit=4, latency_target=1.0)
+    for _ in range(10):
+        with limiter.track():
+            pass
+    assert limiter.limit == 4  # +1/limit за ответ, не выше max_limit
+    assert limiter.in_flight == 0
+
+
+def test_slow_success_does_not_increase():
+    limiter = AdaptiveLimiter(initial=2, max_limit=8, latency_target=0.0)
+    for _ in range(10):
+        with limiter.track():
+            time.sleep(0.001)
+    assert limiter.limit == 2
+
+
+def test_multiplicative_decrease_once_per_window():
+    limiter = AdaptiveLimiter(initial=8, min_limit=1, max_limit=8)
+    for _ in range(3):  # одна волна 429 — одно уменьшение
+        with pytest.raises(Overloaded):
+            with limiter.track():
+                raise Overloaded()
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_non_retryable_error_keeps_limit():
+    limiter = AdaptiveLimiter(initial=4)
+    with pytest.raises(ValueError):
+        with limiter.track():
+            raise ValueError("bad request")
+    assert limiter.limit == 4
+
+
+def test_retry_after_pauses_new_requests():
+    limiter = AdaptiveLimiter(initial=4)
+    with pytest.raises(Overloaded):
+        with limiter.track():
+            raise Overloaded(retry_after="0.2")
+    started = time.monotonic()
+    limiter.acquire()
+    limiter.release()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_limit_bounds_in_flight():
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    peak, active = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with limiter.track():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+def test_async_limiter():
+    async def main():
+        limiter = AsyncAdaptiveLimiter(initial=2, max_limit=2)
+        active, peak = 0, 0
+
+        async def work():
+            nonlocal active, peak
+            async with limiter.track():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+        with pytest.raises(Overloaded):
+            async with limiter.track():
+                raise Overloaded()
+        return peak, limiter.limit
+
+    assert asyncio.run(main()) == (2, 1)
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+import src.sources.drive_api as drive_api
+from src.sources.models import FileMeta
+
+
+def _metas(n):
+    return [FileMeta(f"dl-{i}", f"f{i}.txt", "text/plain", 10, None, f"f{i}.txt", False) for i in range(n)]
+
+
+def test_download_many_bounded_window(monkeypatch, tmp_path):
+    started = []
+    lock = threading.Lock()
+
+    def fake_download(creds, meta, force):
+        with lock:
+            started.append(meta.file_id)
+        return tmp_path / meta.name, 10
+
+    monkeypatch.setattr(drive_api, "_download_one", fake_download)
+    gen = drive_api.download_many(None, _metas(50), workers=2, window=4)
+    next(gen)
+    time.sleep(0.05)
+    assert len(started) <= 5  # окно 4 + одно, поставленное за отданным
+    rest = list(gen)
+    assert len(rest) == 49 and len(started) == 50
+
+
+def test_download_many_close_cancels(monkeypatch, tmp_path):
+    started = []
+
+    def slow_download(creds, meta, force):
+        started.append(meta.file_id)
+        time.sleep(0.01)
+        return tmp_path / meta.name, 10
+
+    monkeypatch.setattr(drive_api, "_download_one", slow_download)
+    gen = drive_api.download_many(None, _metas(100), workers=2)
+    next(gen)
+    gen.close()
+    assert len(started) <= 5
+
+
+def test_download_many_reports_errors(monkeypatch):
+    def broken(creds, meta, force):
+        raise OSError("сеть")
+
+    monkeypatch.setattr(drive_api, "_download_one", broken)
+    out = list(drive_api.download_many(None, _metas(3), workers=2))
+    assert [(m.file_id, p, n, str(e)) for m, p, n, e in sorted(out, key=lambda x: x[0].file_id)] == [
+        (f"dl-{i}", None, 0, "сеть") for i in range(3)
+    ]
+
+
+def test_only_network_errors_are_retried():
+    import httplib2
+
+    class Resp:
+        def __init__(self, status):
+            self.status = status
+
+    class ApiError(Exception):
+        def __init__(self, status):
+            super().__init__(status)
+            self.resp = Resp(status)
+
+    retryable = [ConnectionResetError(), TimeoutError(), httplib2.ServerNotFoundError("dns"), ApiError(429), ApiError(503)]
+    final = [OSError(28, "No space left on device"), KeyError("id"), TypeError(), ApiError(404),
+             drive_api.DownloadSkipped("политика")]
+    assert all(drive_api._is_retryable(e) for e in retryable)
+    assert not any(drive_api._is_retryable(e) for e in final)
+
+
+def test_local_error_is_not_retried(monkeypatch, tmp_path):
+    calls = []
+
+    def disk_full(service, meta, creds=None):
+        calls.append(meta.file_id)
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(drive_api, "_fetch", disk_full)
+    monkeypatch.setattr(drive_api, "_thread_service", lambda creds: None)
+    monkeypatch.setattr(drive_api, "_cached_download", lambda meta: None)
+    with pytest.raises(OSError):
+        drive_api._download_one(None, _metas(1)[0], force=True)
+    assert calls == ["dl-0"]
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from src.pipelines.executor import imap_ordered, map_ordered
+
+
+def test_map_ordered_keeps_order():
+    assert map_ordered(lambda x: x * 2, range(50)) == [x * 2 for x in range(50)]
+
+
+def test_imap_ordered_bounded_window():
+    consumed = 0
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def items():
+        nonlocal consumed
+        for i in range(40):
+            consumed += 1
+            yield i
+
+    def work(x):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.001)
+        with lock:
+            running -= 1
+        return x
+
+    it = imap_ordered(work, items(), window=4)
+    assert next(it) == 0
+    assert consumed <= 5
+    assert list(it) == list(range(1, 40))
+    assert peak <= 4
+
+
+def test_imap_ordered_close_cancels_pending():
+    started = []
+    it = imap_ordered(lambda x: started.append(x) or time.sleep(0.01), range(100), window=3)
+    next(it)
+    it.close()
+    time.sleep(0.05)
+    assert len(started) <= 4
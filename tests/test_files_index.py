@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from src.sources.models import FileMeta
+from src.storage.files_index import (
+    STATUS_DOWNLOADED,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    delete_files,
+    get_file,
+    query_files,
+    set_failed,
+    set_file,
+)
+from src.storage.load_cached import load_cached_files
+
+
+def _meta(file_id, path, mime="text/plain", local=None):
+    return FileMeta(file_id, path.rsplit("/", 1)[-1], mime, 10, "2024-01-01T00:00:00Z", path, False, local)
+
+
+def test_set_get_and_query(cache_dir, tmp_path):
+    local = tmp_path / "a.txt"
+    local.write_text("x", encoding="utf-8")
+    set_file(_meta("idx-a", "idx/b/a.txt", local=local), STATUS_DOWNLOADED)
+    set_file(_meta("idx-b", "idx/a/b.pdf", "application/pdf", local=local), STATUS_DOWNLOADED)
+    set_file(_meta("idx-c", "idx/a/c.png", "image/png"), STATUS_SKIPPED)
+    set_file(_meta("idx-d", "idx-other/d.txt", local=local), STATUS_DOWNLOADED)
+
+    meta, status = get_file("idx-a")
+    assert (meta.path, meta.local_path, status) == ("idx/b/a.txt", local, STATUS_DOWNLOADED)
+    assert get_file("idx-missing") is None
+    assert [m.file_id for m in query_files(path_prefix="idx/")] == ["idx-b", "idx-a"]
+    assert [m.file_id for m in query_files(path_prefix="idx/", status=None)] == ["idx-b", "idx-c", "idx-a"]
+    assert [m.file_id for m in query_files(path_prefix="idx", mime_type="image/", status=None)] == ["idx-c"]
+    assert [m.file_id for m in query_files(path_prefix="idx/", mime_type="application/pdf")] == ["idx-b"]
+    assert [m.file_id for m in query_files(path_prefix="idx/", limit=1)] == ["idx-b"]
+
+
+def test_load_cached_files_skips_missing_local_copy(cache_dir, tmp_path):
+    present = tmp_path / "present.txt"
+    present.write_text("x", encoding="utf-8")
+    set_file(_meta("lc-1", "lc/1.txt", local=present), STATUS_DOWNLOADED)
+    set_file(_meta("lc-2", "lc/2.txt", local=tmp_path / "gone.txt"), STATUS_DOWNLOADED)
+    set_file(_meta("lc-3", "lc/3.txt", local=present), STATUS_DOWNLOADED)
+    assert [m.file_id for m in load_cached_files(path_prefix="lc/")] == ["lc-1", "lc-3"]
+    assert [m.file_id for m in load_cached_files(max_files=2, path_prefix="lc/")] == ["lc-1", "lc-3"]
+
+
+def test_set_failed_keeps_valid_download(cache_dir, tmp_path):
+    local = tmp_path / "ok.txt"
+    local.write_text("x", encoding="utf-8")
+    set_file(_meta("fail-keep", "fail/ok.txt", local=local), STATUS_DOWNLOADED)
+    newer = _meta("fail-keep", "fail/ok.txt")
+    newer.modified_time = "2025-01-01T00:00:00Z"
+    previous = set_failed(newer)
+    assert previous is not None and previous.local_path == local
+    assert get_file("fail-keep")[1] == STATUS_DOWNLOADED
+
+    local.unlink()
+    assert set_failed(newer) is None
+    assert get_file("fail-keep")[1] == STATUS_FAILED
+    assert set_failed(_meta("fail-new", "fail/new.txt")) is None
+    assert get_file("fail-new")[1] == STATUS_FAILED
+
+
+def test_delete_files_rolls_back_on_error(cache_dir):
+    set_file(_meta("del-1", "del/1.txt"), STATUS_SKIPPED)
+    set_file(_meta("del-2", "del/2.txt"), STATUS_SKIPPED)
+
+    def ids():
+        yield "del-1"
+        raise sqlite3.OperationalError("boom")
+
+    with pytest.raises(sqlite3.OperationalError):
+        delete_files(ids())
+    assert get_file("del-1") is not None
+    # Соединение не осталось в открытой транзакции
+    delete_files(["del-1", "del-2"])
+    assert get_file("del-1") is None and get_file("del-2") is None
@@ -0,0 +1,50 @@
+import src.pipelines.folders as folders
+from src.pipelines.folders import build_folder_tree, summarize_tree
+
+
+def fake_reduce(monkeypatch):
+    calls = []
+
+    def folder(inputs, folder_name=""):
+        calls.append(folder_name)
+        return f"папка {folder_name}: {len(inputs)}"
+
+    monkeypatch.setattr(folders, "docs_to_folder_summary", folder)
+    monkeypatch.setattr(folders, "folder_to_global_summary", lambda inputs: f"global: {len(inputs)}")
+    return calls
+
+
+DOCS = [
+    ("a-b/x.txt", "x.txt", "икс"),
+    ("a/b/y.txt", "y.txt", "игрек"),
+    ("a/z.txt", "z.txt", "зет"),
+    ("a.b/w.txt", "w.txt", "дубль-вэ"),
+]
+
+
+def test_tree_structure():
+    tree = build_folder_tree(DOCS)
+    assert tree[""].children == ["a", "a-b", "a.b"]
+    assert tree["a"].children == ["a/b"] and tree["a"].docs == [("z.txt", "зет")]
+    assert tree["a/b"].depth == 2 and tree["a/b"].name == "b"
+
+
+def test_folders_listed_depth_first(monkeypatch):
+    fake_reduce(monkeypatch)
+    global_summary, rows = summarize_tree(DOCS)
+    # Подпапка идёт сразу за родителем, хотя "-" и "." меньше "/"
+    assert [r["path"] for r in rows] == ["a", "a/b", "a-b", "a.b"]
+    assert global_summary == "global: 3"
+    assert rows[0]["subfolders"] == ["a/b"] and rows[0]["documents"] == 1
+
+
+def test_unchanged_branch_is_not_recomputed(monkeypatch):
+    from src.storage.manifest import SummaryManifest
+
+    calls = fake_reduce(monkeypatch)
+    manifest = SummaryManifest()
+    summarize_tree(DOCS, manifest)
+    calls.clear()
+    changed = [d if d[0] != "a/b/y.txt" else ("a/b/y.txt", "y.txt", "новое") for d in DOCS]
+    summarize_tree(changed, manifest)
+    assert calls == ["a"]  # a/b — один документ, сводится без LLM
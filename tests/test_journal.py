@@ -0,0 +1,30 @@
+from src.storage.journal import SummaryJournal
+from src.storage.manifest import SummaryManifest
+
+
+def test_journal_replay_restores_summaries(tmp_path):
+    journal = SummaryJournal(tmp_path / "j.jsonl")
+    journal.record("f1", "v1", "a/1.txt", "1.txt", summary="первое")
+    journal.record("f2", "v2", "a/2.txt", "2.txt", reason="пустой текст")
+    journal.record("f1", "v1b", "a/1.txt", "1.txt", summary="новее")
+    journal.close()
+    # Падение посреди записи: оборванная последняя строка
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"file_id": "f3", "vers')
+
+    assert [e["file_id"] for e in journal.entries()] == ["f1", "f2", "f1"]
+    manifest = SummaryManifest(tmp_path / "m.json")
+    assert journal.replay(manifest) == 1
+    assert manifest.get_doc("f1", "v1b")["summary"] == "новее"
+    assert manifest.get_doc("f2", "v2") is None
+
+
+def test_journal_clear(tmp_path):
+    journal = SummaryJournal(tmp_path / "j.jsonl")
+    journal.record("f1", "v1", "p", "n", summary="s")
+    journal.sync()
+    journal.clear()
+    assert not journal.path.exists() and journal.entries() == []
+    journal.record("f2", "v1", "p", "n", summary="s")  # после clear журнал открывается заново
+    assert [e["file_id"] for e in journal.entries()] == ["f2"]
+    journal.close()
@@ -0,0 +1,68 @@
+import time
+
+from src.config import CACHE_LLM
+from src.llm.cache_key import make_cache_key, template_stage
+from src.storage import cache
+from src.storage.cache import (
+    _db,
+    flush_llm_cache,
+    get_llm_cache,
+    llm_cache_stage_stats,
+    purge_orphaned_llm_cache,
+    set_llm_cache,
+)
+
+
+def test_cache_key_is_canonical():
+    a = [{"role": "system", "content": "Кратко.\n\n\n"}, {"role": "user", "content": "текст   абзаца"}]
+    b = [{"content": "Кратко.", "role": "system"}, {"role": "user", "content": "текст абзаца"}]
+    assert make_cache_key(a, "m", "chunk@1") == make_cache_key(b, "m", "chunk@1")
+    assert make_cache_key(a, "m", "chunk@1") != make_cache_key(a, "m", "chunk@2")
+    assert make_cache_key(a, "m", "chunk@1") != make_cache_key(a, "other", "chunk@1")
+    assert make_cache_key(a, "m", "chunk@1", {"temperature": 0}) != make_cache_key(a, "m", "chunk@1")
+    assert template_stage("chunk@3") == "chunk"
+
+
+def test_set_get_survives_flush(cache_dir):
+    set_llm_cache("test-key-1", "ответ", "m", "chunk")
+    assert get_llm_cache("test-key-1", "chunk") == "ответ"  # из памяти/буфера до записи
+    flush_llm_cache()
+    cache._memory.clear()
+    assert get_llm_cache("test-key-1", "chunk") == "ответ"  # из SQLite
+    assert get_llm_cache("test-key-missing", "chunk") is None
+
+
+def test_batch_flush_writes_all(cache_dir):
+    keys = [f"test-batch-{i}" for i in range(cache.WRITE_BATCH * 2 + 3)]
+    for k in keys:
+        set_llm_cache(k, k.upper(), "m", "doc")
+    flush_llm_cache()
+    rows = _db().execute(
+        "SELECT COUNT(*) FROM llm_cache WHERE key LIKE 'test-batch-%' AND stage = 'doc'"
+    ).fetchone()[0]
+    assert rows == len(keys)
+
+
+def test_stage_stats(cache_dir):
+    set_llm_cache("test-stage-hit", "x", "m", "stagetest")
+    get_llm_cache("test-stage-hit", "stagetest")
+    get_llm_cache("test-stage-miss", "stagetest")
+    row = next(r for r in llm_cache_stage_stats() if r["stage"] == "stagetest")
+    assert (row["hits"], row["misses"], row["entries"]) == (1, 1, 1)
+
+
+def test_purge_orphans(cache_dir):
+    conn = _db()
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_cache (key, content, model, created, stage) VALUES (?, ?, ?, ?, '')",
+        ("old-scheme-key", "x", "m", time.time()),
+    )
+    set_llm_cache("test-purge-keep", "y", "m", "chunk")
+    CACHE_LLM.mkdir(parents=True, exist_ok=True)
+    (CACHE_LLM / "deadbeef.json").write_text('{"content": "x"}', encoding="utf-8")
+
+    rows, files = purge_orphaned_llm_cache()
+    assert rows >= 1 and files == 1
+    cache._memory.clear()
+    assert _db().execute("SELECT 1 FROM llm_cache WHERE key = 'old-scheme-key'").fetchone() is None
+    assert get_llm_cache("test-purge-keep", "chunk") == "y"
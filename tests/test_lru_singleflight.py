@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.llm.singleflight import AsyncSingleFlight, SingleFlight
+from src.storage.lru import LRUCache
+
+
+def test_lru_evicts_oldest_by_entries():
+    lru = LRUCache(max_entries=2, max_bytes=1 << 20)
+    lru.set("a", "1")
+    lru.set("b", "2")
+    assert lru.get("a") == "1"  # a — свежий
+    lru.set("c", "3")
+    assert lru.get("b") is None and lru.get("a") == "1" and lru.get("c") == "3"
+
+
+def test_lru_limits_bytes():
+    lru = LRUCache(max_entries=100, max_bytes=10)
+    lru.set("a", "12345")
+    lru.set("b", "абв")  # 6 байт UTF-8
+    assert lru.get("a") is None and lru.get("b") == "абв"
+    lru.set("big", "x" * 11)  # больше лимита — не кешируется
+    assert lru.get("big") is None
+    assert lru.stats() == {"entries": 1, "bytes": 6}
+
+
+def test_singleflight_one_call_for_concurrent_callers():
+    sf = SingleFlight()
+    calls = 0
+    gate = threading.Event()
+
+    def fn():
+        nonlocal calls
+        calls += 1
+        gate.wait()
+        return "результат"
+
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(sf.do("k", fn))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert calls == 1 and out == ["результат"] * 8
+    assert sf.do("k", lambda: "новый") == "новый"  # ключ освобождён
+
+
+def test_singleflight_propagates_error():
+    sf = SingleFlight()
+    with pytest.raises(ValueError):
+        sf.do("k", lambda: (_ for _ in ()).throw(ValueError("x")))
+    assert sf.do("k", lambda: 1) == 1
+
+
+def test_async_singleflight():
+    sf = AsyncSingleFlight()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        return await asyncio.gather(*(sf.do("k", fn) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
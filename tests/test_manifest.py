@@ -0,0 +1,41 @@
+import json
+
+from src.storage.manifest import MANIFEST_FORMAT, SummaryManifest, inputs_hash
+
+
+def test_inputs_hash_separates_parts():
+    assert inputs_hash("ab", "c") != inputs_hash("a", "bc")
+    assert inputs_hash("a", "b") == inputs_hash("a", "b")
+
+
+def test_manifest_roundtrip(tmp_path):
+    path = tmp_path / "manifest.json"
+    m = SummaryManifest(path)
+    m.set_doc("f1", "v1", "саммари")
+    m.set_reduce("folder:a", "h1", "папка")
+    m.save()
+    loaded = SummaryManifest.load(path)
+    assert loaded.get_doc("f1", "v1") == {"version": "v1", "summary": "саммари"}
+    assert loaded.get_doc("f1", "v2") is None
+    assert loaded.get_doc("f1", "") is None
+    assert loaded.get_reduce("folder:a", "h1") == "папка"
+    assert loaded.get_reduce("folder:a", "h2") is None
+
+
+def test_manifest_prune(tmp_path):
+    m = SummaryManifest(tmp_path / "m.json")
+    for fid in ("a", "b", "c"):
+        m.set_doc(fid, "v", fid)
+    m.set_reduce("folder:x", "h", "x")
+    m.set_reduce("folder:y", "h", "y")
+    assert m.prune({"a", "c"}) == 1 and set(m.docs) == {"a", "c"}
+    m.prune_reduces({"folder:y"})
+    assert set(m.reduces) == {"folder:y"}
+
+
+def test_manifest_ignores_broken_or_foreign_format(tmp_path):
+    path = tmp_path / "m.json"
+    path.write_text("{не json", encoding="utf-8")
+    assert SummaryManifest.load(path).docs == {}
+    path.write_text(json.dumps({"format": MANIFEST_FORMAT + 1, "docs": {"a": {}}}), encoding="utf-8")
+    assert SummaryManifest.load(path).docs == {}
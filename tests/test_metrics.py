@@ -0,0 +1,78 @@
+import json
+import urllib.request
+
+import pytest
+
+from src.llm import metrics
+from src.llm.metrics import call_metrics, record_retry, reset_call_metrics, timed_call
+from src.llm.mock_server import MockConfig, MockServer
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    reset_call_metrics()
+    yield
+    reset_call_metrics()
+
+
+def test_latencies_stay_bounded(monkeypatch):
+    monkeypatch.setattr(metrics, "SAMPLE_SIZE", 100)
+    for k in range(1000):
+        with metrics._lock:
+            metrics._record(k / 1000)
+    m = call_metrics()
+    assert len(metrics._latencies) == 100
+    assert m["calls"] == 1000
+    assert m["latency_max"] == pytest.approx(0.999)
+    assert m["latency_mean"] == pytest.approx(0.4995)
+    assert 0.3 < m["latency_p50"] < 0.7  # по выборке, не точно
+
+
+def test_errors_and_retries_counted():
+    class Err(Exception):
+        status_code = 429
+
+    with pytest.raises(Err):
+        with timed_call():
+            raise Err()
+    with timed_call():
+        pass
+    record_retry(429)
+    record_retry(None)
+    m = call_metrics()
+    assert m["calls"] == 2
+    assert m["errors"] == {"429": 1}
+    assert m["retries"] == {"429": 1, "other": 1} and m["retries_total"] == 2
+
+
+def test_mock_respond_is_deterministic():
+    server = MockServer(MockConfig(latency=0, tokens_per_sec=0, completion_tokens=3))
+    try:
+        status, body, _ = server.respond({"messages": [{"role": "user", "content": "раз два три четыре"}]})
+    finally:
+        server.server_close()
+    assert status == 200
+    assert body["choices"][0]["message"]["content"] == "Mock: раз два три"
+    assert body["usage"]["completion_tokens"] == 3
+
+
+def test_mock_errors_carry_retry_after():
+    server = MockServer(MockConfig(latency=0, tokens_per_sec=0, error_429=1.0, retry_after=2))
+    try:
+        status, _, headers = server.respond({"messages": []})
+    finally:
+        server.server_close()
+    assert status == 429 and headers == {"Retry-After": "2"}
+    assert server.stats[429] == 1
+
+
+def test_mock_serves_http():
+    with MockServer(MockConfig(latency=0, tokens_per_sec=0)) as server:
+        req = urllib.request.Request(
+            server.base_url + "/chat/completions",
+            data=json.dumps({"model": "m", "messages": [{"role": "user", "content": "привет"}]}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            body = json.loads(resp.read())
+    assert body["choices"][0]["message"]["content"] == "Mock: привет"
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+import src.loaders.parallel as parallel
+from benchmarks.corpus import make_paragraphs, write_pdf
+from src.loaders.pdf_loader import PDF_SHARD_MIN_PAGES, LargePdf, large_pdf_pages
+
+
+@pytest.fixture(scope="module")
+def large_pdf(tmp_path_factory):
+    """PDF от pdf_shard_min_pages страниц и больше 1 МБ."""
+    path = tmp_path_factory.mktemp("pdf") / "large.pdf"
+    lines = PDF_SHARD_MIN_PAGES * 48
+    write_pdf(path, make_paragraphs(random.Random(0), lines // 3, 60), width=200)
+    assert path.stat().st_size > 1 << 20
+    return path
+
+
+def test_worker_defers_large_pdf(large_pdf, tmp_path):
+    small = tmp_path / "small.pdf"
+    write_pdf(small, ["Short report text."])
+    assert large_pdf_pages(large_pdf) >= PDF_SHARD_MIN_PAGES
+    assert large_pdf_pages(small) == 0
+    assert parallel.extract_worker(str(large_pdf), True) == LargePdf(large_pdf_pages(large_pdf))
+    assert "Short report text" in parallel.extract_worker(str(small), True)
+
+
+def test_extract_many_never_opens_pdf_in_main_process(large_pdf, tmp_path, monkeypatch):
+    import pypdf
+
+    def no_reader(*args, **kwargs):
+        raise AssertionError("PdfReader в главном процессе")
+
+    monkeypatch.setattr(pypdf, "PdfReader", no_reader)  # воркеры spawn импортируют pypdf заново
+    sharded = []
+    monkeypatch.setattr(parallel, "load_large_pdf", lambda path, pages: sharded.append(pages) or "большой")
+    txt = []
+    for k in range(3):
+        p = tmp_path / f"doc{k}.txt"
+        p.write_text(f"Текст {k}", encoding="utf-8")
+        txt.append(p)
+
+    out = {i: (text, reason) for i, text, reason in parallel.extract_many([txt[0], large_pdf, *txt[1:]], workers=2)}
+    assert out == {0: ("Текст 0", None), 1: ("большой", None), 2: ("Текст 1", None), 3: ("Текст 2", None)}
+    assert len(sharded) == 1 and sharded[0] >= PDF_SHARD_MIN_PAGES
+
+
+def _hanging_file(tmp_path, name: str):
+    """TXT-«файл», чтение которого блокируется навсегда (FIFO без писателя) — как зависший парсер."""
+    import os
+
+    path = tmp_path / name
+    os.mkfifo(path)
+    return path
+
+
+def test_extract_pool_recovers_from_hung_workers(tmp_path):
+    import threading
+
+    good = tmp_path / "good.txt"
+    good.write_text("Текст", encoding="utf-8")
+    pool = parallel.ExtractPool(workers=2, timeout=1.0)
+    try:
+        errors = []
+
+        def hang(k):
+            try:
+                pool.extract(str(_hanging_file(tmp_path, f"hang{k}.txt")))
+            except TimeoutError as e:
+                errors.append(e)
+
+        first = threading.Thread(target=hang, args=(0,))
+        first.start()
+        first.join()
+        # Один воркер завис — здоровый файл идёт во второй и не ловит чужой таймаут
+        assert pool.extract(str(good)) == "Текст"
+        hang(1)  # зависли оба — пул пересоздаётся
+        assert len(errors) == 2
+        assert pool.extract(str(good)) == "Текст"
+    finally:
+        pool.close()
+
+
+def test_extract_pool_runs_large_pdfs_one_at_a_time(large_pdf, monkeypatch):
+    import threading
+    import time
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_large(path, pages):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return "большой"
+
+    monkeypatch.setattr(parallel, "load_large_pdf", fake_large)
+    pool = parallel.ExtractPool(workers=3, timeout=60)
+    try:
+        out = []
+        threads = [threading.Thread(target=lambda: out.append(pool.extract(str(large_pdf)))) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        pool.close()
+    assert out == ["большой"] * 3 and peak[0] == 1
@@ -0,0 +1,124 @@
+import pytest
+
+from src.llm.ratelimit import ModelRateLimiter, TokenBucket
+
+
+def test_bucket_reserve_and_refill():
+    bucket = TokenBucket(60)  # 1 в секунду
+    t0 = bucket._updated
+    assert bucket.reserve(60, now=t0) == 0.0
+    assert bucket.reserve(2, now=t0) == pytest.approx(2.0)  # в долг: ждать 2 с
+    assert bucket.reserve(1, now=t0 + 10) == 0.0  # за 10 с пополнилось 10 — долг погашен
+    bucket.adjust(-1000, now=t0 + 10)
+    assert bucket._tokens == bucket.capacity  # возврат не больше ёмкости
+
+
+def tpm_tokens(limiter: ModelRateLimiter) -> float:
+    limiter._tpm._refill(limiter._tpm._updated)
+    return limiter._tpm._tokens
+
+
+def test_correct_refunds_overestimate():
+    limiter = ModelRateLimiter(tpm=1000)
+    limiter.acquire(300)
+    limiter.correct(300, 100)
+    assert tpm_tokens(limiter) == pytest.approx(900, abs=1)
+
+
+def test_correct_uses_capped_amount():
+    limiter = ModelRateLimiter(tpm=1000)
+    limiter.acquire(5000)  # больше минутного бюджета: списано только 1000
+    assert tpm_tokens(limiter) == pytest.approx(0, abs=1)
+    limiter.correct(5000, 600)
+    # Возвращается разница со списанным (1000 − 600), а не с оценкой (5000 − 600)
+    assert tpm_tokens(limiter) == pytest.approx(400, abs=1)
+
+
+def test_correct_caps_actual_over_budget():
+    limiter = ModelRateLimiter(tpm=1000)
+    limiter.acquire(100)
+    limiter.correct(100, 50_000)
+    # Долг не больше одного минутного бюджета — следующий запрос ждёт не дольше минуты
+    assert tpm_tokens(limiter) == pytest.approx(0, abs=1)
+
+
+def test_rpm_wait():
+    limiter = ModelRateLimiter(rpm=2)
+    assert limiter._reserve(1) == 0.0
+    assert limiter._reserve(1) == 0.0
+    assert limiter._reserve(1) == pytest.approx(30.0, abs=0.1)  # 2 в минуту — следующий через 30 с
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FakeCompletions:
+    """Первые fail вызовов — 429, дальше ответ с usage."""
+
+    def __init__(self, fail: int, total_tokens: int):
+        self.fail, self.total_tokens, self.calls = fail, total_tokens, 0
+
+    def _create(self):
+        from types import SimpleNamespace
+
+        self.calls += 1
+        if self.calls <= self.fail:
+            raise RateLimited("429")
+        message = SimpleNamespace(content="ok")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=self.total_tokens)
+        )
+
+    def create(self, **kwargs):
+        return self._create()
+
+
+class AsyncFakeCompletions(FakeCompletions):
+    async def create(self, **kwargs):
+        return self._create()
+
+
+def fake_client(completions):
+    from types import SimpleNamespace
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    import src.llm.async_client as async_client
+    import src.llm.client as client
+    from src.llm.concurrency import AdaptiveLimiter, AsyncAdaptiveLimiter
+
+    limiter = ModelRateLimiter(tpm=10_000)
+    monkeypatch.setattr("src.llm.retry._retry_delay", lambda e, delay: 0.0)
+    for module in (client, async_client):
+        monkeypatch.setattr(module, "get_rate_limiter", lambda model: limiter)
+        monkeypatch.setattr(module, "estimate_prompt_tokens", lambda messages: 1000)
+    monkeypatch.setattr(client, "get_limiter", lambda: AdaptiveLimiter(initial=4))
+    monkeypatch.setattr(async_client, "get_async_limiter", lambda: AsyncAdaptiveLimiter(initial=4))
+    return limiter
+
+
+def test_failed_attempts_are_refunded(limiter, monkeypatch):
+    import src.llm.client as client
+
+    completions = FakeCompletions(fail=3, total_tokens=700)
+    monkeypatch.setattr(client, "get_client", lambda *a: fake_client(completions))
+    assert client.chat([{"role": "user", "content": "x"}], model="m", api_key="k") == "ok"
+    assert completions.calls == 4
+    # Списан только успешный вызов по факту, а не 4 оценки
+    assert tpm_tokens(limiter) == pytest.approx(10_000 - 700, abs=5)
+
+
+def test_failed_attempts_are_refunded_async(limiter, monkeypatch):
+    import asyncio
+
+    import src.llm.async_client as async_client
+
+    completions = AsyncFakeCompletions(fail=2, total_tokens=300)
+    monkeypatch.setattr(async_client, "get_async_client", lambda *a: fake_client(completions))
+    out = asyncio.run(async_client.achat([{"role": "user", "content": "x"}], model="m", api_key="k"))
+    assert out == "ok" and completions.calls == 3
+    assert tpm_tokens(limiter) == pytest.approx(10_000 - 300, abs=5)
@@ -0,0 +1,60 @@
+import src.pipelines.reduce as reduce
+from src.chunking import estimate_tokens
+from src.pipelines.reduce import SEP_TOKENS, pack_groups, reduce_tree
+
+
+def test_pack_groups_respects_budget_and_order():
+    texts = [f"текст {i} " + "x" * (i * 37 % 200) for i in range(50)]
+    groups = pack_groups(texts, max_tokens=200, fan_in=0)
+    assert [t for g in groups for t in g] == texts
+    for g in groups:
+        assert sum(estimate_tokens(t) for t in g) + SEP_TOKENS * (len(g) - 1) <= 200
+
+
+def test_pack_groups_fan_in():
+    groups = pack_groups(["a"] * 25, max_tokens=10_000, fan_in=10)
+    assert [len(g) for g in groups] == [10, 10, 5]
+
+
+def test_pack_groups_truncates_oversized_text():
+    groups = pack_groups(["short", "y" * 4000, "tail"], max_tokens=100, fan_in=0)
+    assert groups[1] == ["y" * 400] and len(groups) == 3
+
+
+def fake_chat(monkeypatch):
+    calls = []
+
+    def chat(messages, template=""):
+        calls.append(template)
+        return "S(" + messages[0]["content"] + ")"
+
+    monkeypatch.setattr(reduce, "chat_cached", chat)
+    return calls
+
+
+def join_messages(texts):
+    return [{"role": "user", "content": "+".join(texts)}]
+
+
+def test_reduce_tree_levels(monkeypatch):
+    calls = fake_chat(monkeypatch)
+    monkeypatch.setattr(reduce, "pack_groups", lambda texts: pack_groups(texts, fan_in=3))
+    out = reduce_tree([str(i) for i in range(7)], join_messages, "doc")
+    # 7 → группы по 3: [0,1,2] [3,4,5] [6] → 3 → финальный вызов
+    assert out == "S(S(0+1+2)+S(3+4+5)+6)"
+    assert len(calls) == 3
+
+
+def test_reduce_tree_max_depth_collapses(monkeypatch):
+    calls = fake_chat(monkeypatch)
+    monkeypatch.setattr(reduce, "pack_groups", lambda texts: pack_groups(texts, fan_in=2))
+    monkeypatch.setattr(reduce, "REDUCE_MAX_DEPTH", 1)
+    out = reduce_tree(["a", "b", "c", "d"], join_messages, "doc")
+    assert out == "S(a+b+c+d)" and len(calls) == 1  # глубина 1 — всё одной группой
+
+
+def test_reduce_tree_single_and_empty(monkeypatch):
+    calls = fake_chat(monkeypatch)
+    assert reduce_tree([], join_messages, "doc") == ""
+    assert reduce_tree(["один"], join_messages, "doc") == "S(один)"
+    assert len(calls) == 1
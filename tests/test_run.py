@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+import src.pipelines.run as run
+from conftest import write_corpus
+from src.pipelines.results import SUMMARY_RESULT_PATH, doc_version
+from src.storage.journal import SummaryJournal
+from src.storage.manifest import SummaryManifest
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Саммари документа — первый абзац; дерево папок — склейка путей."""
+    calls = []
+
+    def doc_summary(chunks):
+        chunks = list(chunks)
+        calls.append(chunks[0].path)
+        return chunks[0].text.split("\n\n")[0]
+
+    async def adoc_summary(chunks):
+        return doc_summary(chunks)
+
+    def tree(docs, manifest):
+        return "итог: " + ", ".join(d[0] for d in docs), []
+
+    async def atree(docs, manifest):
+        return tree(docs, manifest)
+
+    monkeypatch.setattr(run, "chunks_to_doc_summary", doc_summary)
+    monkeypatch.setattr(run, "achunks_to_doc_summary", adoc_summary)
+    monkeypatch.setattr(run, "summarize_tree", tree)
+    monkeypatch.setattr(run, "asummarize_tree", atree)
+    monkeypatch.setattr("src.loaders.parallel.EXTRACT_WORKERS", 1)
+    return calls
+
+
+def test_run_summarize_writes_result_and_clears_journal(clean_state, tmp_path, fake_llm):
+    metas = write_corpus(tmp_path, 5, "run-ok")
+    result = run.run_summarize(metas, progress=False)
+    assert [d[0] for d in result["doc_summaries"]] == [m.path for m in metas]
+    assert json.loads(SUMMARY_RESULT_PATH.read_text(encoding="utf-8"))["global_summary"] == result["global_summary"]
+    assert not SummaryJournal().path.exists()
+
+    fake_llm.clear()
+    again = run.run_summarize(metas, progress=False)
+    assert fake_llm == []  # всё из манифеста
+    assert again["doc_summaries"] == result["doc_summaries"]
+
+
+def test_result_is_built_from_journal(clean_state, tmp_path, fake_llm):
+    metas = write_corpus(tmp_path, 3, "run-journal")
+    # Прерванный прошлый запуск успел записать документ 0 в журнал
+    journal = SummaryJournal()
+    journal.record(metas[0].file_id, doc_version(metas[0]), metas[0].path, metas[0].name, summary="из журнала")
+    journal.close()
+    result = run.run_summarize(metas, progress=False)
+    assert sorted(fake_llm) == sorted([metas[1].path, metas[2].path])
+    assert result["doc_summaries"][0] == (metas[0].path, metas[0].name, "из журнала")
+
+
+def test_interrupt_in_tree_keeps_journal(clean_state, tmp_path, fake_llm, monkeypatch):
+    metas = write_corpus(tmp_path, 3, "run-tree-stop")
+
+    def interrupted(docs, manifest):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(run, "summarize_tree", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run.run_summarize(metas, progress=False)
+    assert not SUMMARY_RESULT_PATH.exists()
+    entries = SummaryJournal().entries()
+    assert {e["file_id"] for e in entries} == {m.file_id for m in metas}
+    manifest = SummaryManifest.load()
+    assert all(manifest.get_doc(e["file_id"], e["version"]) for e in entries)
+
+
+def test_failures_are_journaled(clean_state, tmp_path, fake_llm, monkeypatch):
+    metas = write_corpus(tmp_path, 2, "run-fail")
+    metas[1].local_path.write_text("   ", encoding="utf-8")
+    monkeypatch.setattr(run, "summarize_tree", lambda docs, manifest: (_ for _ in ()).throw(KeyboardInterrupt))
+    with pytest.raises(KeyboardInterrupt):
+        run.run_summarize(metas, progress=False)
+    reasons = {e["file_id"]: e.get("reason") for e in SummaryJournal().entries()}
+    assert reasons == {metas[0].file_id: None, metas[1].file_id: "пустой текст"}
+
+
+def test_run_summarize_async(clean_state, tmp_path, fake_llm):
+    metas = write_corpus(tmp_path, 4, "run-async")
+    result = asyncio.run(run.run_summarize_async(metas, progress=False))
+    assert [d[0] for d in result["doc_summaries"]] == [m.path for m in metas]
+    assert SUMMARY_RESULT_PATH.exists()
+    assert not SummaryJournal().path.exists()
+
+
+@pytest.mark.parametrize("name", ["REDUCE_INPUT_TOKENS", "REDUCE_FAN_IN", "REDUCE_MAX_DEPTH", "CHUNK_TOKENS"])
+def test_doc_version_depends_on_chunk_and_reduce_budget(tmp_path, monkeypatch, name):
+    import src.pipelines.results as results
+
+    meta = write_corpus(tmp_path, 1, "v")[0]
+    before = doc_version(meta)
+    monkeypatch.setattr(results, name, getattr(results, name) + 1)
+    assert doc_version(meta) != before
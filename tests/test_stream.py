@@ -0,0 +1,130 @@
+import _thread
+import threading
+
+import pytest
+
+import src.pipelines.stream as stream
+from conftest import write_corpus
+from src.storage.journal import SummaryJournal
+from src.storage.manifest import SummaryManifest
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """LLM без сети: саммари чанка — его первые слова, свёртка — склейка."""
+    calls = {"chunk": 0}
+    lock = threading.Lock()
+
+    def chunk(text):
+        with lock:
+            calls["chunk"] += 1
+        return text.split(".")[0]
+
+    monkeypatch.setattr(stream, "summarize_chunk", chunk)
+    monkeypatch.setattr(stream, "reduce_chunk_summaries", lambda s: " | ".join(s))
+    monkeypatch.setattr(stream, "summarize_tree", lambda docs, manifest: ("итог", []))
+    monkeypatch.setattr(stream, "CHUNK_TOKENS", 60)
+    monkeypatch.setattr(stream, "EXTRACT_WORKERS", 2)
+    monkeypatch.setattr(stream, "LLM_CONCURRENCY_MAX", 3)
+    return calls
+
+
+def test_run_stream_summarizes_all(clean_state, tmp_path, fake_llm):
+    metas = write_corpus(tmp_path, 12, "stream-all")
+    result = stream.run_stream(iter(metas), progress=False)
+    assert result["failed"] == []
+    paths = [d[0] for d in result["doc_summaries"]]
+    assert paths == sorted(m.path for m in metas)
+    for path, _, summary in result["doc_summaries"]:
+        n = int(path[-7:-4])
+        assert summary.split(" | ")[0] == f"Документ {n}, абзац 0"
+    assert SummaryJournal().entries() == []
+
+    # Повторный прогон: всё из манифеста, LLM не вызывается
+    before = fake_llm["chunk"]
+    again = stream.run_stream(iter(metas), progress=False)
+    assert fake_llm["chunk"] == before
+    assert again["doc_summaries"] == result["doc_summaries"]
+
+
+def test_run_stream_reports_failures(clean_state, tmp_path, fake_llm, monkeypatch):
+    metas = write_corpus(tmp_path, 4, "stream-fail")
+    metas[1].local_path.unlink()
+    metas[2].local_path.write_text("  \n\n  ", encoding="utf-8")
+    original = stream.summarize_chunk
+
+    def flaky(text):
+        if "Документ 3," in text:
+            raise RuntimeError("LLM недоступен")
+        return original(text)
+
+    monkeypatch.setattr(stream, "summarize_chunk", flaky)
+    result = stream.run_stream(iter(metas), progress=False)
+    reasons = {f["path"]: f["reason"] for f in result["failed"]}
+    assert reasons == {
+        metas[1].path: "файл не найден",
+        metas[2].path: "пустой текст",
+        metas[3].path: "LLM недоступен",
+    }
+    assert [d[0] for d in result["doc_summaries"]] == [metas[0].path]
+
+
+def test_run_stream_backpressure(clean_state, tmp_path, fake_llm, monkeypatch):
+    monkeypatch.setattr(stream, "STREAM_QUEUE_SIZE", 2)
+    metas = write_corpus(tmp_path, 60, "stream-bp", paragraphs=2)
+    release = threading.Event()
+    pulled = [0]
+    original = stream.summarize_chunk
+
+    def blocked(text):
+        release.wait()
+        return original(text)
+
+    def source():
+        for meta in metas:
+            pulled[0] += 1
+            yield meta
+
+    monkeypatch.setattr(stream, "summarize_chunk", blocked)
+    runner = threading.Thread(target=stream.run_stream, args=(source(),), kwargs={"progress": False})
+    runner.start()
+    try:
+        threading.Event().wait(1.5)
+        # LLM стоит: источник читается не дальше суммы очередей и потоков стадий
+        assert pulled[0] < 30
+    finally:
+        release.set()
+        runner.join(timeout=60)
+    assert not runner.is_alive()
+    assert pulled[0] == len(metas)
+
+
+def test_run_stream_interrupt_closes_source(clean_state, tmp_path, fake_llm, monkeypatch):
+    metas = write_corpus(tmp_path, 40, "stream-stop", paragraphs=2)
+    closed = threading.Event()
+    done = [0]
+    original = stream.summarize_chunk
+    lock = threading.Lock()
+
+    def source():
+        try:
+            yield from metas
+        finally:
+            closed.set()
+
+    def interrupting(text):
+        with lock:
+            done[0] += 1
+            if done[0] == 10:
+                _thread.interrupt_main()
+        return original(text)
+
+    monkeypatch.setattr(stream, "summarize_chunk", interrupting)
+    with pytest.raises(KeyboardInterrupt):
+        stream.run_stream(source(), progress=False)
+    assert closed.is_set()
+    journal = SummaryJournal().entries()
+    assert 0 < len(journal) < len(metas)
+    # Готовые документы — в манифесте: следующий запуск их не пересчитывает
+    manifest = SummaryManifest.load()
+    assert all(manifest.get_doc(e["file_id"], e["version"]) for e in journal if e.get("summary"))
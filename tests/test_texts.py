@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.sources.models import FileMeta
+from src.storage.texts import _text_path, get_cached_text, iter_text_cached, load_text_cached, tee_cached_text
+
+
+def _meta(tmp_path: Path, file_id: str, text: str, name: str = "doc.txt") -> FileMeta:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return FileMeta(file_id, name, "text/plain", path.stat().st_size, "2024-01-01T00:00:00Z", name, False, path)
+
+
+def test_iter_text_cached_fills_cache(cache_dir, tmp_path):
+    meta = _meta(tmp_path, "texts-fill", 'Абзац "один"\\\n\nАбзац\tдва')
+    assert get_cached_text(meta) is None
+    streamed = "\n".join(iter_text_cached(meta))
+    assert get_cached_text(meta) == streamed
+    data = json.loads(_text_path(meta.file_id).read_text(encoding="utf-8"))
+    assert data["file_id"] == meta.file_id and data["text"] == streamed
+    # Повторное чтение — из кеша, файл не нужен
+    meta.local_path.write_text("другой текст", encoding="utf-8")
+    assert "\n".join(iter_text_cached(meta, verify=False)) == streamed
+
+
+def test_tee_joins_fragments(cache_dir, tmp_path):
+    meta = _meta(tmp_path, "texts-tee", "x")
+    fragments = ["стр. 1", 'стр. "2"', "стр. 3\n\nконец"]
+    assert list(tee_cached_text(meta, iter(fragments))) == fragments
+    assert get_cached_text(meta) == "\n".join(fragments)
+
+
+def test_tee_interrupted_keeps_previous_cache(cache_dir, tmp_path):
+    meta = _meta(tmp_path, "texts-partial", "Старый текст")
+    assert load_text_cached(meta) == "Старый текст"
+
+    stream = tee_cached_text(meta, iter(["стр. 1", "стр. 2"]))
+    assert next(stream) == "стр. 1"
+    stream.close()
+    assert get_cached_text(meta) == "Старый текст"
+    assert not list(_text_path(meta.file_id).parent.glob(f"{meta.file_id}.*.tmp"))
+
+
+def test_tee_propagates_loader_error(cache_dir, tmp_path):
+    meta = _meta(tmp_path, "texts-error", "x")
+
+    def broken():
+        yield "стр. 1"
+        raise RuntimeError("битый файл")
+
+    with pytest.raises(RuntimeError):
+        list(tee_cached_text(meta, broken()))
+    assert get_cached_text(meta) is None